@@ -1,7 +1,12 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, make_response, session, g, send_file, abort
+from flask import before_render_template, template_rendered
+import hmac
 import os
-import json
+import asyncio
 import datetime
+import threading
+import time
+from urllib.parse import urlencode
 from pathlib import Path
 try:
     from dotenv import load_dotenv  # type: ignore
@@ -10,16 +15,48 @@ except Exception:
 
 # Support running both as a package (Blog) and as a standalone script
 try:
-    from .pexels_api import PexelsAPI  # type: ignore
+    from .pexels_async import AsyncPexelsAPI  # type: ignore
 except Exception:
-    from pexels_api import PexelsAPI  # type: ignore
+    from pexels_async import AsyncPexelsAPI  # type: ignore
+try:
+    from . import blog_db  # type: ignore
+except Exception:
+    import blog_db  # type: ignore
+try:
+    from .page_cache import PageCache  # type: ignore
+except Exception:
+    from page_cache import PageCache  # type: ignore
+try:
+    from .search_index import InvertedIndex, make_snippet, tokenize  # type: ignore
+except Exception:
+    from search_index import InvertedIndex, make_snippet, tokenize  # type: ignore
+try:
+    from .file_store import FileEntryStore  # type: ignore
+except Exception:
+    from file_store import FileEntryStore  # type: ignore
+try:
+    from .metrics import Metrics  # type: ignore
+except Exception:
+    from metrics import Metrics  # type: ignore
+try:
+    from .media_cache import MediaCache, MediaFetchError, VARIANT_WIDTHS  # type: ignore
+except Exception:
+    from media_cache import MediaCache, MediaFetchError, VARIANT_WIDTHS  # type: ignore
 
 # Load environment variables from .env located alongside this file
 if load_dotenv:
     load_dotenv(dotenv_path=Path(__file__).with_name('.env'))
 
-# Initialize Pexels API with the provided key
-pexels = PexelsAPI(os.getenv('PEXELS_API_KEY'))
+# Request metrics served at /metrics; requests slower than SLOW_REQUEST_MS are logged
+metrics = Metrics(slow_request_seconds=float(os.getenv('SLOW_REQUEST_MS', '1000')) / 1000)
+blog_db.add_query_listener(metrics.observe_query)
+
+# Initialize Pexels API with the provided key (search responses cached for PEXELS_CACHE_TTL seconds)
+pexels = AsyncPexelsAPI(
+    os.getenv('PEXELS_API_KEY'),
+    cache_ttl=float(os.getenv('PEXELS_CACHE_TTL', '300')),
+    on_request=metrics.observe_pexels,
+)
 
 # Grammar correction features removed: provide no-op stubs to keep routes simple
 # and avoid any dependency on the old txt_reviewer module.
@@ -32,6 +69,55 @@ def process_blog_entry(title: str, content: str) -> tuple[str, str]:
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # For session management
 
+# Create the DB connection pool and apply pending schema migrations once at
+# startup, so request handlers never issue DDL. If MySQL is unreachable now,
+# this happens lazily on first use instead.
+try:
+    blog_db.init_db()
+except Exception as e:
+    app.logger.warning(f"DB not initialised at startup: {e}")
+
+
+@app.before_request
+def _start_request_trace():
+    metrics.start_request(request.method, request.path)
+
+
+@app.after_request
+def _remember_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def _finish_request_trace(exc):
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    status = 500 if exc is not None else g.get('metrics_status', 500)
+    slow = metrics.finish_request(route, status)
+    if slow:
+        app.logger.warning(f"Slow request: {slow}")
+
+
+@before_render_template.connect_via(app)
+def _template_render_started(sender, template, context, **extra):
+    metrics.render_started(template.name)
+
+
+@template_rendered.connect_via(app)
+def _template_render_finished(sender, template, context, **extra):
+    metrics.render_finished(template.name)
+
+
+@app.before_request
+def _checkout_db_connection():
+    """Share a single pooled DB connection across this request's queries."""
+    blog_db.begin_request()
+
+
+@app.teardown_request
+def _release_db_connection(exc):
+    blog_db.end_request()
+
 @app.before_request
 def redirect_to_pythonanywhere():
     """Redirect all requests to spade605.pythonanywhere.com"""
@@ -49,10 +135,66 @@ def redirect_to_pythonanywhere():
 BLOG_ENTRIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog_entries')
 COMMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog_comments')
 
+# Listing page size (?per_page= may override it up to the maximum)
+BLOG_PAGE_SIZE = 10
+BLOG_MAX_PAGE_SIZE = 50
+
 # Create directories if they don't exist
 os.makedirs(BLOG_ENTRIES_DIR, exist_ok=True)
 os.makedirs(COMMENTS_DIR, exist_ok=True)
 
+# Entry storage used when DB dependencies are not installed
+file_store = FileEntryStore(BLOG_ENTRIES_DIR, COMMENTS_DIR)
+
+# Rendered-page cache for the read-heavy listing and entry views.
+# PAGE_CACHE_DIR shares cached pages and invalidations between worker processes.
+page_cache = PageCache(
+    max_entries=int(os.getenv('PAGE_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('PAGE_CACHE_TTL', '300')),
+    directory=os.getenv('PAGE_CACHE_DIR') or None,
+)
+
+# Resized copies of entry media served by /media/<entry_id>, kept under MEDIA_CACHE_MAX_MB on disk
+media_cache = MediaCache(
+    os.getenv('MEDIA_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache'),
+    max_bytes=int(float(os.getenv('MEDIA_CACHE_MAX_MB', '200')) * 1024 * 1024),
+)
+MEDIA_MAX_AGE = 365 * 24 * 3600
+
+# Any committed write drops the affected entry page and every listing page
+# (listings show titles, previews and comment counts).
+blog_db.add_change_listener(lambda entry_id: page_cache.invalidate('listing', f'entry:{entry_id}'))
+
+
+def _page_cache_key(**params) -> str:
+    """Cache key: route path plus the normalised parameters that shape the page."""
+    query = urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+    return f"{request.path}?{query}"
+
+
+def _can_cache_page() -> bool:
+    # Pages carrying one-off flash messages must be neither served from nor stored in the cache
+    return request.method == 'GET' and not session.get('_flashes')
+
+
+def _page_response(page):
+    """Serve a CachedPage with validators; answers 304 when the client copy is current."""
+    resp = make_response(page.body)
+    resp.set_etag(page.etag)
+    resp.last_modified = datetime.datetime.fromtimestamp(page.last_modified, tz=datetime.timezone.utc)
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint. Set METRICS_TOKEN to require a bearer token."""
+    token = os.getenv('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return 'Forbidden', 403
+    resp = make_response(metrics.render())
+    resp.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return resp
+
 @app.route('/')
 def index():
     # Blog is the homepage
@@ -124,190 +266,265 @@ def pexels_search():
         return jsonify({'error': 'Query parameter is required'}), 400
 
     try:
-        if media_type == 'photos':
-            results = pexels.search_photos(query)
+        if media_type == 'all':
+            # Photos and videos are fetched concurrently
+            results = asyncio.run(pexels.search_all(query))
+        elif media_type == 'photos':
+            results = asyncio.run(pexels.search_photos(query))
         else:
-            results = pexels.search_videos(query)
+            results = asyncio.run(pexels.search_videos(query))
 
         return jsonify(results)
     except Exception as e:
         app.logger.error(f"Error searching Pexels API: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-# Blog routes
-@app.route('/blog')
-def blog():
-    """Display the blog homepage with a list of entries"""
+@app.route('/media/<entry_id>')
+def media(entry_id):
+    """Serve an entry's image (or a video's poster) from the local media cache.
+
+    ?size=thumb|content picks the width, ?format=webp asks for WebP. Sources
+    outside media_cache.allowed_hosts are neither fetched nor redirected to.
+    """
+    size = request.args.get('size', 'content')
+    if size not in VARIANT_WIDTHS:
+        abort(404)
+    info = _with_fallback('get_media', entry_id)
+    if not info:
+        abort(404)
+    # Videos are proxied as their poster image; the video itself streams from Pexels
+    source = info['thumbnail'] if size == 'thumb' or info['type'] == 'video' else info['url']
+    if not source or not media_cache.allows(source):
+        abort(404)
+    try:
+        path, content_type = media_cache.get(source, size, request.args.get('format'))
+    except MediaFetchError as e:
+        app.logger.warning(f"Media proxy falling back to source: {e}")
+        return redirect(source)
+    resp = send_file(path, mimetype=content_type, conditional=True, max_age=MEDIA_MAX_AGE)
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    return resp
+
+# File-based fallback (used when DB dependencies are not installed)
+def _db_unavailable(ex: Exception) -> bool:
+    return isinstance(ex, RuntimeError) and 'Database dependencies are not installed' in str(ex)
+
+
+def _with_fallback(name: str, *args, **kwargs):
+    """Call blog_db.<name>(*args); if DB deps are missing, use the file store's method of the same name."""
+    try:
+        return getattr(blog_db, name)(*args, **kwargs)
+    except RuntimeError as ex:
+        if not _db_unavailable(ex):
+            raise
+        return getattr(file_store, name)(*args, **kwargs)
+
+
+_file_search_index = InvertedIndex()
+_file_search_indexed: dict = {}  # entry id -> file mtime at indexing time
+_file_search_lock = threading.Lock()
+
+
+def _search_entry_files(query: str, per_page: int, page: int) -> tuple[int, list[dict]]:
+    """Fallback search over the file store using an in-memory inverted index.
+    Only entries whose files changed since the last search are re-indexed.
+    """
+    with _file_search_lock:
+        current = file_store.signature()
+        for entry_id in [i for i in _file_search_indexed if i not in current]:
+            _file_search_index.remove(entry_id)
+            del _file_search_indexed[entry_id]
+        for entry_id, mtime in current.items():
+            if _file_search_indexed.get(entry_id) == mtime:
+                continue
+            e = file_store.get_entry(entry_id)
+            if e is None:
+                continue
+            _file_search_index.add(entry_id, e['title'], e['content'],
+                                   author=e['author'], date=e['date'], media=e['media'])
+            _file_search_indexed[entry_id] = mtime
+        return _file_search_index.search(query, limit=per_page, offset=(page - 1) * per_page)
 
-    def _load_entries_from_files() -> list[dict]:
-        """Fallback: load entries from JSON files in BLOG_ENTRIES_DIR.
-        Expected JSON structure: {id,title,author,date,content,media?} per file.
-        Uses filename (without extension) as id if not present.
-        """
-        results: list[dict] = []
-        try:
-            if not os.path.isdir(BLOG_ENTRIES_DIR):
-                return results
-            for name in os.listdir(BLOG_ENTRIES_DIR):
-                if not name.lower().endswith('.json'):
-                    continue
-                path = os.path.join(BLOG_ENTRIES_DIR, name)
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if not isinstance(data, dict):
-                        continue
-                    entry_id = data.get('id') or os.path.splitext(name)[0]
-                    title = data.get('title') or 'Untitled'
-                    author = data.get('author') or 'Anonymous'
-                    date = data.get('date') or ''
-                    content = data.get('content') or ''
-                    media = data.get('media') if isinstance(data.get('media'), dict) else None
-                    # Count comments from filesystem (same as DB path does)
-                    comments_count = 0
-                    possible_json = os.path.join(COMMENTS_DIR, f"{entry_id}.json")
-                    if os.path.exists(possible_json):
-                        try:
-                            with open(possible_json, 'r', encoding='utf-8') as cf:
-                                comments = json.load(cf)
-                                if isinstance(comments, list):
-                                    comments_count = len(comments)
-                        except Exception:
-                            comments_count = 0
-                    # Preview like DB path does
-                    content_preview = content[:200] + '...' if len(content) > 200 else content
-                    results.append({
-                        'id': entry_id,
-                        'title': title,
-                        'author': author,
-                        'date': date,
-                        'content': content_preview,
-                        'comments_count': comments_count,
-                        'media': media,
-                    })
-                except Exception:
-                    # Skip malformed files
-                    continue
-            # Sort by date descending if possible
-            try:
-                from datetime import datetime
-                def parse_dt(s: str):
-                    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%Y%m%d_%H%M%S"):
-                        try:
-                            return datetime.strptime(s, fmt)
-                        except Exception:
-                            continue
-                    return datetime.min
-                results.sort(key=lambda e: parse_dt(e.get('date','')), reverse=True)
-            except Exception:
-                pass
-        except Exception:
-            pass
-        return results
 
-    # Load from database
+# Blog routes
+def _listing(filters: dict, heading=None, endpoint='blog', endpoint_args=None):
+    """Render one cached, keyset-paginated listing page, optionally filtered
+    (see blog_db.get_entry_page for ``filters``)."""
+    # Load one page from the database (keyset pagination, preview-only content)
     try:
-        from .blog_db import get_entries, init_schema
+        from .blog_db import get_entry_page, get_archive, get_tags
     except ImportError:
-        from blog_db import get_entries, init_schema
-
-    # Ensure schema exists
-    try:
-        init_schema()
-    except Exception as e:
-        app.logger.error(f"DB schema init failed: {e}")
-
-    entries: list[dict] = []
+        from blog_db import get_entry_page, get_archive, get_tags
+
+    per_page = request.args.get('per_page', BLOG_PAGE_SIZE, type=int)
+    per_page = max(1, min(per_page, BLOG_MAX_PAGE_SIZE))
+    before = request.args.get('before') or None
+    after = request.args.get('after') or None
+
+    cacheable = _can_cache_page()
+    cache_key = _page_cache_key(per_page=per_page, before=before, after=after)
+    if cacheable:
+        cached = page_cache.get(cache_key)
+        if cached is not None:
+            return _page_response(cached)
+    started = time.time()
+
+    entries: list = []
+    archive: list = []
+    tags: list = []
+    next_cursor = prev_cursor = None
+    from_db = False
     try:
-        db_entries = get_entries()
-        for e in db_entries:
-            content_preview = e['content'][:200] + '...' if len(e['content']) > 200 else e['content']
-            # Count comments from filesystem for now to avoid changing comments storage
-            comments_count = 0
-            # Comments still tied to filename; use entry id as key
-            possible_json = os.path.join(COMMENTS_DIR, f"{e['id']}.json")
-            if os.path.exists(possible_json):
-                try:
-                    with open(possible_json, 'r', encoding='utf-8') as cf:
-                        comments = json.load(cf)
-                        comments_count = len(comments) if isinstance(comments, list) else 0
-                except Exception:
-                    comments_count = 0
-
-            entries.append({
-                'id': e['id'],
-                'title': e['title'],
-                'author': e['author'],
-                'date': e['date'],
-                'content': content_preview,
-                'comments_count': comments_count,
-                'media': e.get('media')
-            })
+        try:
+            page = get_entry_page(per_page=per_page, before=before, after=after, **filters)
+        except ValueError:
+            # Malformed cursor in the URL: start again from the newest entries
+            page = get_entry_page(per_page=per_page, **filters)
+        entries = page['entries']
+        next_cursor = page['next_cursor']
+        prev_cursor = page['prev_cursor']
+        archive, tags = get_archive(), get_tags()
+        from_db = True
     except Exception as ex:
         # If DB dependencies are missing, fall back to file-based entries without logging an error
-        msg = str(ex)
-        if isinstance(ex, RuntimeError) and 'Database dependencies are not installed' in msg:
+        if _db_unavailable(ex):
             app.logger.info('DB deps missing; falling back to file-based entries in blog_entries directory.')
-            entries = _load_entries_from_files()
+            try:
+                page = file_store.page(per_page=per_page, before=before, after=after, **filters)
+            except ValueError:
+                page = file_store.page(per_page=per_page, **filters)
+            entries = page['entries']
+            next_cursor = page['next_cursor']
+            prev_cursor = page['prev_cursor']
+            archive, tags = file_store.get_archive(), file_store.get_tags()
         else:
             app.logger.error(f"Failed to load entries from DB: {ex}")
 
-    return render_template('blog.html', entries=entries)
+    html = render_template('blog.html',
+                           entries=entries,
+                           next_cursor=next_cursor,
+                           prev_cursor=prev_cursor,
+                           per_page=per_page if per_page != BLOG_PAGE_SIZE else None,
+                           heading=heading,
+                           endpoint=endpoint,
+                           endpoint_args=endpoint_args or {},
+                           archive=archive,
+                           tags=tags)
+    if not (cacheable and from_db):
+        return html
+    return _page_response(page_cache.set(cache_key, html, tags=('listing',), since=started))
+
+@app.route('/blog')
+def blog():
+    """Display the blog homepage with a list of entries"""
+    return _listing({})
+
+@app.route('/blog/tag/<tag>')
+def tag_listing(tag):
+    """Entries with one tag, newest first"""
+    name = blog_db.normalize_tag(tag)
+    if not name:
+        abort(404)
+    if name != tag:
+        return redirect(url_for('tag_listing', tag=name, **request.args), code=301)
+    return _listing({'tag': name}, heading=f'Tagged “{name}”',
+                    endpoint='tag_listing', endpoint_args={'tag': name})
+
+@app.route('/blog/archive/<int:year>/<int:month>')
+def archive_listing(year, month):
+    """Entries created in one calendar month, newest first"""
+    if not (1 <= month <= 12 and 1 <= year < 9999):
+        abort(404)
+    start = datetime.datetime(year, month, 1)
+    end = datetime.datetime(year + 1, 1, 1) if month == 12 else datetime.datetime(year, month + 1, 1)
+    return _listing({'start': start, 'end': end}, heading=start.strftime('%B %Y'),
+                    endpoint='archive_listing', endpoint_args={'year': year, 'month': month})
+
+@app.route('/blog/search')
+def search():
+    """Full-text search over entry titles and content, ranked and paginated"""
+    try:
+        from .blog_db import search_entries
+    except ImportError:
+        from blog_db import search_entries
+
+    query = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = BLOG_PAGE_SIZE
+
+    hits: list[dict] = []
+    total = 0
+    if query:
+        try:
+            result = search_entries(query, per_page=per_page, page=page)
+            hits, total = result['hits'], result['total']
+        except Exception as ex:
+            if _db_unavailable(ex):
+                total, hits = _search_entry_files(query, per_page, page)
+            else:
+                app.logger.error(f"Search failed: {ex}")
+                flash('Search is unavailable right now. Please try again.', 'error')
+
+    terms = tokenize(query)
+    results = [{
+        'id': h['id'],
+        'title': h['title'],
+        'author': h['author'],
+        'date': h['date'],
+        'snippet': make_snippet(h['content'], terms),
+        'media': h.get('media'),
+    } for h in hits]
+
+    pages = (total + per_page - 1) // per_page
+    return render_template('search.html',
+                           query=query,
+                           results=results,
+                           total=total,
+                           page=page,
+                           pages=pages)
 
 @app.route('/blog/entry/<entry_id>')
 def view_entry(entry_id):
     """Display a single blog entry with its comments"""
+    cacheable = _can_cache_page()
+    cache_key = _page_cache_key()
+    if cacheable:
+        cached = page_cache.get(cache_key)
+        if cached is not None:
+            return _page_response(cached)
+    started = time.time()
+
     # Load entry from database
     try:
-        from .blog_db import get_entry, init_schema
+        from .blog_db import get_entry, get_comments
     except ImportError:
-        from blog_db import get_entry, init_schema
-    try:
-        init_schema()
-    except Exception as e:
-        app.logger.error(f"DB schema init failed: {e}")
+        from blog_db import get_entry, get_comments
 
+    from_files = False
     try:
         entry = get_entry(entry_id)
+        comments = get_comments(entry_id) if entry else []
     except Exception as ex:
         # Fallback to file-based entry if DB deps missing
-        if isinstance(ex, RuntimeError) and 'Database dependencies are not installed' in str(ex):
-            path = os.path.join(BLOG_ENTRIES_DIR, f"{entry_id}.json")
-            entry = None
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if isinstance(data, dict):
-                        entry = {
-                            'id': entry_id,
-                            'title': data.get('title') or 'Untitled',
-                            'author': data.get('author') or 'Anonymous',
-                            'date': data.get('date') or '',
-                            'content': data.get('content') or '',
-                            'media': data.get('media') if isinstance(data.get('media'), dict) else None,
-                        }
-            except Exception:
-                entry = None
+        if _db_unavailable(ex):
+            from_files = True
+            entry = file_store.get_entry(entry_id)
+            comments = file_store.get_comments(entry_id)
         else:
             raise
     if not entry:
         flash('Entry not found', 'error')
         return redirect(url_for('blog'))
+    tags = _with_fallback('get_entry_tags', entry_id)
 
-    # Get comments
-    comments = []
-    comment_file = os.path.join(COMMENTS_DIR, f"{entry_id}.json")
-    if os.path.exists(comment_file):
-        try:
-            with open(comment_file, 'r', encoding='utf-8') as cf:
-                comments = json.load(cf)
-        except Exception:
-            comments = []
-
-    return render_template('entry.html', 
-                         entry=entry, 
-                         comments=comments)
+    html = render_template('entry.html',
+                           entry=entry,
+                           comments=comments,
+                           tags=tags)
+    if not cacheable or from_files:
+        return html
+    return _page_response(page_cache.set(cache_key, html, tags=(f'entry:{entry_id}',), since=started))
 
 @app.route('/blog/new', methods=['GET', 'POST'])
 def new_entry():
@@ -316,13 +533,15 @@ def new_entry():
         title = request.form.get('title', '').strip()
         content = request.form.get('content', '').strip()
         author = request.form.get('author', '').strip() or 'Anonymous'
+        tags = request.form.get('tags', '')
 
         if not title or not content:
             flash('Title and content are required', 'error')
             return render_template('new_entry.html', 
                                   title=title, 
                                   content=content, 
-                                  author=author)
+                                  author=author,
+                                  tags=tags)
 
         try:
             # Grammar checker removed: use content as-is
@@ -342,17 +561,11 @@ def new_entry():
                     'attribution': request.form.get('media_attribution')
                 }
 
-            # Save the entry to database
-            try:
-                from .blog_db import insert_entry, init_schema
-            except ImportError:
-                from blog_db import insert_entry, init_schema
-            try:
-                init_schema()
-            except Exception as e:
-                app.logger.error(f"DB schema init failed: {e}")
-
-            entry_id = insert_entry(corrected_title, corrected_content, author, media)
+            # Save the entry to database (or the file store when DB deps are missing)
+            entry_id = _with_fallback('insert_entry', corrected_title, corrected_content, author, media)
+            tag_list = blog_db.normalize_tags(tags)
+            if tag_list:
+                _with_fallback('set_entry_tags', entry_id, tag_list)
 
             flash('Blog entry created successfully', 'success')
             return redirect(url_for('view_entry', entry_id=entry_id))
@@ -362,24 +575,16 @@ def new_entry():
             return render_template('new_entry.html', 
                                   title=title, 
                                   content=content, 
-                                  author=author)
+                                  author=author,
+                                  tags=tags)
 
     return render_template('new_entry.html')
 
 @app.route('/blog/entry/<entry_id>/edit', methods=['GET', 'POST'])
 def edit_entry(entry_id):
     """Edit an existing blog entry"""
-    # Load from DB
-    try:
-        from .blog_db import get_entry, update_entry, init_schema
-    except ImportError:
-        from blog_db import get_entry, update_entry, init_schema
-    try:
-        init_schema()
-    except Exception as e:
-        app.logger.error(f"DB schema init failed: {e}")
-
-    entry = get_entry(entry_id)
+    # Load from DB (or the file store when DB deps are missing)
+    entry = _with_fallback('get_entry', entry_id)
     if not entry:
         flash('Entry not found', 'error')
         return redirect(url_for('blog'))
@@ -389,12 +594,15 @@ def edit_entry(entry_id):
     date_str = entry['date']
     media = entry.get('media')
     entry_content = entry['content']
+    version = entry.get('version')
+    tags = ', '.join(_with_fallback('get_entry_tags', entry_id))
 
     if request.method == 'POST':
         # Get form data
         new_title = request.form.get('title', '').strip()
         new_content = request.form.get('content', '').strip()
         new_author = request.form.get('author', '').strip() or author
+        new_tags = request.form.get('tags')
 
         if not new_title or not new_content:
             flash('Title and content are required', 'error')
@@ -402,8 +610,10 @@ def edit_entry(entry_id):
                                   title=new_title, 
                                   content=new_content, 
                                   author=new_author,
+                                  tags=new_tags,
                                   is_edit=True,
                                   entry_id=entry_id,
+                                  version=request.form.get('version', type=int),
                                   media=media)
 
         try:
@@ -426,18 +636,40 @@ def edit_entry(entry_id):
             else:
                 new_media = media
 
-            # Save the updated entry in DB (entry_id remains the same)
-            updated = update_entry(entry_id, corrected_title, corrected_content, new_author, new_media)
+            # Save the updated entry in DB (entry_id remains the same). The
+            # version the form was loaded with makes the write conditional, so
+            # a concurrent edit is reported instead of silently overwritten.
+            try:
+                updated = _with_fallback('update_entry', entry_id, corrected_title, corrected_content,
+                                         new_author, new_media,
+                                         expected_version=request.form.get('version', type=int))
+            except blog_db.VersionConflict as conflict:
+                flash('This entry was changed by someone else while you were editing. '
+                      'Review your changes and save again to overwrite.', 'error')
+                return render_template('new_entry.html',
+                                       title=new_title,
+                                       content=new_content,
+                                       author=new_author,
+                                       tags=new_tags,
+                                       is_edit=True,
+                                       entry_id=entry_id,
+                                       version=conflict.current,
+                                       media=new_media), 409
             if not updated:
                 flash('Failed to update entry', 'error')
                 return render_template('new_entry.html', 
                                       title=new_title, 
                                       content=new_content, 
                                       author=new_author,
+                                      tags=new_tags,
                                       is_edit=True,
                                       entry_id=entry_id,
+                                      version=request.form.get('version', type=int),
                                       media=new_media)
 
+            if new_tags is not None:
+                _with_fallback('set_entry_tags', entry_id, blog_db.normalize_tags(new_tags))
+
             flash('Blog entry updated successfully', 'success')
             return redirect(url_for('view_entry', entry_id=entry_id))
         except Exception as e:
@@ -447,8 +679,10 @@ def edit_entry(entry_id):
                                   title=new_title, 
                                   content=new_content, 
                                   author=new_author,
+                                  tags=new_tags,
                                   is_edit=True,
                                   entry_id=entry_id,
+                                  version=request.form.get('version', type=int),
                                   media=media)
 
     # GET request - show the edit form
@@ -456,30 +690,23 @@ def edit_entry(entry_id):
                           title=title, 
                           content=entry_content, 
                           author=author,
+                          tags=tags,
                           is_edit=True,
                           entry_id=entry_id,
+                          version=version,
                           media=media)
 
 @app.route('/blog/entry/<entry_id>/delete', methods=['POST'])
 def delete_entry(entry_id):
     """Delete a blog entry and its comments"""
-    # Delete from DB
-    try:
-        from .blog_db import delete_entry as db_delete_entry, init_schema
-    except ImportError:
-        from blog_db import delete_entry as db_delete_entry, init_schema
-    try:
-        init_schema()
-    except Exception as e:
-        app.logger.error(f"DB schema init failed: {e}")
-
     try:
-        deleted = db_delete_entry(entry_id)
+        # Delete from DB (or the file store when DB deps are missing)
+        deleted = _with_fallback('delete_entry', entry_id)
         if not deleted:
             flash('Entry not found', 'error')
             return redirect(url_for('blog'))
 
-        # Delete the comment file if it exists
+        # Comment rows are removed with the entry; also drop any legacy JSON file
         comment_file = os.path.join(COMMENTS_DIR, f"{entry_id}.json")
         if os.path.exists(comment_file):
             os.remove(comment_file)
@@ -491,23 +718,29 @@ def delete_entry(entry_id):
         flash('An error occurred while deleting the blog entry. Please try again.', 'error')
         return redirect(url_for('view_entry', entry_id=entry_id))
 
-@app.route('/blog/entry/<entry_id>/comment', methods=['POST'])
-def add_comment(entry_id):
-    """Add a comment to a blog entry"""
-    # Verify entry exists in DB
-    try:
-        from .blog_db import get_entry, init_schema
-    except ImportError:
-        from blog_db import get_entry, init_schema
+@app.route('/blog/entries/bulk', methods=['POST'])
+def bulk_update_entries():
+    """Apply a batch of partial entry updates in one transaction.
+
+    Body: {"changes": [{"id": ..., "version": ..., "title"/"author"/"content"/"media": ...}, ...]}.
+    Changes whose version is stale are skipped and reported as conflicts.
+    """
+    payload = request.get_json(silent=True) or {}
+    changes = payload.get('changes')
+    if not isinstance(changes, list) or not all(isinstance(c, dict) and c.get('id') for c in changes):
+        return jsonify({'error': 'Expected {"changes": [{"id": ..., ...}, ...]}'}), 400
     try:
-        init_schema()
+        result = _with_fallback('bulk_update_entries', changes)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        app.logger.error(f"DB schema init failed: {e}")
-    entry = get_entry(entry_id)
-    if not entry:
-        flash('Entry not found', 'error')
-        return redirect(url_for('blog'))
+        app.logger.error(f"Error applying bulk update: {e}")
+        return jsonify({'error': 'Bulk update failed'}), 500
+    return jsonify(result)
 
+@app.route('/blog/entry/<entry_id>/comment', methods=['POST'])
+def add_comment(entry_id):
+    """Add a comment to a blog entry"""
     # Get comment data
     author = request.form.get('author', '').strip() or 'Anonymous'
     content = request.form.get('content', '').strip()
@@ -520,25 +753,10 @@ def add_comment(entry_id):
     corrected_content = content
 
     try:
-        # Create comment object
-        comment = {
-            'author': author,
-            'content': corrected_content,
-            'date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-        # Save the comment JSON keyed by entry_id
-        comment_file = os.path.join(COMMENTS_DIR, f"{entry_id}.json")
-        comments = []
-
-        if os.path.exists(comment_file):
-            with open(comment_file, 'r', encoding='utf-8') as f:
-                comments = json.load(f)
-
-        comments.append(comment)
-
-        with open(comment_file, 'w', encoding='utf-8') as f:
-            json.dump(comments, f, indent=2)
+        # Single INSERT ... SELECT: nothing is written if the entry does not exist
+        if not _with_fallback('add_comment', entry_id, author, corrected_content):
+            flash('Entry not found', 'error')
+            return redirect(url_for('blog'))
 
         flash('Comment added successfully', 'success')
         return redirect(url_for('view_entry', entry_id=entry_id))
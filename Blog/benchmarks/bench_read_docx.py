@@ -0,0 +1,113 @@
+"""
+Compare the streaming .docx reader with loading the whole document.
+
+Builds a synthetic manuscript (default ~500 pages), then runs each reader in
+a fresh subprocess and reports peak RSS and time to the first paragraph:
+
+    python benchmarks/bench_read_docx.py --pages 500
+
+"streaming" is txt_reviewer.iter_docx_paragraphs(); "python-docx" is the
+previous docx.Document(...).paragraphs approach and is skipped if
+python-docx is not installed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+BLOG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+SENTENCE = "Today I walked along the river and thought about the week ahead. "
+
+# Run inside a child process so each reader's peak RSS is measured on its own
+CHILD = r'''
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+mode, path = sys.argv[2], sys.argv[3]
+if mode == "streaming":
+    import txt_reviewer
+    start = time.perf_counter()
+    paragraphs = txt_reviewer.iter_docx_paragraphs(path)
+else:
+    import docx
+    start = time.perf_counter()
+    paragraphs = (p.text for p in docx.Document(path).paragraphs)
+first = None
+count = 0
+for text in paragraphs:
+    if first is None:
+        first = time.perf_counter() - start
+    count += 1
+total = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({"first": first, "total": total, "paragraphs": count, "rss_kb": rss_kb}))
+'''
+
+
+def write_document(path, pages, paragraphs_per_page=12, sentences=6):
+    """Write a minimal but valid .docx with pages * paragraphs_per_page paragraphs."""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', RELS)
+        with archive.open('word/document.xml', 'w') as xml:
+            xml.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      f'<w:document xmlns:w="{W_NS}"><w:body>'.encode('utf-8'))
+            for i in range(pages * paragraphs_per_page):
+                text = f"{i}. " + SENTENCE * sentences
+                xml.write(f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'.encode('utf-8'))
+            xml.write(b'<w:sectPr/></w:body></w:document>')
+
+
+def run(mode, path):
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, BLOG_DIR, mode, path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500, help='Synthetic document length in pages')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'manuscript.docx')
+        write_document(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024:.0f} KB on disk")
+        print(f"{'reader':<12} {'paragraphs':>10} {'first (ms)':>11} {'total (s)':>10} {'peak RSS (MB)':>14}")
+        for mode in ('streaming', 'python-docx'):
+            try:
+                r = run(mode, path)
+            except subprocess.CalledProcessError as e:
+                print(f"{mode:<12} skipped: {e.stderr.strip().splitlines()[-1]}")
+                continue
+            print(f"{mode:<12} {r['paragraphs']:>10} {r['first'] * 1000:>11.1f} "
+                  f"{r['total']:>10.2f} {r['rss_kb'] / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark: blog_db row mapping into __slots__ dataclasses versus the
+previous per-row dict construction (with eager strftime and a nested media
+dict), over synthetic rows shaped like _entry_columns():
+
+    python benchmarks/bench_row_mapping.py --rows 10000
+
+Reports mapping time (best of --repeat) and memory allocated for the mapped
+rows (tracemalloc). "view" additionally formats every date, as a template
+rendering all rows would.
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+BLOG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+
+
+def legacy_row_to_entry(r):
+    """The mapping blog_db used before Entry/Media (kept here for comparison)."""
+    media = None
+    if r[5]:
+        media = {
+            "id": r[5],
+            "type": r[6] or "",
+            "url": r[7] or "",
+            "thumbnail": r[8] or "",
+            "width": r[9] or "",
+            "height": r[10] or "",
+            "attribution": r[11] or "",
+        }
+    return {
+        "id": r[0],
+        "title": r[1],
+        "author": r[2],
+        "date": r[3].strftime("%Y-%m-%d %H:%M:%S"),
+        "content": r[4],
+        "media": media,
+    }
+
+
+def make_rows(n):
+    base = datetime.datetime(2025, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(n):
+        has_media = i % 2 == 0
+        rows.append((
+            f"20250101_080000_Entry_{i}", f"Entry {i}", "Derek", base + datetime.timedelta(minutes=i),
+            "x" * 200,
+            str(1000 + i) if has_media else None,
+            "photo" if has_media else None,
+            "https://images.pexels.com/photos/1/original.jpeg" if has_media else None,
+            "https://images.pexels.com/photos/1/medium.jpeg" if has_media else None,
+            "4000" if has_media else None, "3000" if has_media else None,
+            "Photo by Someone on Pexels" if has_media else None,
+        ))
+    return rows
+
+
+def measure(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    kept = fn(rows)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return best, current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.rows)
+    cases = {
+        "dict (before)": lambda rs: [legacy_row_to_entry(r) for r in rs],
+        "dataclass": lambda rs: [blog_db._row_to_entry(r) for r in rs],
+        "dataclass+view": lambda rs: [(e, e.date) for e in (blog_db._row_to_entry(r) for r in rs)],
+    }
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'mapping':<16} {'time (ms)':>10} {'retained (KB)':>14} {'peak (KB)':>10}")
+    for name, fn in cases.items():
+        best, current, peak = measure(fn, rows, args.repeat)
+        print(f"{name:<16} {best * 1000:>10.1f} {current / 1024:>14.0f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Load test for the Blog app.
+
+Seeds N entries and M comments, serves the app from a local threaded server
+and drives it with concurrent clients, then reports latency percentiles and
+throughput per scenario:
+
+    python benchmarks/load_test.py --backend files --entries 500 --comments 2000 \\
+        --concurrency 8 --requests 5000
+
+Scenarios (weights set with --mix): ``list`` (/blog), ``entry``
+(/blog/entry/<id>), ``comment`` (POST a comment), ``create`` (POST a new
+entry) and ``pexels`` (/pexels/search?type=all). Pexels is always stubbed,
+so the run needs no network.
+
+Backends:
+    files  entries/comments in a temporary directory (the no-database fallback)
+    sqlite a temporary SQLite database (DB_BACKEND=sqlite)
+    mysql  the configured MySQL server, using the database named by --db-name
+           (default blog_loadtest) so real data is never touched
+
+Use --max-p95-ms / --max-error-rate to turn a run into a pass/fail gate
+(exit status 1), and --json to keep the numbers for comparison.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+BLOG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+DEFAULT_MIX = "list=45,entry=35,comment=10,create=5,pexels=5"
+WORDS = ("river morning coffee garden train letter quiet storm window market "
+         "bridge autumn lantern harbor meadow notebook evening journey").split()
+
+
+# --------------------------------------------------
+# Offline Pexels stand-in
+# --------------------------------------------------
+class _StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class StubPexelsTransport:
+    """Answers Pexels searches with canned results after ``delay`` seconds."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        await asyncio.sleep(self.delay)
+        if "/videos" in url:
+            item = {"id": 1, "image": "", "width": 1920, "height": 1080,
+                    "user": {"name": "Stub", "url": ""}, "video_files": []}
+            return _StubResponse({"videos": [item] * 10, "total_results": 10})
+        item = {"id": 1, "width": 1200, "height": 800, "photographer": "Stub", "photographer_url": "",
+                "src": {"medium": "", "original": ""}}
+        return _StubResponse({"photos": [item] * 10, "total_results": 10})
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+@contextmanager
+def _patched(obj, **attrs):
+    saved = {name: getattr(obj, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(obj, name, value)
+
+
+# --------------------------------------------------
+# Scenarios: each takes (session, base_url, state, rng) and returns a response
+# --------------------------------------------------
+def _scenario_list(session, base, state, rng):
+    return session.get(f"{base}/blog")
+
+
+def _scenario_entry(session, base, state, rng):
+    return session.get(f"{base}/blog/entry/{rng.choice(state['entry_ids'])}")
+
+
+def _scenario_comment(session, base, state, rng):
+    entry_id = rng.choice(state["entry_ids"])
+    return session.post(f"{base}/blog/entry/{entry_id}/comment",
+                        data={"author": "load", "content": _text(rng, 12)}, allow_redirects=False)
+
+
+def _scenario_create(session, base, state, rng):
+    with state["lock"]:
+        state["created"] += 1
+        n = state["created"]
+    return session.post(f"{base}/blog/new",
+                        data={"title": f"Load entry {n:06d}", "author": "load", "content": _text(rng, 120)},
+                        allow_redirects=False)
+
+
+def _scenario_pexels(session, base, state, rng):
+    return session.get(f"{base}/pexels/search", params={"query": rng.choice(WORDS), "type": "all"})
+
+
+SCENARIOS = {
+    "list": _scenario_list,
+    "entry": _scenario_entry,
+    "comment": _scenario_comment,
+    "create": _scenario_create,
+    "pexels": _scenario_pexels,
+}
+
+
+# --------------------------------------------------
+# Seeding
+# --------------------------------------------------
+def seed(store, entries, comments, rng):
+    """Insert entries and comments through the store's write API; returns entry ids."""
+    ids = []
+    for i in range(entries):
+        ids.append(store.insert_entry(f"Seed entry {i:06d}", _text(rng, 150), "seed", None))
+    for _ in range(comments if ids else 0):
+        store.add_comment(rng.choice(ids), "seed", _text(rng, 15))
+    return ids
+
+
+@contextmanager
+def prepared_app(backend, workdir, db_name):
+    """Import the app wired to the chosen backend and a stubbed Pexels client."""
+    os.environ.setdefault("DISABLE_PROD_REDIRECT", "1")
+    if backend == "mysql":
+        os.environ["DB_NAME"] = db_name
+    import blog_db
+    import app as blog_app
+    from file_store import FileEntryStore
+    from pexels_async import AsyncPexelsAPI
+
+    pexels = AsyncPexelsAPI("stub", cache_ttl=0, transport=StubPexelsTransport())
+    if backend == "files":
+        entries_dir = os.path.join(workdir, "blog_entries")
+        comments_dir = os.path.join(workdir, "blog_comments")
+        os.makedirs(entries_dir)
+        store = FileEntryStore(entries_dir, comments_dir)
+        with _patched(blog_db, MySQLdb=None), \
+                _patched(blog_app, file_store=store, pexels=pexels,
+                         BLOG_ENTRIES_DIR=entries_dir, COMMENTS_DIR=comments_dir):
+            yield blog_app, store
+    elif backend == "sqlite":
+        with _patched(blog_db, DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(workdir, "blog.sqlite3"),
+                      _pool=None, _schema_version=None), \
+                _patched(blog_app, pexels=pexels):
+            pool = blog_db.init_db()
+            try:
+                yield blog_app, blog_db
+            finally:
+                pool.close()
+    else:
+        if blog_db.DB_NAME != db_name:
+            raise SystemExit("Set DB_NAME before blog_db is imported, or run this script directly.")
+        blog_db.init_db()
+        with _patched(blog_app, pexels=pexels):
+            yield blog_app, blog_db
+
+
+@contextmanager
+def serving(app):
+    from werkzeug.serving import make_server
+
+    # Per-request access logging would dominate the measurements
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+def drive(base, state, mix, concurrency, total_requests, duration, seed_value):
+    """Run the workload; returns ({scenario: [latency seconds]}, {scenario: errors}, wall seconds)."""
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    latencies = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(index):
+        rng = random.Random(seed_value * 1000 + index)
+        session = requests.Session()
+        while True:
+            with lock:
+                if deadline is None and issued[0] >= total_requests:
+                    return
+                issued[0] += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = SCENARIOS[name](session, base, state, rng).status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies, errors, wall):
+    rows = {}
+    everything = []
+    for name, values in latencies.items():
+        values = sorted(values)
+        everything.extend(values)
+        rows[name] = _row(values, errors[name], wall)
+    rows["total"] = _row(sorted(everything), sum(errors.values()), wall)
+    return rows
+
+
+def _row(values, errors, wall):
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": len(values) / wall if wall else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] * 1000) if values else 0.0,
+    }
+
+
+def print_report(rows, out=sys.stdout):
+    out.write(f"{'scenario':<10} {'requests':>8} {'errors':>6} {'req/s':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}\n")
+    for name, r in rows.items():
+        out.write(f"{name:<10} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("files", "sqlite", "mysql"), default="files")
+    parser.add_argument("--db-name", default="blog_loadtest", help="MySQL database used by the mysql backend")
+    parser.add_argument("--entries", type=int, default=200, help="Entries to seed")
+    parser.add_argument("--comments", type=int, default=1000, help="Comments to seed across the entries")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Run for this many seconds instead")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for reproducible runs")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if the overall p95 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Fail if more than this fraction of requests fail")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as workdir, prepared_app(args.backend, workdir, args.db_name) as (blog_app, store):
+        started = time.perf_counter()
+        entry_ids = seed(store, args.entries, args.comments, rng)
+        print(f"Seeded {len(entry_ids)} entries and {args.comments if entry_ids else 0} comments "
+              f"({args.backend}) in {time.perf_counter() - started:.1f}s")
+        if not entry_ids:
+            parser.error("--entries must be at least 1")
+        blog_app.page_cache.clear()
+        state = {"entry_ids": entry_ids, "created": 0, "lock": threading.Lock()}
+        with serving(blog_app.app) as base:
+            latencies, errors, wall = drive(base, state, args.mix, args.concurrency,
+                                            args.requests, args.duration, args.seed)
+
+    rows = summarize(latencies, errors, wall)
+    print(f"{rows['total']['requests']} requests, concurrency {args.concurrency}, {wall:.1f}s")
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "json"}, "results": rows}, f, indent=2)
+
+    total = rows["total"]
+    failed = False
+    if total["requests"] and total["errors"] / total["requests"] > args.max_error_rate:
+        print(f"FAIL: error rate {total['errors'] / total['requests']:.2%} > {args.max_error_rate:.2%}")
+        failed = True
+    if args.max_p95_ms is not None and total["p95_ms"] > args.max_p95_ms:
+        print(f"FAIL: p95 {total['p95_ms']:.1f} ms > {args.max_p95_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,14 @@
+import functools
 import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Union
 import datetime
 
 try:
@@ -8,7 +16,10 @@ try:
 except Exception:
     load_dotenv = None
 
-import MySQLdb
+try:
+    import MySQLdb
+except Exception:
+    MySQLdb = None
 
 # --------------------------------------------------
 # Load .env
@@ -25,10 +36,31 @@ DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_NAME = os.getenv("DB_NAME", "local_app_db")
 
+# Pool sizing. PythonAnywhere drops idle MySQL connections after ~300s, so
+# idle connections are evicted a little before that.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "240"))
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
+# Storage backend: "mysql" (default) or "sqlite", a single local file that
+# needs no server (handy for local runs, tests and small deployments).
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").strip().lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", str(Path(__file__).with_name("blog.sqlite3")))
+BACKENDS = ("mysql", "sqlite")
+
 # --------------------------------------------------
 # Database helpers
 # --------------------------------------------------
+def _require_driver():
+    if MySQLdb is None:
+        raise RuntimeError(
+            "Database dependencies are not installed (pip install mysqlclient)."
+        )
+
+
 def _ensure_database_exists():
+    _require_driver()
     conn = MySQLdb.connect(
         host=DB_HOST,
         port=DB_PORT,
@@ -52,8 +84,23 @@ def _ensure_database_exists():
         conn.close()
 
 
-def open_connection():
-    _ensure_database_exists()
+_database_checked = False
+_database_lock = threading.Lock()
+
+
+def _ensure_database_once():
+    """Run CREATE DATABASE IF NOT EXISTS only once per process."""
+    global _database_checked
+    if _database_checked:
+        return
+    with _database_lock:
+        if not _database_checked:
+            _ensure_database_exists()
+            _database_checked = True
+
+
+def _connect():
+    _require_driver()
     return MySQLdb.connect(
         host=DB_HOST,
         port=DB_PORT,
@@ -66,6 +113,14 @@ def open_connection():
     )
 
 
+def open_connection():
+    """Open a standalone (unpooled) connection, e.g. for one-off scripts."""
+    if DB_BACKEND == "sqlite":
+        return _connect_sqlite()
+    _ensure_database_once()
+    return _connect()
+
+
 def _close(conn):
     try:
         conn.close()
@@ -73,13 +128,372 @@ def _close(conn):
         pass
 
 # --------------------------------------------------
-# Schema
+# Connection pool
 # --------------------------------------------------
-def init_schema() -> None:
-    conn = open_connection()
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB connections.
+
+    - At most ``max_size`` connections exist at once (idle + checked out).
+    - Idle connections are reused most-recently-used first and closed once
+      they have been idle longer than ``max_idle`` seconds.
+    - A connection idle longer than ``ping_after`` seconds is pinged on
+      checkout and transparently replaced if the server has dropped it.
+    - ``pin()``/``unpin()`` keep the first connection checked out by a thread
+      until the end of the current request, so several helpers called from
+      one request share one connection.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 5,
+        timeout: float = 10.0,
+        max_idle: float = 240.0,
+        ping_after: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self._idle: List[tuple] = []  # (conn, last_used) with most recent last
+        self._checked_out = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._closed = False
+
+    # -- bookkeeping ------------------------------------------------------
+    @property
+    def size(self) -> int:
+        with self._cond:
+            return self._checked_out + len(self._idle)
+
+    @property
+    def idle_count(self) -> int:
+        with self._cond:
+            return len(self._idle)
+
+    def _pop_expired_locked(self, now: float) -> List[Any]:
+        expired = [c for c, used in self._idle if now - used > self.max_idle]
+        if expired:
+            self._idle = [(c, used) for c, used in self._idle if now - used <= self.max_idle]
+        return expired
+
+    def _is_alive(self, conn) -> bool:
+        try:
+            conn.ping()
+            return True
+        except Exception:
+            return False
+
+    # -- checkout / checkin ----------------------------------------------
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        conn = None
+        last_used = 0.0
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            while True:
+                now = time.monotonic()
+                expired = self._pop_expired_locked(now)
+                if expired:
+                    for c in expired:
+                        _close(c)
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._checked_out < self.max_size:
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+            self._checked_out += 1
+
+        try:
+            if conn is not None and time.monotonic() - last_used > self.ping_after:
+                if not self._is_alive(conn):
+                    _close(conn)
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        with self._cond:
+            self._checked_out -= 1
+            if discard or self._closed:
+                expired = [conn]
+            else:
+                now = time.monotonic()
+                self._idle.append((conn, now))
+                expired = self._pop_expired_locked(now)
+            self._cond.notify()
+        for c in expired:
+            _close(c)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the ``with`` block.
+
+        Reuses the connection pinned to the current thread if there is one.
+        """
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        conn = self.acquire()
+        if getattr(self._local, "pinning", False):
+            self._local.conn = conn
+            yield conn
+            return
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            discard = not _rollback(conn)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def pin(self) -> None:
+        """Hold the next connection checked out by this thread until unpin()."""
+        self._local.pinning = True
+
+    def unpin(self) -> None:
+        self._local.pinning = False
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            self.release(conn, discard=not _rollback(conn))
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for c, _ in idle:
+            _close(c)
+
+
+# --------------------------------------------------
+# SQLite backend
+# --------------------------------------------------
+# DATETIME columns round-trip as datetime objects, like they do with MySQLdb.
+# Timestamps are stored as ISO text with a fixed precision so that keyset
+# comparisons on the text order the same way as the datetimes.
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" ", "microseconds"))
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+@functools.lru_cache(maxsize=256)
+def _qmark(sql: str) -> str:
+    """MySQLdb's %s placeholders -> sqlite3's ?. Cached, so a repeated query
+    keeps the same text and hits sqlite3's prepared-statement cache."""
+    return sql.replace("%s", "?")
+
+
+class _SQLiteCursor:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, args=None):
+        return self._cur.execute(_qmark(sql), args or ())
+
+    def executemany(self, sql, args):
+        return self._cur.executemany(_qmark(sql), args)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _SQLiteConnection:
+    """sqlite3 connection accepting the MySQLdb-style SQL used in this module."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _SQLiteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _connect_sqlite() -> _SQLiteConnection:
+    directory = os.path.dirname(os.path.abspath(SQLITE_PATH))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(
+        SQLITE_PATH,
+        timeout=DB_POOL_TIMEOUT,  # wait this long for another writer's lock
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,  # closed from ThreadConnections.close()
+        cached_statements=256,
+    )
+    # WAL lets readers run alongside the (single) writer; NORMAL sync is
+    # durable across application crashes, and only risks the last commits on
+    # power loss.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return _SQLiteConnection(conn)
+
+
+class ThreadConnections:
+    """
+    One SQLite connection per thread, opened on first use and kept for every
+    later call from that thread. Same interface as ConnectionPool, so the
+    query functions do not know which backend they run on.
+
+    Connections belonging to finished threads are closed when their
+    thread-local storage is collected.
+    """
+
+    def __init__(self, connect: Callable[[], Any]):
+        self._connect = connect
+        self._local = threading.local()
+        self._open = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    def _get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                self._open.add(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._get()
+        try:
+            yield conn
+        except Exception:
+            _rollback(conn)
+            raise
+
+    def pin(self) -> None:
+        """Connections are already shared per thread; nothing to do."""
+
+    def unpin(self) -> None:
+        # End of request: drop anything left uncommitted, keep the connection
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            _rollback(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            conns, self._open = list(self._open), weakref.WeakSet()
+        self._local = threading.local()
+        for c in conns:
+            _close(c)
+
+
+def _rollback(conn) -> bool:
+    """Discard any uncommitted work; returns False if the connection is unusable."""
     try:
-        cur = conn.cursor()
-        cur.execute(
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+Pool = Union[ConnectionPool, ThreadConnections]
+
+_pool: Optional[Pool] = None
+_pool_lock = threading.Lock()
+
+
+def init_pool() -> Pool:
+    """Create the shared pool, verifying the database exists first.
+
+    Normally called via init_db() at application startup; get_pool() falls
+    back to it lazily if startup could not reach the server. With
+    DB_BACKEND=sqlite this is a per-thread connection holder instead.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and DB_BACKEND == "sqlite":
+            _pool = ThreadConnections(_connect_sqlite)
+        elif _pool is None:
+            if DB_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown DB_BACKEND {DB_BACKEND!r}; expected one of {BACKENDS}")
+            _ensure_database_once()
+            _pool = ConnectionPool(
+                _connect,
+                max_size=DB_POOL_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                max_idle=DB_POOL_MAX_IDLE,
+                ping_after=DB_POOL_PING_AFTER,
+            )
+        return _pool
+
+
+def get_pool() -> Pool:
+    if _pool is not None and _schema_version is not None:
+        return _pool
+    return init_db()
+
+
+@contextmanager
+def connection():
+    """Context manager yielding a pooled connection.
+
+    While query listeners are registered the connection's cursors are timed.
+    """
+    with get_pool().connection() as conn:
+        yield _TimedConnection(conn) if _query_listeners else conn
+
+
+def begin_request() -> None:
+    """Share one pooled connection across all DB calls in this request."""
+    if _pool is not None:
+        _pool.pin()
+
+
+def end_request() -> None:
+    """Return the request's connection (if any) to the pool."""
+    if _pool is not None:
+        _pool.unpin()
+
+# --------------------------------------------------
+# Schema migrations
+# --------------------------------------------------
+# Ordered, append-only list of (version, statements). Never edit a released
+# migration; add a new version instead. MySQL DDL commits implicitly, so a
+# version that fails part-way is re-run from its first statement; keep each
+# version small.
+MIGRATIONS: List[tuple] = [
+    (
+        1,
+        [
             """
             CREATE TABLE IF NOT EXISTS entries (
                 id INT AUTO_INCREMENT PRIMARY KEY,
@@ -96,11 +510,397 @@ def init_schema() -> None:
                 media_height VARCHAR(16) NULL,
                 media_attribution TEXT NULL
             ) CHARACTER SET utf8mb4;
+            """,
+        ],
+    ),
+    (
+        2,
+        [
+            # Keyset pagination for the listing page walks this index.
+            "CREATE INDEX idx_entries_created_key ON entries (created_at, entry_key)",
+        ],
+    ),
+    (
+        3,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS comments (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                entry_key VARCHAR(64) NOT NULL,
+                author VARCHAR(128) NOT NULL,
+                content TEXT NOT NULL,
+                created_at DATETIME NOT NULL,
+                INDEX idx_comments_entry (entry_key, created_at)
+            ) CHARACTER SET utf8mb4;
+            """,
+        ],
+    ),
+    (
+        4,
+        [
+            "ALTER TABLE entries ADD FULLTEXT INDEX ft_entries_title_content (title, content)",
+        ],
+    ),
+    (
+        5,
+        [
+            # Maintained by MySQL on every change to the row; used to rebuild
+            # only the entries that changed (e.g. by the static export).
+            """
+            ALTER TABLE entries ADD COLUMN updated_at DATETIME(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+            """,
+            "UPDATE entries SET updated_at = created_at",
+        ],
+    ),
+    (
+        6,
+        [
+            # /media/<id> resolves a media id to its source URLs.
+            "CREATE INDEX idx_entries_media ON entries (media_id)",
+        ],
+    ),
+    (
+        7,
+        [
+            # Row version for optimistic concurrency: every update bumps it,
+            # and edits only apply if the version they read is still current.
+            "ALTER TABLE entries ADD COLUMN version INT NOT NULL DEFAULT 1",
+        ],
+    ),
+    (
+        8,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tags (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(64) NOT NULL UNIQUE
+            ) CHARACTER SET utf8mb4;
+            """,
+            # (tag_id, entry_key) finds a tag's entries; the second index
+            # serves an entry's own tags and deletes.
+            """
+            CREATE TABLE IF NOT EXISTS entry_tags (
+                entry_key VARCHAR(64) NOT NULL,
+                tag_id INT NOT NULL,
+                PRIMARY KEY (tag_id, entry_key),
+                INDEX idx_entry_tags_entry (entry_key)
+            ) CHARACTER SET utf8mb4;
+            """,
+        ],
+    ),
+]
+
+# The same versions for the SQLite backend. Keep the numbers in step with
+# MIGRATIONS: every new version needs an entry in both lists.
+SQLITE_MIGRATIONS: List[tuple] = [
+    (
+        1,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_key TEXT UNIQUE,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL,
+                created_at DATETIME NOT NULL,
+                content TEXT NOT NULL,
+                media_id TEXT NULL,
+                media_type TEXT NULL,
+                media_url TEXT NULL,
+                media_thumbnail TEXT NULL,
+                media_width TEXT NULL,
+                media_height TEXT NULL,
+                media_attribution TEXT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        [
+            "CREATE INDEX idx_entries_created_key ON entries (created_at, entry_key)",
+        ],
+    ),
+    (
+        3,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS comments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_key TEXT NOT NULL,
+                author TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at DATETIME NOT NULL
+            )
+            """,
+            "CREATE INDEX idx_comments_entry ON comments (entry_key, created_at)",
+        ],
+    ),
+    (
+        4,
+        [
+            # FTS5 index over title/content, kept in sync by triggers
+            """
+            CREATE VIRTUAL TABLE entries_fts USING fts5(
+                title, content, content='entries', content_rowid='id'
+            )
+            """,
+            """
+            CREATE TRIGGER entries_fts_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+            """,
+            """
+            CREATE TRIGGER entries_fts_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+            END
+            """,
+            """
+            CREATE TRIGGER entries_fts_update AFTER UPDATE OF title, content ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO entries_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+            """,
+            "INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        5,
+        [
+            # SQLite has no ON UPDATE CURRENT_TIMESTAMP; triggers stamp the row
+            "ALTER TABLE entries ADD COLUMN updated_at DATETIME NULL",
+            "UPDATE entries SET updated_at = created_at",
+            """
+            CREATE TRIGGER entries_stamp_insert AFTER INSERT ON entries WHEN new.updated_at IS NULL BEGIN
+                UPDATE entries SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')
+                WHERE id = new.id;
+            END
+            """,
+            """
+            CREATE TRIGGER entries_stamp_update AFTER UPDATE ON entries
+            WHEN new.updated_at IS old.updated_at BEGIN
+                UPDATE entries SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')
+                WHERE id = new.id;
+            END
+            """,
+        ],
+    ),
+    (
+        6,
+        [
+            "CREATE INDEX idx_entries_media ON entries (media_id)",
+        ],
+    ),
+    (
+        7,
+        [
+            "ALTER TABLE entries ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+        ],
+    ),
+    (
+        8,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS entry_tags (
+                entry_key TEXT NOT NULL,
+                tag_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, entry_key)
+            )
+            """,
+            "CREATE INDEX idx_entry_tags_entry ON entry_tags (entry_key)",
+        ],
+    ),
+]
+
+SCHEMA_LOCK_NAME = "blog_schema_migration"
+SCHEMA_LOCK_TIMEOUT = int(os.getenv("DB_SCHEMA_LOCK_TIMEOUT", "30"))
+
+
+class MigrationLockError(RuntimeError):
+    """Raised when the schema migration lock cannot be acquired."""
+
+_schema_version: Optional[int] = None
+_schema_lock = threading.Lock()
+
+
+def migrate(conn) -> int:
+    """Apply pending MIGRATIONS on ``conn`` and return the resulting version.
+
+    A MySQL named lock serialises concurrent workers starting at the same time.
+    """
+    if DB_BACKEND == "sqlite":
+        return _migrate_sqlite(conn)
+    cur = conn.cursor()
+    cur.execute("SELECT GET_LOCK(%s, %s)", (SCHEMA_LOCK_NAME, SCHEMA_LOCK_TIMEOUT))
+    row = cur.fetchone()
+    # 1 = acquired, 0 = timed out, NULL = error; never migrate without the lock
+    if not row or row[0] != 1:
+        raise MigrationLockError(
+            f"Could not acquire schema lock {SCHEMA_LOCK_NAME!r} within {SCHEMA_LOCK_TIMEOUT}s "
+            f"(GET_LOCK returned {row[0] if row else None}); another worker may still be migrating"
+        )
+    try:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                applied_at DATETIME NOT NULL
+            ) CHARACTER SET utf8mb4;
             """
         )
-        conn.commit()
+        cur.execute("SELECT MAX(version) FROM schema_version")
+        row = cur.fetchone()
+        current = (row[0] if row else None) or 0
+        for version, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for stmt in statements:
+                cur.execute(stmt)
+            cur.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (%s, %s)",
+                (version, datetime.datetime.now()),
+            )
+            conn.commit()
+            current = version
+        return current
     finally:
-        _close(conn)
+        cur.execute("SELECT RELEASE_LOCK(%s)", (SCHEMA_LOCK_NAME,))
+
+
+def _migrate_sqlite(conn) -> int:
+    """migrate() for SQLite. The whole run holds the database write lock,
+    which serialises workers, and SQLite DDL is transactional, so a failed
+    run leaves the schema as it was."""
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                applied_at DATETIME NOT NULL
+            )
+            """
+        )
+        cur.execute("SELECT MAX(version) FROM schema_version")
+        row = cur.fetchone()
+        current = (row[0] if row else None) or 0
+        for version, statements in SQLITE_MIGRATIONS:
+            if version <= current:
+                continue
+            for stmt in statements:
+                cur.execute(stmt)
+            cur.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (%s, %s)",
+                (version, datetime.datetime.now()),
+            )
+            current = version
+        conn.commit()
+        return current
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def init_db() -> Pool:
+    """Create the pool and bring the schema up to date, once per process."""
+    global _schema_version
+    pool = init_pool()
+    if _schema_version is None:
+        with _schema_lock:
+            if _schema_version is None:
+                with pool.connection() as conn:
+                    _schema_version = migrate(conn)
+    return pool
+
+
+def init_schema() -> None:
+    """Kept for scripts and the README; equivalent to init_db()."""
+    init_db()
+
+# --------------------------------------------------
+# Change notifications
+# --------------------------------------------------
+_change_listeners: List[Callable[[str], None]] = []
+
+
+def add_change_listener(listener: Callable[[str], None]) -> None:
+    """Call ``listener(entry_id)`` after any committed write touching that entry
+    (insert/update/delete of the entry or a new comment on it)."""
+    _change_listeners.append(listener)
+
+
+def _notify_change(entry_id: str) -> None:
+    for listener in _change_listeners:
+        try:
+            listener(entry_id)
+        except Exception:
+            pass
+
+# --------------------------------------------------
+# Query timing
+# --------------------------------------------------
+_query_listeners: List[Callable[[str, float], None]] = []
+
+
+def add_query_listener(listener: Callable[[str, float], None]) -> None:
+    """Call ``listener(sql, seconds)`` after every statement run through connection()."""
+    _query_listeners.append(listener)
+
+
+def _notify_query(sql: str, seconds: float) -> None:
+    for listener in _query_listeners:
+        try:
+            listener(sql, seconds)
+        except Exception:
+            pass
+
+
+class _TimedCursor:
+    """Cursor wrapper reporting the duration of execute()/executemany()."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, args=None):
+        start = time.perf_counter()
+        try:
+            return self._cur.execute(sql, args)
+        finally:
+            _notify_query(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, args):
+        start = time.perf_counter()
+        try:
+            return self._cur.executemany(sql, args)
+        finally:
+            _notify_query(sql, time.perf_counter() - start)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _TimedConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
 
 # --------------------------------------------------
 # CRUD Operations
@@ -115,8 +915,7 @@ def insert_entry(
     safe_title = "".join(c if c.isalnum() else "_" for c in title)
     entry_key = f"{timestamp}_{safe_title}"
 
-    conn = open_connection()
-    try:
+    with connection() as conn:
         cur = conn.cursor()
         cur.execute(
             """
@@ -142,95 +941,314 @@ def insert_entry(
             ),
         )
         conn.commit()
-        return entry_key
-    finally:
-        _close(conn)
+    _notify_change(entry_key)
+    return entry_key
 
 
-def get_entries() -> List[Dict[str, Any]]:
-    conn = open_connection()
-    try:
+def _entry_columns(content: str = "content") -> str:
+    """SELECT list in the order _row_to_entry() expects."""
+    return f"""
+        entry_key, title, author, created_at, {content},
+        media_id, media_type, media_url, media_thumbnail,
+        media_width, media_height, media_attribution, version
+    """
+
+PREVIEW_LENGTH = 200
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class _RowAccess:
+    """Dict-style reads (``row["title"]``, ``row.get("media")``) for code that
+    also handles the file store's plain dicts."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
+@dataclass(slots=True)
+class Media(_RowAccess):
+    id: str
+    type: str = ""
+    url: str = ""
+    thumbnail: str = ""
+    width: str = ""
+    height: str = ""
+    attribution: str = ""
+
+
+@dataclass(slots=True)
+class Entry(_RowAccess):
+    id: str
+    title: str
+    author: str
+    created_at: datetime.datetime
+    content: str
+    media: Optional[Media] = None
+    version: Optional[int] = None
+    comments_count: Optional[int] = None  # listing pages only
+    score: Optional[float] = None  # search hits only
+
+    @property
+    def date(self) -> str:
+        # Formatted on access, i.e. only for entries a template actually shows
+        return self.created_at.strftime(DATE_FORMAT)
+
+
+@dataclass(slots=True)
+class Comment(_RowAccess):
+    author: str
+    content: str
+    created_at: datetime.datetime
+
+    @property
+    def date(self) -> str:
+        return self.created_at.strftime(DATE_FORMAT)
+
+
+def _row_to_entry(r, content: Optional[str] = None) -> Entry:
+    """Map a row selected with _entry_columns(); ``content`` overrides column 4."""
+    return Entry(
+        r[0],
+        r[1],
+        r[2],
+        r[3],
+        r[4] if content is None else content,
+        Media(r[5], r[6] or "", r[7] or "", r[8] or "", r[9] or "", r[10] or "", r[11] or "") if r[5] else None,
+        r[12],
+    )
+
+
+def get_entries() -> List[Entry]:
+    with connection() as conn:
         cur = conn.cursor()
         cur.execute(
-            """
-            SELECT entry_key, title, author, created_at, content,
-                   media_id, media_type, media_url, media_thumbnail,
-                   media_width, media_height, media_attribution
+            f"""
+            SELECT {_entry_columns()}
             FROM entries
             ORDER BY created_at DESC
             """
         )
-        rows = cur.fetchall()
-
-        entries = []
-        for r in rows:
-            media = None
-            if r[5]:
-                media = {
-                    "id": r[5],
-                    "type": r[6] or "",
-                    "url": r[7] or "",
-                    "thumbnail": r[8] or "",
-                    "width": r[9] or "",
-                    "height": r[10] or "",
-                    "attribution": r[11] or "",
-                }
-
-            entries.append(
-                {
-                    "id": r[0],
-                    "title": r[1],
-                    "author": r[2],
-                    "date": r[3].strftime("%Y-%m-%d %H:%M:%S"),
-                    "content": r[4],
-                    "media": media,
-                }
-            )
-        return entries
-    finally:
-        _close(conn)
+        return [_row_to_entry(r) for r in cur.fetchall()]
 
 
-def get_entry(entry_id: str) -> Optional[Dict[str, Any]]:
-    conn = open_connection()
-    try:
+def get_entry(entry_id: str) -> Optional[Entry]:
+    with connection() as conn:
         cur = conn.cursor()
         cur.execute(
-            """
-            SELECT entry_key, title, author, created_at, content,
-                   media_id, media_type, media_url, media_thumbnail,
-                   media_width, media_height, media_attribution
+            f"""
+            SELECT {_entry_columns()}
             FROM entries
             WHERE entry_key=%s
             """,
             (entry_id,),
         )
         r = cur.fetchone()
-        if not r:
-            return None
-
-        media = None
-        if r[5]:
-            media = {
-                "id": r[5],
-                "type": r[6] or "",
-                "url": r[7] or "",
-                "thumbnail": r[8] or "",
-                "width": r[9] or "",
-                "height": r[10] or "",
-                "attribution": r[11] or "",
-            }
+        return _row_to_entry(r) if r else None
+
+
+# --------------------------------------------------
+# Entry media
+# --------------------------------------------------
+def get_media(entry_id: str) -> Optional[Dict[str, Any]]:
+    """The media attached to entry ``entry_id`` ({type, url, thumbnail}), or None."""
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT media_type, media_url, media_thumbnail
+            FROM entries
+            WHERE entry_key=%s AND media_id IS NOT NULL
+            """,
+            (entry_id,),
+        )
+        r = cur.fetchone()
+        return {"type": r[0], "url": r[1], "thumbnail": r[2]} if r else None
+
+
+# --------------------------------------------------
+# Entry change tracking
+# --------------------------------------------------
+def _as_datetime(value) -> datetime.datetime:
+    # SQLite only converts plain DATETIME columns; aggregates come back as text
+    return datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+
 
+def get_entry_versions() -> Dict[str, str]:
+    """entry_key -> a token that changes whenever the entry, its comments or its tags change."""
+    with connection() as conn:
+        cur = conn.cursor()
+        # set_entry_tags leaves updated_at alone, so the tags go into the token themselves
+        cur.execute(
+            """
+            SELECT et.entry_key, t.name
+            FROM entry_tags et
+            JOIN tags t ON t.id = et.tag_id
+            """
+        )
+        tags: Dict[str, List[str]] = {}
+        for key, name in cur.fetchall():
+            tags.setdefault(key, []).append(name)
+        cur.execute(
+            """
+            SELECT e.entry_key, e.updated_at, COUNT(c.id), MAX(c.created_at)
+            FROM entries e
+            LEFT JOIN comments c ON c.entry_key = e.entry_key
+            GROUP BY e.entry_key, e.updated_at
+            """
+        )
         return {
-            "id": r[0],
-            "title": r[1],
-            "author": r[2],
-            "date": r[3].strftime("%Y-%m-%d %H:%M:%S"),
-            "content": r[4],
-            "media": media,
+            r[0]: (f"{_as_datetime(r[1]).isoformat()}|{r[2]}|{_as_datetime(r[3]).isoformat() if r[3] else ''}"
+                   f"|{','.join(sorted(tags.get(r[0], ())))}")
+            for r in cur.fetchall()
         }
-    finally:
-        _close(conn)
+
+
+# --------------------------------------------------
+# Listing (keyset pagination)
+# --------------------------------------------------
+def encode_cursor(created_at: datetime.datetime, entry_key: str) -> str:
+    return f"{created_at.isoformat()}~{entry_key}"
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor(); raises ValueError for malformed input."""
+    stamp, sep, entry_key = cursor.partition("~")
+    if not sep or not entry_key:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return datetime.datetime.fromisoformat(stamp), entry_key
+
+
+def get_entry_page(
+    per_page: int = 10,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    tag: Optional[str] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Dict[str, Any]:
+    """
+    One page of the listing, newest first, with content cut to a preview.
+
+    ``tag`` limits the listing to entries with that tag, and ``start``/``end``
+    to entries created in [start, end) (a month of the archive is a range
+    scan of idx_entries_created_key).
+
+    Pass ``before`` (the previous page's ``next_cursor``) to page towards
+    older entries, or ``after`` (``prev_cursor``) to page back towards newer
+    ones. Only SUBSTR(content, 1, PREVIEW_LENGTH + 1) leaves the server; the extra
+    character tells us whether to add an ellipsis.
+
+    Each entry carries a ``comments_count``. Returns
+    {"entries": [...], "next_cursor": str|None, "prev_cursor": str|None}.
+    """
+    # Comment counts come from idx_comments_entry, one index range per row
+    # on this page, instead of a separate lookup per entry.
+    preview_columns = _entry_columns(f"SUBSTR(content, 1, {PREVIEW_LENGTH + 1})") + """,
+        (SELECT COUNT(*) FROM comments c WHERE c.entry_key = entries.entry_key)
+    """
+    conditions: List[str] = []
+    args: List[Any] = []
+    if tag is not None:
+        conditions.append(
+            "entry_key IN (SELECT et.entry_key FROM entry_tags et"
+            " JOIN tags t ON t.id = et.tag_id WHERE t.name = %s)"
+        )
+        args.append(tag)
+    if start is not None:
+        conditions.append("created_at >= %s")
+        args.append(start)
+    if end is not None:
+        conditions.append("created_at < %s")
+        args.append(end)
+    order = "DESC"
+    if after:
+        created_at, entry_key = decode_cursor(after)
+        conditions.append("(created_at > %s OR (created_at = %s AND entry_key > %s))")
+        order = "ASC"
+        args.extend([created_at, created_at, entry_key])
+    elif before:
+        created_at, entry_key = decode_cursor(before)
+        conditions.append("(created_at < %s OR (created_at = %s AND entry_key < %s))")
+        args.extend([created_at, created_at, entry_key])
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    args.append(per_page + 1)
+
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT {preview_columns}
+            FROM entries
+            {where}
+            ORDER BY created_at {order}, entry_key {order}
+            LIMIT %s
+            """,
+            tuple(args),
+        )
+        rows = list(cur.fetchall())
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if after:
+        rows.reverse()
+
+    entries = []
+    for r in rows:
+        entry = _row_to_entry(r, r[4][:PREVIEW_LENGTH] + "..." if len(r[4]) > PREVIEW_LENGTH else r[4])
+        entry.comments_count = int(r[13] or 0)
+        entries.append(entry)
+
+    first = encode_cursor(rows[0][3], rows[0][0]) if rows else None
+    last = encode_cursor(rows[-1][3], rows[-1][0]) if rows else None
+    if after:
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = bool(before), has_more
+    return {
+        "entries": entries,
+        "next_cursor": last if has_older else None,
+        "prev_cursor": first if has_newer else None,
+    }
+
+
+class VersionConflict(RuntimeError):
+    """An update was based on an entry version that is no longer current."""
+
+    def __init__(self, entry_id: str, expected: int, current: int):
+        super().__init__(f"Entry {entry_id} is at version {current}, not {expected}")
+        self.entry_id = entry_id
+        self.expected = expected
+        self.current = current
+
+
+# Updatable fields -> columns; "media" expands to all media columns.
+_MEDIA_KEYS = ("id", "type", "url", "thumbnail", "width", "height", "attribution")
+_UPDATE_COLUMNS = {
+    "title": ("title",),
+    "author": ("author",),
+    "content": ("content",),
+    "media": tuple(f"media_{k}" for k in _MEDIA_KEYS),
+}
+
+
+def _update_values(field: str, value: Any) -> tuple:
+    if field == "media":
+        media = value or {}
+        return tuple(media.get(k) for k in _MEDIA_KEYS)
+    return (value,)
+
+
+def _update_sql(fields: tuple) -> str:
+    assignments = ", ".join(f"{col}=%s" for f in fields for col in _UPDATE_COLUMNS[f])
+    return f"UPDATE entries SET {assignments}, version=version+1 WHERE entry_key=%s AND version=%s"
 
 
 def update_entry(
@@ -239,45 +1257,333 @@ def update_entry(
     content: str,
     author: str,
     media: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
 ) -> bool:
-    conn = open_connection()
-    try:
+    """
+    Overwrite an entry. Returns False if it does not exist.
+
+    With ``expected_version`` (the version the edit was based on) the update
+    only applies if nobody changed the entry since; otherwise VersionConflict
+    is raised and nothing is written.
+    """
+    fields = ("title", "author", "content", "media")
+    values = [v for f, v in zip(fields, (title, author, content, media)) for v in _update_values(f, v)]
+    with connection() as conn:
+        cur = conn.cursor()
+        if expected_version is None:
+            sql = _update_sql(fields).replace(" AND version=%s", "")
+            cur.execute(sql, tuple(values) + (entry_id,))
+        else:
+            cur.execute(_update_sql(fields), tuple(values) + (entry_id, expected_version))
+        updated = cur.rowcount > 0
+        if not updated and expected_version is not None:
+            cur.execute("SELECT version FROM entries WHERE entry_key=%s", (entry_id,))
+            r = cur.fetchone()
+            if r:
+                conn.rollback()
+                raise VersionConflict(entry_id, expected_version, r[0])
+        conn.commit()
+    if updated:
+        _notify_change(entry_id)
+    return updated
+
+
+def bulk_update_entries(changes: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Apply many partial updates in one transaction on one connection.
+
+    Each change is {"id": entry_key, "version": int (optional), and any of
+    "title", "author", "content", "media"}. The affected rows are read and
+    locked with one SELECT ... FOR UPDATE; entries with a stale version in any
+    of their changes are skipped, the rest are written with one executemany
+    per set of fields. Several changes to the same entry are merged in order.
+
+    Returns {"updated": [...], "conflicts": [...], "missing": [...]} entry keys.
+    """
+    result: Dict[str, List[str]] = {"updated": [], "conflicts": [], "missing": []}
+    if not changes:
+        return result
+    for change in changes:
+        unknown = set(change) - set(_UPDATE_COLUMNS) - {"id", "version"}
+        if unknown:
+            raise ValueError(f"Unknown fields for {change.get('id')}: {sorted(unknown)}")
+
+    keys = list(dict.fromkeys(c["id"] for c in changes))
+    with connection() as conn:
+        cur = conn.cursor()
+        try:
+            if DB_BACKEND == "sqlite":
+                # No row locks in SQLite: take the database write lock up front
+                cur.execute("BEGIN IMMEDIATE")
+                lock = ""
+            else:
+                lock = " FOR UPDATE"
+            placeholders = ", ".join(["%s"] * len(keys))
+            cur.execute(
+                f"SELECT entry_key, version FROM entries WHERE entry_key IN ({placeholders}){lock}",
+                tuple(keys),
+            )
+            versions = {r[0]: r[1] for r in cur.fetchall()}
+
+            # Several changes to one entry are merged in order into one update
+            merged: Dict[str, Dict[str, Any]] = {}
+            for change in changes:
+                key = change["id"]
+                if key not in versions:
+                    if key not in result["missing"]:
+                        result["missing"].append(key)
+                    continue
+                if change.get("version", versions[key]) != versions[key]:
+                    if key not in result["conflicts"]:
+                        result["conflicts"].append(key)
+                    continue
+                merged.setdefault(key, {}).update(change)
+
+            groups: Dict[tuple, List[tuple]] = {}
+            for key, change in merged.items():
+                if key in result["conflicts"]:
+                    continue
+                fields = tuple(f for f in _UPDATE_COLUMNS if f in change)
+                if fields:
+                    values = [v for f in fields for v in _update_values(f, change[f])]
+                    groups.setdefault(fields, []).append(tuple(values) + (key, versions[key]))
+                    result["updated"].append(key)
+
+            for fields, rows in groups.items():
+                cur.executemany(_update_sql(fields), rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    for key in result["updated"]:
+        _notify_change(key)
+    return result
+
+
+def delete_entry(entry_id: str) -> bool:
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM entries WHERE entry_key=%s", (entry_id,))
+        deleted = cur.rowcount > 0
+        cur.execute("DELETE FROM comments WHERE entry_key=%s", (entry_id,))
+        cur.execute("DELETE FROM entry_tags WHERE entry_key=%s", (entry_id,))
+        conn.commit()
+    if deleted:
+        _notify_change(entry_id)
+    return deleted
+
+# --------------------------------------------------
+# Tags and archive
+# --------------------------------------------------
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 64
+
+
+def normalize_tag(tag: str) -> str:
+    """Lowercase, with runs of anything but letters, digits, '-' and '_' turned into '-'."""
+    return re.sub(r"[^\w-]+", "-", str(tag).strip().lower()).strip("-")[:MAX_TAG_LENGTH]
+
+
+def normalize_tags(tags) -> List[str]:
+    """A comma-separated string or a list of tags -> unique normalised tags, in order."""
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return list(dict.fromkeys(t for t in (normalize_tag(t) for t in tags or ()) if t))[:MAX_TAGS]
+
+
+def set_entry_tags(entry_id: str, tags) -> bool:
+    """Replace an entry's tags. Returns False if the entry does not exist."""
+    tags = normalize_tags(tags)
+    insert_ignore = "INSERT OR IGNORE" if DB_BACKEND == "sqlite" else "INSERT IGNORE"
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM entries WHERE entry_key=%s", (entry_id,))
+        if not cur.fetchone():
+            return False
+        cur.execute("DELETE FROM entry_tags WHERE entry_key=%s", (entry_id,))
+        if tags:
+            cur.executemany(f"{insert_ignore} INTO tags (name) VALUES (%s)", [(t,) for t in tags])
+            placeholders = ", ".join(["%s"] * len(tags))
+            cur.execute(
+                f"""
+                INSERT INTO entry_tags (entry_key, tag_id)
+                SELECT %s, id FROM tags WHERE name IN ({placeholders})
+                """,
+                (entry_id, *tags),
+            )
+        conn.commit()
+    _notify_change(entry_id)
+    return True
+
+
+def get_entry_tags(entry_id: str) -> List[str]:
+    with connection() as conn:
         cur = conn.cursor()
         cur.execute(
             """
-            UPDATE entries
-            SET title=%s, author=%s, content=%s,
-                media_id=%s, media_type=%s, media_url=%s,
-                media_thumbnail=%s, media_width=%s,
-                media_height=%s, media_attribution=%s
-            WHERE entry_key=%s
+            SELECT t.name
+            FROM entry_tags et
+            JOIN tags t ON t.id = et.tag_id
+            WHERE et.entry_key=%s
+            ORDER BY t.name
             """,
-            (
-                title,
-                author,
-                content,
-                (media or {}).get("id"),
-                (media or {}).get("type"),
-                (media or {}).get("url"),
-                (media or {}).get("thumbnail"),
-                (media or {}).get("width"),
-                (media or {}).get("height"),
-                (media or {}).get("attribution"),
-                entry_id,
-            ),
+            (entry_id,),
         )
-        conn.commit()
-        return cur.rowcount > 0
-    finally:
-        _close(conn)
+        return [r[0] for r in cur.fetchall()]
 
 
-def delete_entry(entry_id: str) -> bool:
-    conn = open_connection()
-    try:
+def get_tags() -> List[Dict[str, Any]]:
+    """Tags in use, most used first: [{"name": str, "count": int}]."""
+    with connection() as conn:
         cur = conn.cursor()
-        cur.execute("DELETE FROM entries WHERE entry_key=%s", (entry_id,))
+        cur.execute(
+            """
+            SELECT t.name, COUNT(*) AS uses
+            FROM entry_tags et
+            JOIN tags t ON t.id = et.tag_id
+            GROUP BY t.id, t.name
+            ORDER BY uses DESC, t.name
+            """
+        )
+        return [{"name": r[0], "count": int(r[1])} for r in cur.fetchall()]
+
+
+def get_archive() -> List[Dict[str, int]]:
+    """Months that have entries, newest first: [{"year", "month", "count"}].
+
+    Grouping on the first 7 characters of created_at ("YYYY-MM") works on
+    both backends and only reads idx_entries_created_key.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT SUBSTR(created_at, 1, 7) AS ym, COUNT(*)
+            FROM entries
+            GROUP BY ym
+            ORDER BY ym DESC
+            """
+        )
+        archive = []
+        for ym, count in cur.fetchall():
+            year, _, month = str(ym).partition("-")
+            archive.append({"year": int(year), "month": int(month), "count": int(count)})
+        return archive
+
+# --------------------------------------------------
+# Search
+# --------------------------------------------------
+def _fts_query(query: str) -> str:
+    """Free text -> an FTS5 query matching any of its words, like MySQL's
+    natural language mode (quoting keeps FTS5 operators in the input inert)."""
+    return " OR ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+def _search_entries_sqlite(query: str, per_page: int, offset: int) -> Dict[str, Any]:
+    match = _fts_query(query)
+    if not match:
+        return {"hits": [], "total": 0}
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM entries_fts WHERE entries_fts MATCH %s", (match,))
+        total = int(cur.fetchone()[0])
+        if not total or offset >= total:
+            return {"hits": [], "total": total}
+        # bm25() is lower-is-better; title matches weigh twice as much as content
+        cur.execute(
+            f"""
+            SELECT {_entry_columns()}, m.score
+            FROM (
+                SELECT rowid AS fts_id, -bm25(entries_fts, 2.0, 1.0) AS score
+                FROM entries_fts WHERE entries_fts MATCH %s
+            ) m
+            JOIN entries ON entries.id = m.fts_id
+            ORDER BY m.score DESC, created_at DESC
+            LIMIT %s OFFSET %s
+            """,
+            (match, per_page, offset),
+        )
+        hits = []
+        for r in cur.fetchall():
+            hit = _row_to_entry(r)
+            hit.score = float(r[13])
+            hits.append(hit)
+        return {"hits": hits, "total": total}
+
+
+def search_entries(query: str, per_page: int = 10, page: int = 1) -> Dict[str, Any]:
+    """
+    Ranked full-text search over title and content via the FULLTEXT index
+    (an FTS5 table with DB_BACKEND=sqlite).
+
+    Only the rows on the requested page are fetched (with their content, for
+    snippets). Returns {"hits": [entry + "score"], "total": int}.
+    """
+    offset = (max(page, 1) - 1) * per_page
+    if DB_BACKEND == "sqlite":
+        return _search_entries_sqlite(query, per_page, offset)
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT COUNT(*) FROM entries
+            WHERE MATCH(title, content) AGAINST (%s IN NATURAL LANGUAGE MODE)
+            """,
+            (query,),
+        )
+        total = int(cur.fetchone()[0])
+        if not total or offset >= total:
+            return {"hits": [], "total": total}
+        cur.execute(
+            f"""
+            SELECT {_entry_columns()},
+                   MATCH(title, content) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+            FROM entries
+            WHERE MATCH(title, content) AGAINST (%s IN NATURAL LANGUAGE MODE)
+            ORDER BY score DESC, created_at DESC
+            LIMIT %s OFFSET %s
+            """,
+            (query, query, per_page, offset),
+        )
+        hits = []
+        for r in cur.fetchall():
+            hit = _row_to_entry(r)
+            hit.score = float(r[13])
+            hits.append(hit)
+        return {"hits": hits, "total": total}
+
+# --------------------------------------------------
+# Comments
+# --------------------------------------------------
+def add_comment(entry_id: str, author: str, content: str) -> bool:
+    """Insert a comment; returns False (and inserts nothing) if the entry does not exist."""
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO comments (entry_key, author, content, created_at)
+            SELECT entry_key, %s, %s, %s FROM entries WHERE entry_key=%s
+            """,
+            (author, content, datetime.datetime.now(), entry_id),
+        )
         conn.commit()
-        return cur.rowcount > 0
-    finally:
-        _close(conn)
+        added = cur.rowcount > 0
+    if added:
+        _notify_change(entry_id)
+    return added
+
+
+def get_comments(entry_id: str) -> List[Comment]:
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT author, content, created_at
+            FROM comments
+            WHERE entry_key=%s
+            ORDER BY created_at, id
+            """,
+            (entry_id,),
+        )
+        return [Comment(r[0], r[1], r[2]) for r in cur.fetchall()]
+
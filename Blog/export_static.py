@@ -0,0 +1,188 @@
+"""
+Export the Blog's read side as static HTML.
+
+Renders the listing pages and every entry page (with its comments) through
+the app itself, so the output is byte-for-byte what Flask would serve:
+
+    site/blog/index.html                 first listing page
+    site/blog/page/<n>/index.html        older listing pages
+    site/blog/entry/<id>/index.html      entry + comments
+
+Runs are incremental: the export remembers each entry's version (its
+updated_at plus comment activity, or file mtimes without a database) in
+site/.export-manifest.json, and only re-renders entries whose version
+changed. Listing pages are rebuilt whenever any entry changed. Forms
+(comments, new/edit/delete, search) still post to Flask, which keeps
+handling writes.
+
+Usage:
+    python Blog/export_static.py --out site [--workers 8] [--full]
+"""
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+MANIFEST_NAME = ".export-manifest.json"
+MANIFEST_VERSION = 1
+
+# Newer/Older links rendered by blog.html, e.g. href="/blog?before=...&amp;per_page=20"
+_PAGE_LINK_RE = re.compile(r'href="([^"]*/blog\?(after|before)=[^"]*)"')
+_SAFE_ID_RE = re.compile(r'^[\w.\-]+$')
+
+
+def _load_app():
+    # Exported pages are always rendered locally; never bounce to the production host
+    os.environ.setdefault('DISABLE_PROD_REDIRECT', '1')
+    try:
+        from . import app as blog_app  # type: ignore
+    except Exception:
+        import app as blog_app  # type: ignore
+    return blog_app
+
+
+def _write(path: str, body: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def _entry_path(out_dir: str, entry_id: str) -> str:
+    return os.path.join(out_dir, 'blog', 'entry', entry_id, 'index.html')
+
+
+def _listing_path(out_dir: str, number: int) -> str:
+    if number == 1:
+        return os.path.join(out_dir, 'blog', 'index.html')
+    return os.path.join(out_dir, 'blog', 'page', str(number), 'index.html')
+
+
+def _listing_url(number: int) -> str:
+    return '/blog/' if number == 1 else f'/blog/page/{number}/'
+
+
+def load_manifest(out_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {'version': MANIFEST_VERSION, 'entries': {}, 'listing_pages': 0, 'per_page': None}
+
+
+def render_entries(blog_app, out_dir: str, entry_ids: List[str], workers: int) -> Dict[str, bool]:
+    """Render entry pages in parallel; returns entry_id -> success."""
+    def render(entry_id: str) -> bool:
+        client = blog_app.app.test_client()
+        resp = client.get(f'/blog/entry/{entry_id}')
+        if resp.status_code != 200:
+            print(f"Skipping {entry_id}: HTTP {resp.status_code}")
+            return False
+        _write(_entry_path(out_dir, entry_id), resp.get_data(as_text=True))
+        return True
+
+    if not entry_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(zip(entry_ids, pool.map(render, entry_ids)))
+
+
+def render_listing(blog_app, out_dir: str, per_page: Optional[int], max_pages: int) -> int:
+    """Walk the listing via its Older links, write every page with static
+    pagination links, and return the number of pages."""
+    client = blog_app.app.test_client()
+    url = '/blog' + (f'?per_page={per_page}' if per_page else '')
+    pages = []
+    while url and len(pages) < max_pages:
+        resp = client.get(url)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Listing page {url} returned HTTP {resp.status_code}")
+        body = resp.get_data(as_text=True)
+        pages.append(body)
+        older = [m.group(1) for m in _PAGE_LINK_RE.finditer(body) if m.group(2) == 'before']
+        url = html.unescape(older[0]) if older else None
+
+    for number, body in enumerate(pages, start=1):
+        def link(match, number=number):
+            target = number - 1 if match.group(2) == 'after' else number + 1
+            return f'href="{_listing_url(target)}"'
+        _write(_listing_path(out_dir, number), _PAGE_LINK_RE.sub(link, body))
+    return len(pages)
+
+
+def export(out_dir: str, workers: int = 4, full: bool = False, per_page: Optional[int] = None) -> Dict[str, int]:
+    """
+    Bring ``out_dir`` up to date with the blog.
+
+    Returns:
+        dict: entries, rendered, failed, removed and listing_pages counts
+    """
+    blog_app = _load_app()
+    manifest = load_manifest(out_dir)
+    if full or manifest.get('per_page') != per_page:
+        manifest['entries'] = {}
+    previous: Dict[str, str] = manifest['entries']
+
+    versions = {k: v for k, v in blog_app._with_fallback('get_entry_versions').items() if _SAFE_ID_RE.match(k)}
+    changed = [
+        entry_id for entry_id, version in versions.items()
+        if previous.get(entry_id) != version or not os.path.exists(_entry_path(out_dir, entry_id))
+    ]
+    removed = [entry_id for entry_id in previous if entry_id not in versions]
+
+    results = render_entries(blog_app, out_dir, changed, workers)
+    for entry_id in removed:
+        shutil.rmtree(os.path.dirname(_entry_path(out_dir, entry_id)), ignore_errors=True)
+
+    listing_pages = manifest.get('listing_pages', 0)
+    if changed or removed or not listing_pages or not os.path.exists(_listing_path(out_dir, 1)):
+        listing_pages = render_listing(blog_app, out_dir, per_page, max_pages=len(versions) + 1)
+        for stale in range(listing_pages + 1, manifest.get('listing_pages', 0) + 1):
+            shutil.rmtree(os.path.dirname(_listing_path(out_dir, stale)), ignore_errors=True)
+
+    # Failed entries keep their old version so the next run retries them
+    entries = {k: v for k, v in versions.items() if results.get(k, True)}
+    entries.update({k: previous[k] for k, ok in results.items() if not ok and k in previous})
+    _write(os.path.join(out_dir, MANIFEST_NAME), json.dumps({
+        'version': MANIFEST_VERSION,
+        'entries': entries,
+        'listing_pages': listing_pages,
+        'per_page': per_page,
+    }))
+    return {
+        'entries': len(versions),
+        'rendered': sum(1 for ok in results.values() if ok),
+        'failed': sum(1 for ok in results.values() if not ok),
+        'removed': len(removed),
+        'listing_pages': listing_pages,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export the Blog as static HTML.")
+    parser.add_argument('--out', default='site', help='Output directory (default: site)')
+    parser.add_argument('--workers', type=int, default=4, help='Entry pages rendered in parallel')
+    parser.add_argument('--full', action='store_true', help='Re-render every entry, ignoring the manifest')
+    parser.add_argument('--per-page', type=int, default=None, help='Entries per listing page (default: the app default)')
+    args = parser.parse_args(argv)
+
+    stats = export(args.out, workers=args.workers, full=args.full, per_page=args.per_page)
+    print(
+        f"{stats['entries']} entries: {stats['rendered']} rendered, {stats['failed']} failed, "
+        f"{stats['removed']} removed; {stats['listing_pages']} listing pages"
+    )
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,562 @@
+"""
+File-backed storage for Blog entries, used when the database is unavailable.
+
+Entries live in blog_entries/ as .json files ({id,title,author,date,content,media?,tags?,version?})
+or as legacy .txt files (the "Title:/Author:/Date:" format written by
+txt_reviewer.save_blog_entry); comments live in blog_comments/<entry_id>.json.
+
+A manifest (blog_entries/.index.json) keeps one small summary per entry
+(id, title, author, date, preview, media, tags, comment count and file mtimes), so
+listing pages read the manifest instead of every entry file. Each read
+revalidates the manifest against a directory scan (stat only): files that are
+new or whose mtime changed are re-parsed, deleted files are dropped, and
+writes made through this class update the manifest incrementally.
+"""
+import datetime
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    from . import blog_db  # type: ignore
+except Exception:
+    import blog_db  # type: ignore
+
+MANIFEST_NAME = ".index.json"
+MANIFEST_VERSION = 2
+PREVIEW_LENGTH = 200
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%Y%m%d_%H%M%S")
+
+MEDIA_FIELDS = (
+    ('type', 'Media-Type: '),
+    ('url', 'Media-URL: '),
+    ('thumbnail', 'Media-Thumbnail: '),
+    ('width', 'Media-Width: '),
+    ('height', 'Media-Height: '),
+    ('attribution', 'Media-Attribution: '),
+)
+
+
+def _parse_json_entry(filepath: str) -> Optional[Dict[str, Any]]:
+    entry = FileEntryStore._read_entry(filepath)
+    if entry is None:
+        return None
+    return {
+        'title': entry['title'],
+        'author': entry['author'],
+        'created_at': _parse_date(entry['date']) or datetime.datetime.now(),
+        'content': entry['content'],
+        'media': entry['media'] if entry['media'] and entry['media'].get('id') else None,
+        'tags': entry['tags'],
+    }
+
+
+def parse_entry_file(filepath: str) -> Optional[Dict[str, Any]]:
+    """Parse one entry file: a .json entry written by FileEntryStore or a legacy
+    .txt entry. For .txt only the header lines are read individually; the body
+    is read in one call rather than split into lines and joined again."""
+    if filepath.lower().endswith('.json'):
+        return _parse_json_entry(filepath)
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            def next_line() -> str:
+                return f.readline().rstrip('\n')
+
+            first, second, third = next_line(), next_line(), next_line()
+            title = first.replace('Title: ', '') if first.startswith('Title: ') else 'Untitled'
+            author = second.replace('Author: ', '') if second.startswith('Author: ') else 'Anonymous'
+            date_str = third.replace('Date: ', '') if third.startswith('Date: ') else ''
+
+            # Try to parse datetime
+            try:
+                created_at = datetime.datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S') if date_str else datetime.datetime.now()
+            except Exception:
+                created_at = datetime.datetime.now()
+
+            media = None
+            line = next_line()
+            if line.startswith('Media-ID:'):
+                media = {'id': line.replace('Media-ID: ', '')}
+                for key, prefix in MEDIA_FIELDS:
+                    media[key] = next_line().replace(prefix, '')
+                # Blank separator line after the media block
+                next_line()
+
+            entry_body = f.read()
+
+        return {
+            'title': title,
+            'author': author,
+            'created_at': created_at,
+            'content': entry_body,
+            'media': media,
+            'tags': [],
+        }
+    except Exception as e:
+        print(f"Failed to parse {filepath}: {e}")
+        return None
+
+
+def _parse_date(date: str) -> Optional[datetime.datetime]:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _sort_key(date: str) -> str:
+    """ISO timestamp for ordering; unparseable dates sort last."""
+    parsed = _parse_date(date)
+    return parsed.isoformat() if parsed else ""
+
+
+def _preview(content: str) -> str:
+    return content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content
+
+
+def _write_json(path: str, data: Any, **dump_kwargs) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp, path)
+
+
+class FileEntryStore:
+    """
+    Entries and comments stored as files, with a persistent manifest index.
+
+    Args:
+        entries_dir (str): Directory holding entry .json/.txt files
+        comments_dir (str): Directory holding <entry_id>.json comment lists
+    """
+
+    def __init__(self, entries_dir: str, comments_dir: str):
+        self.entries_dir = entries_dir
+        self.comments_dir = comments_dir
+        self.manifest_path = os.path.join(entries_dir, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._files: Dict[str, Dict[str, Any]] = {}  # filename -> summary
+        self._manifest_mtime: Optional[int] = None
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+
+    # -- reading ----------------------------------------------------------
+    def list_entries(self) -> List[Dict[str, Any]]:
+        """Summaries (with preview content) ordered newest first."""
+        with self._lock:
+            self._refresh()
+            if self._ordered is None:
+                self._ordered = sorted(
+                    self._files.values(),
+                    key=lambda s: (s['sort_key'], s['id']),
+                    reverse=True,
+                )
+            return [self._public(s) for s in self._ordered]
+
+    def page(self, per_page: int = 10, before: Optional[str] = None, after: Optional[str] = None,
+             tag: Optional[str] = None, start: Optional[datetime.datetime] = None,
+             end: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+        """Same shape and filters as blog_db.get_entry_page(), paging the manifest in memory."""
+        with self._lock:
+            self.list_entries()
+            ordered = self._ordered or []
+        if tag is not None:
+            ordered = [s for s in ordered if tag in s.get('tags', ())]
+        if start is not None:
+            ordered = [s for s in ordered if s['sort_key'] >= start.isoformat()]
+        if end is not None:
+            ordered = [s for s in ordered if s['sort_key'] < end.isoformat()]
+        keys = [(s['sort_key'], s['id']) for s in ordered]
+        if after:
+            bound = self._decode_cursor(after)
+            newer = [i for i, k in enumerate(keys) if k > bound]
+            first = max(0, (newer[-1] + 1 if newer else 0) - per_page)
+        elif before:
+            bound = self._decode_cursor(before)
+            first = next((i for i, k in enumerate(keys) if k < bound), len(keys))
+        else:
+            first = 0
+        chosen = ordered[first:first + per_page]
+        stop = first + len(chosen)
+        return {
+            'entries': [self._public(s) for s in chosen],
+            'next_cursor': self._cursor(chosen[-1]) if chosen and stop < len(ordered) else None,
+            'prev_cursor': self._cursor(chosen[0]) if chosen and first > 0 else None,
+        }
+
+    def signature(self) -> Dict[str, int]:
+        """entry id -> entry file mtime, for callers keeping derived indexes in sync."""
+        with self._lock:
+            self._refresh()
+            return {s['id']: s['mtime_ns'] for s in self._files.values()}
+
+    def get_media(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Same as blog_db.get_media()."""
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            media = self._files[filename].get('media') if filename else None
+        if not media:
+            return None
+        return {'type': media.get('type'), 'url': media.get('url'), 'thumbnail': media.get('thumbnail')}
+
+    def get_entry_versions(self) -> Dict[str, str]:
+        """Same as blog_db.get_entry_versions(): changes when the entry file or its comments change."""
+        with self._lock:
+            self._refresh()
+            return {s['id']: f"{s['mtime_ns']}:{s['comments_mtime_ns']}" for s in self._files.values()}
+
+    def get_entry_tags(self, entry_id: str) -> List[str]:
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            return sorted(self._files[filename].get('tags', [])) if filename else []
+
+    def get_tags(self) -> List[Dict[str, Any]]:
+        """Same as blog_db.get_tags()."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            self._refresh()
+            for s in self._files.values():
+                for tag in s.get('tags', ()):
+                    counts[tag] = counts.get(tag, 0) + 1
+        return [{'name': name, 'count': n} for name, n in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+    def get_archive(self) -> List[Dict[str, int]]:
+        """Same as blog_db.get_archive()."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            self._refresh()
+            for s in self._files.values():
+                if s['sort_key']:
+                    counts[s['sort_key'][:7]] = counts.get(s['sort_key'][:7], 0) + 1
+        return [{'year': int(ym[:4]), 'month': int(ym[5:7]), 'count': n} for ym, n in sorted(counts.items(), reverse=True)]
+
+    def get_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+        if filename is None:
+            return None
+        entry = self._read_entry(os.path.join(self.entries_dir, filename))
+        if entry is None:
+            return None
+        entry['id'] = entry_id
+        return entry
+
+    def get_comments(self, entry_id: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._comments_path(entry_id), 'r', encoding='utf-8') as f:
+                comments = json.load(f)
+            return comments if isinstance(comments, list) else []
+        except (OSError, ValueError):
+            return []
+
+    # -- writing ----------------------------------------------------------
+    def insert_entry(self, title: str, content: str, author: str, media: Optional[Dict[str, Any]] = None) -> str:
+        now = datetime.datetime.now()
+        safe_title = "".join(c if c.isalnum() else "_" for c in title)
+        entry_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{safe_title}"
+        self._write_entry(entry_id, title, content, author, now.strftime('%Y-%m-%d %H:%M:%S'), media)
+        return entry_id
+
+    def update_entry(self, entry_id: str, title: str, content: str, author: str,
+                     media: Optional[Dict[str, Any]] = None, expected_version: Optional[int] = None) -> bool:
+        """Same as blog_db.update_entry(), including the VersionConflict on a stale ``expected_version``."""
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            if filename is None:
+                return False
+            current = self._read_entry(os.path.join(self.entries_dir, filename))
+            if current is None:
+                return False
+            if expected_version is not None and expected_version != current['version']:
+                raise blog_db.VersionConflict(entry_id, expected_version, current['version'])
+            self._write_entry(entry_id, title, content, author, current['date'], media, current['tags'],
+                              version=current['version'] + 1)
+            if filename != f"{entry_id}.json":
+                # Legacy .txt entries are rewritten as JSON
+                self._remove(os.path.join(self.entries_dir, filename))
+                self._files.pop(filename, None)
+                self._save_manifest()
+            return True
+
+    def bulk_update_entries(self, changes: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Same contract as blog_db.bulk_update_entries: stale versions are reported as conflicts."""
+        result: Dict[str, List[str]] = {"updated": [], "conflicts": [], "missing": []}
+        with self._lock:
+            # Several changes to one entry are merged in order into one update
+            merged: Dict[str, Dict[str, Any]] = {}
+            for change in changes:
+                key = change["id"]
+                if key in result["missing"] or key in result["conflicts"]:
+                    continue
+                if key not in merged:
+                    current = self.get_entry(key)
+                    if current is None:
+                        result["missing"].append(key)
+                        continue
+                    merged[key] = current
+                if change.get("version", merged[key]["version"]) != merged[key]["version"]:
+                    result["conflicts"].append(key)
+                    continue
+                merged[key] = {**merged[key], **{k: v for k, v in change.items() if k != "version"}}
+            for key, entry in merged.items():
+                if key in result["conflicts"]:
+                    continue
+                self.update_entry(key, entry["title"], entry["content"], entry["author"], entry.get("media"),
+                                  expected_version=entry["version"])
+                result["updated"].append(key)
+        return result
+
+    def set_entry_tags(self, entry_id: str, tags: List[str]) -> bool:
+        """Same as blog_db.set_entry_tags(); ``tags`` are expected normalised."""
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            if filename is None:
+                return False
+            entry = self._read_entry(os.path.join(self.entries_dir, filename))
+            if entry is None:
+                return False
+            # Tags are not part of the row version, as in the database
+            self._write_entry(entry_id, entry['title'], entry['content'], entry['author'], entry['date'],
+                              entry['media'], list(dict.fromkeys(tags)), version=entry['version'])
+            if filename != f"{entry_id}.json":
+                self._remove(os.path.join(self.entries_dir, filename))
+                self._files.pop(filename, None)
+                self._save_manifest()
+            return True
+
+    def delete_entry(self, entry_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            if filename is None:
+                return False
+            self._remove(os.path.join(self.entries_dir, filename))
+            self._remove(self._comments_path(entry_id))
+            self._files.pop(filename, None)
+            self._ordered = None
+            self._save_manifest()
+            return True
+
+    def add_comment(self, entry_id: str, author: str, content: str) -> bool:
+        with self._lock:
+            self._refresh()
+            filename = self._filename_for(entry_id)
+            if filename is None:
+                return False
+            comments = self.get_comments(entry_id)
+            comments.append({
+                'author': author,
+                'content': content,
+                'date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            os.makedirs(self.comments_dir, exist_ok=True)
+            path = self._comments_path(entry_id)
+            _write_json(path, comments, indent=2)
+            summary = self._files[filename]
+            summary['comments_count'] = len(comments)
+            summary['comments_mtime_ns'] = os.stat(path).st_mtime_ns
+            self._save_manifest()
+            return True
+
+    # -- internals --------------------------------------------------------
+    @staticmethod
+    def _public(summary: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': summary['id'],
+            'title': summary['title'],
+            'author': summary['author'],
+            'date': summary['date'],
+            'content': summary['preview'],
+            'comments_count': summary['comments_count'],
+            'media': summary['media'],
+        }
+
+    @staticmethod
+    def _cursor(summary: Dict[str, Any]) -> str:
+        return f"{summary['sort_key']}~{summary['id']}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple:
+        sort_key, sep, entry_id = cursor.partition('~')
+        if not sep or not entry_id:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        return sort_key, entry_id
+
+    def _comments_path(self, entry_id: str) -> str:
+        return os.path.join(self.comments_dir, f"{entry_id}.json")
+
+    def _filename_for(self, entry_id: str) -> Optional[str]:
+        for filename, summary in self._files.items():
+            if summary['id'] == entry_id:
+                return filename
+        return None
+
+    def _write_entry(self, entry_id, title, content, author, date, media, tags=None, version=1) -> None:
+        os.makedirs(self.entries_dir, exist_ok=True)
+        filename = f"{entry_id}.json"
+        path = os.path.join(self.entries_dir, filename)
+        with self._lock:
+            self._refresh()
+            _write_json(path, {
+                'id': entry_id,
+                'title': title,
+                'author': author,
+                'date': date,
+                'content': content,
+                'media': media if isinstance(media, dict) and media.get('id') else None,
+                'tags': list(tags or []),
+                'version': version,
+            }, indent=2)
+            self._files[filename] = self._summarize(filename, os.stat(path).st_mtime_ns)
+            self._ordered = None
+            self._save_manifest()
+
+    @staticmethod
+    def _read_entry(path: str) -> Optional[Dict[str, Any]]:
+        name = os.path.basename(path)
+        stem = os.path.splitext(name)[0]
+        if name.lower().endswith('.txt'):
+            data = parse_entry_file(path)
+            if not data:
+                return None
+            return {
+                'id': stem,
+                'title': data['title'],
+                'author': data['author'],
+                'date': data['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                'content': data['content'],
+                'media': data['media'],
+                'tags': [],
+                'version': 1,
+            }
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to parse {path}: {e}")
+            return None
+        # Other JSON files in the directory are not entries
+        if not isinstance(data, dict) or not ('title' in data or 'content' in data):
+            return None
+        version = data.get('version')
+        return {
+            'id': data.get('id') or stem,
+            'title': data.get('title') or 'Untitled',
+            'author': data.get('author') or 'Anonymous',
+            'date': data.get('date') or '',
+            'content': data.get('content') or '',
+            'media': data.get('media') if isinstance(data.get('media'), dict) else None,
+            'tags': [t for t in data.get('tags') or [] if isinstance(t, str)],
+            # Files written before versions were tracked start at 1, like DB rows
+            'version': version if isinstance(version, int) and not isinstance(version, bool) else 1,
+        }
+
+    def _summarize(self, filename: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
+        entry = self._read_entry(os.path.join(self.entries_dir, filename))
+        if entry is None:
+            return None
+        comments_mtime = self._stat_mtime(self._comments_path(entry['id']))
+        return {
+            'id': entry['id'],
+            'title': entry['title'],
+            'author': entry['author'],
+            'date': entry['date'],
+            'sort_key': _sort_key(entry['date']),
+            'preview': _preview(entry['content']),
+            'media': entry['media'],
+            'tags': entry['tags'],
+            'comments_count': len(self.get_comments(entry['id'])) if comments_mtime else 0,
+            'mtime_ns': mtime_ns,
+            'comments_mtime_ns': comments_mtime,
+        }
+
+    @staticmethod
+    def _stat_mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _load_manifest(self) -> None:
+        mtime = self._stat_mtime(self.manifest_path)
+        if mtime and mtime == self._manifest_mtime:
+            return
+        files: Dict[str, Dict[str, Any]] = {}
+        if mtime:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION and isinstance(data.get('entries'), dict):
+                    files = data['entries']
+            except (OSError, ValueError, AttributeError):
+                files = {}
+        self._files = files
+        self._manifest_mtime = mtime
+        self._ordered = None
+
+    def _save_manifest(self) -> None:
+        try:
+            _write_json(self.manifest_path, {'version': MANIFEST_VERSION, 'entries': self._files})
+            self._manifest_mtime = self._stat_mtime(self.manifest_path)
+        except OSError:
+            # The manifest is only a cache; the next read rebuilds what it needs
+            self._manifest_mtime = None
+
+    def _scan(self, directory: str, suffixes: tuple) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        try:
+            with os.scandir(directory) as it:
+                for e in it:
+                    if e.name.startswith('.') or not e.name.lower().endswith(suffixes):
+                        continue
+                    try:
+                        found[e.name] = e.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return found
+
+    def _refresh(self) -> None:
+        """Bring the manifest in line with the directories (stat only, no reads if unchanged)."""
+        self._load_manifest()
+        entry_files = self._scan(self.entries_dir, ('.json', '.txt'))
+        comment_files = {
+            os.path.splitext(name)[0]: mtime
+            for name, mtime in self._scan(self.comments_dir, ('.json',)).items()
+        }
+        changed = False
+        for filename in [f for f in self._files if f not in entry_files]:
+            del self._files[filename]
+            changed = True
+        for filename, mtime in entry_files.items():
+            summary = self._files.get(filename)
+            if summary is None or summary.get('mtime_ns') != mtime:
+                summary = self._summarize(filename, mtime)
+                if summary is None:
+                    self._files.pop(filename, None)
+                    continue
+                self._files[filename] = summary
+                changed = True
+            comments_mtime = comment_files.get(summary['id'], 0)
+            if summary.get('comments_mtime_ns') != comments_mtime:
+                summary['comments_count'] = len(self.get_comments(summary['id'])) if comments_mtime else 0
+                summary['comments_mtime_ns'] = comments_mtime
+                changed = True
+        if changed:
+            self._ordered = None
+            self._save_manifest()
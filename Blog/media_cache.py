@@ -0,0 +1,223 @@
+"""
+On-disk cache of resized media images served by the Blog's /media/<entry_id> proxy.
+
+Each (source URL, size, format) variant is fetched and produced once, stored
+under the cache directory and then served from disk. The directory is capped
+at ``max_bytes``: least recently served files are evicted first (recency
+survives restarts through file mtimes).
+
+Resizing and WebP conversion use Pillow when it is installed. Without it,
+images on the Pexels CDN are still resized upstream through its ``w=``
+parameter, and other images are stored as fetched.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+# Target widths; images are never upscaled
+VARIANT_WIDTHS = {
+    'thumb': 400,
+    'content': 1200,
+}
+FORMATS = ('webp',)
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+# Entry media URLs come from user-submitted forms; only these hosts are ever fetched
+ALLOWED_HOSTS = ('images.pexels.com', 'videos.pexels.com')
+
+_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+
+class MediaFetchError(RuntimeError):
+    """The source image could not be fetched or is not an image."""
+
+
+def _upstream_url(url: str, width: int) -> str:
+    """Ask the Pexels CDN for a pre-scaled image instead of the multi-MB original."""
+    parts = urlsplit(url)
+    if parts.hostname != 'images.pexels.com':
+        return url
+    query = dict(parse_qsl(parts.query))
+    query.update({'auto': 'compress', 'cs': 'tinysrgb', 'w': str(width)})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class MediaCache:
+    """
+    Args:
+        directory (str): Where variants are stored
+        max_bytes (int): Total size the directory is kept under
+        timeout (float or tuple, optional): requests timeout for upstream fetches
+        session (requests.Session, optional): Session to reuse; one is created if omitted
+        allowed_hosts (tuple, optional): Hosts source URLs may point at
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024, timeout=(3.05, 15), session=None,
+                 allowed_hosts=ALLOWED_HOSTS):
+        self.directory = directory
+        self.allowed_hosts = tuple(allowed_hosts)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # name -> size, least recent first
+        self._total = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    # -- public API -------------------------------------------------------
+    def allows(self, source_url: str) -> bool:
+        """True if ``source_url`` is an http(s) URL on one of the allowed hosts."""
+        parts = urlsplit(source_url or '')
+        return parts.scheme in ('http', 'https') and (parts.hostname or '') in self.allowed_hosts
+
+    def get(self, source_url: str, size: str, fmt: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Return (path, content type) of the cached variant, producing it on a miss.
+
+        Raises:
+            MediaFetchError: if the source cannot be fetched
+            ValueError: if ``size`` is unknown or the source host is not allowed
+        """
+        if size not in VARIANT_WIDTHS:
+            raise ValueError(f"Unknown size: {size!r}")
+        if not self.allows(source_url):
+            raise ValueError(f"Source host not allowed: {source_url!r}")
+        if fmt is not None and (fmt not in FORMATS or Image is None):
+            fmt = None
+        stem = hashlib.sha1(f"{source_url}|{size}|{fmt or ''}".encode('utf-8')).hexdigest()
+
+        found = self._lookup(stem)
+        if found:
+            return found
+        with self._key_lock(stem):
+            # Another thread may have produced it while we waited
+            found = self._lookup(stem)
+            if found:
+                return found
+            data, content_type = self._fetch(_upstream_url(source_url, VARIANT_WIDTHS[size]))
+            data, content_type = self._transform(data, content_type, VARIANT_WIDTHS[size], fmt)
+            name = f"{stem}.{_EXTENSIONS.get(content_type, 'bin')}"
+            self._store(name, data)
+            return os.path.join(self.directory, name), content_type
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+    # -- internals --------------------------------------------------------
+    def _scan(self) -> None:
+        found = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.is_file() and not e.name.endswith('.tmp'):
+                    st = e.stat()
+                    found.append((st.st_mtime, e.name, st.st_size))
+        for _, name, size in sorted(found):
+            self._files[name] = size
+            self._total += size
+
+    def _key_lock(self, stem: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(stem, threading.Lock())
+
+    def _lookup(self, stem: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            name = next((n for n in (f"{stem}.{ext}" for ext in _EXTENSIONS.values()) if n in self._files), None)
+            if name is None:
+                return None
+            self._files.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            # Removed behind our back (e.g. the directory was cleared)
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+                self._key_locks.pop(stem, None)
+            return None
+        ext = name.rsplit('.', 1)[1]
+        return path, next(t for t, e in _EXTENSIONS.items() if e == ext)
+
+    def _fetch(self, url: str) -> Tuple[bytes, str]:
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type not in _EXTENSIONS:
+                raise MediaFetchError(f"Not a supported image ({content_type or 'no content type'}): {url}")
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(64 * 1024):
+                received += len(chunk)
+                if received > MAX_SOURCE_BYTES:
+                    raise MediaFetchError(f"Image larger than {MAX_SOURCE_BYTES} bytes: {url}")
+                chunks.append(chunk)
+            return b''.join(chunks), content_type
+        except requests.exceptions.RequestException as e:
+            raise MediaFetchError(f"Error fetching {url}: {e}") from e
+
+    @staticmethod
+    def _transform(data: bytes, content_type: str, width: int, fmt: Optional[str]) -> Tuple[bytes, str]:
+        if Image is None or content_type == 'image/gif':
+            return data, content_type
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                if img.width > width:
+                    img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+                out = io.BytesIO()
+                if fmt == 'webp':
+                    img.save(out, 'WEBP', quality=80)
+                    return out.getvalue(), 'image/webp'
+                if content_type == 'image/png':
+                    img.save(out, 'PNG', optimize=True)
+                    return out.getvalue(), 'image/png'
+                img.convert('RGB').save(out, 'JPEG', quality=82, optimize=True, progressive=True)
+                return out.getvalue(), 'image/jpeg'
+        except Exception:
+            # Undecodable image: serve it as fetched
+            return data, content_type
+
+    def _store(self, name: str, data: bytes) -> None:
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        evict = []
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._total -= size
+                self._key_locks.pop(old.rsplit('.', 1)[0], None)
+                evict.append(old)
+        for old in evict:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
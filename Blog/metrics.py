@@ -0,0 +1,246 @@
+"""
+Request-level performance metrics for the Blog, exposed in the Prometheus
+text format.
+
+Each request gets a RequestTrace (kept per thread) that accumulates DB query,
+template render and Pexels upstream time; when the request finishes the trace
+feeds the histograms below and can be logged if it was slow. Metrics live in
+process memory, so with several workers each one reports its own numbers.
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; roughly what separates a cached page from a slow DB round trip
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # labels -> bucket counts + [sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0.0] * (len(self.buckets) + 1)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = []
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestTrace:
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    slowest_query: Tuple[float, str] = (0.0, "")
+    render_seconds: float = 0.0
+    pexels_calls: int = 0
+    pexels_seconds: float = 0.0
+    render_started: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self, elapsed: float) -> str:
+        text = (
+            f"{self.method} {self.path} took {elapsed * 1000:.1f} ms: "
+            f"db {self.db_queries} queries {self.db_seconds * 1000:.1f} ms, "
+            f"render {self.render_seconds * 1000:.1f} ms, "
+            f"pexels {self.pexels_calls} calls {self.pexels_seconds * 1000:.1f} ms"
+        )
+        if self.slowest_query[1]:
+            sql = " ".join(self.slowest_query[1].split())[:200]
+            text += f"; slowest query {self.slowest_query[0] * 1000:.1f} ms: {sql}"
+        return text
+
+
+def _statement_kind(sql: str) -> str:
+    words = sql.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+class Metrics:
+    """
+    The Blog's request metrics.
+
+    Args:
+        slow_request_seconds (float, optional): Requests slower than this are
+            reported by finish_request(); 0 or None disables the check
+    """
+
+    def __init__(self, slow_request_seconds: Optional[float] = None):
+        self.slow_request_seconds = slow_request_seconds
+        self.registry = Registry()
+        self.requests = self.registry.register(Counter(
+            "blog_requests_total", "Requests handled.", ("route", "method", "status")))
+        self.request_seconds = self.registry.register(Histogram(
+            "blog_request_duration_seconds", "Request latency by route.", ("route", "method")))
+        self.db_query_seconds = self.registry.register(Histogram(
+            "blog_db_query_duration_seconds", "DB statement latency by statement type.", ("statement",)))
+        self.db_queries_per_request = self.registry.register(Histogram(
+            "blog_db_queries_per_request", "DB statements issued per request.", ("route",), buckets=COUNT_BUCKETS))
+        self.db_seconds_per_request = self.registry.register(Histogram(
+            "blog_db_duration_per_request_seconds", "Total DB time per request.", ("route",)))
+        self.render_seconds = self.registry.register(Histogram(
+            "blog_template_render_duration_seconds", "Template render time.", ("template",)))
+        self.pexels_seconds = self.registry.register(Histogram(
+            "blog_pexels_request_duration_seconds", "Pexels upstream call latency.", ("endpoint",)))
+        self.slow_requests = self.registry.register(Counter(
+            "blog_slow_requests_total", "Requests slower than the slow-request threshold.", ("route",)))
+        self._local = threading.local()
+
+    # -- request lifecycle ------------------------------------------------
+    def start_request(self, method: str, path: str) -> RequestTrace:
+        trace = RequestTrace(method=method, path=path)
+        self._local.trace = trace
+        return trace
+
+    def current(self) -> Optional[RequestTrace]:
+        return getattr(self._local, "trace", None)
+
+    def finish_request(self, route: str, status: int) -> Optional[str]:
+        """Record the current request; returns a slow-request summary or None."""
+        trace = self.current()
+        if trace is None:
+            return None
+        self._local.trace = None
+        elapsed = time.perf_counter() - trace.started
+        self.requests.inc(route, trace.method, str(status))
+        self.request_seconds.observe(elapsed, route, trace.method)
+        self.db_queries_per_request.observe(trace.db_queries, route)
+        self.db_seconds_per_request.observe(trace.db_seconds, route)
+        if self.slow_request_seconds and elapsed >= self.slow_request_seconds:
+            self.slow_requests.inc(route)
+            return trace.summary(elapsed)
+        return None
+
+    # -- observations -----------------------------------------------------
+    def observe_query(self, sql: str, seconds: float) -> None:
+        self.db_query_seconds.observe(seconds, _statement_kind(sql))
+        trace = self.current()
+        if trace is not None:
+            trace.db_queries += 1
+            trace.db_seconds += seconds
+            if seconds > trace.slowest_query[0]:
+                trace.slowest_query = (seconds, sql)
+
+    def render_started(self, template: str) -> None:
+        trace = self.current()
+        if trace is not None:
+            trace.render_started[template] = time.perf_counter()
+
+    def render_finished(self, template: str) -> None:
+        trace = self.current()
+        if trace is None or template not in trace.render_started:
+            return
+        seconds = time.perf_counter() - trace.render_started.pop(template)
+        trace.render_seconds += seconds
+        self.render_seconds.observe(seconds, template)
+
+    def observe_pexels(self, url: str, seconds: float) -> None:
+        endpoint = "videos" if "/videos" in url else "photos"
+        self.pexels_seconds.observe(seconds, endpoint)
+        trace = self.current()
+        if trace is not None:
+            trace.pexels_calls += 1
+            trace.pexels_seconds += seconds
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -1,102 +1,210 @@
 r"""
-One-off migration script: import all existing .txt blog entries from blog_entries/ into the database (entries table).
-- Preserves entry_key as the filename without extension, so existing comment JSON files keyed by entry_id continue to work.
-- Skips any entry_key that already exists in the DB.
+One-off migration script: import all existing blog entries from blog_entries/ into the database (entries table),
+and the per-entry comment JSON files from blog_comments/ into the comments table.
+- Reads both legacy .txt entries and the .json entries the file store writes while the DB is down
+  (new entries, edits and tag changes), including their tags.
+- Preserves entry_key as the filename without extension, so comment JSON files keyed by entry_id map onto it.
+- Skips any entry_key that already exists in the DB (checked with a single query up front).
+- Parses files in a worker pool and inserts new entries with executemany in chunks, all in one transaction:
+  either every new entry is imported or none is.
+- Skips comment files for entries that already have comments in the DB, so re-running is safe.
 
 Run:
-  python projects\Grammar_checker\migrate_files_to_db.py
+  python projects\Grammar_checker\migrate_files_to_db.py [--dry-run] [--chunk-size 500] [--workers 8]
 """
 import os
+import json
+import argparse
 import datetime
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Callable
 
 # Allow running both as module or script
 try:
-    from .blog_db import init_schema, open_connection, _close
+    from . import blog_db
+    from .blog_db import init_schema, open_connection, _close, normalize_tags
+    from .file_store import parse_entry_file
 except ImportError:
-    from blog_db import init_schema, open_connection, _close
+    import blog_db
+    from blog_db import init_schema, open_connection, _close, normalize_tags
+    from file_store import parse_entry_file
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BLOG_ENTRIES_DIR = os.path.join(BASE_DIR, 'blog_entries')
+COMMENTS_DIR = os.path.join(BASE_DIR, 'blog_comments')
 
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) + 4)
 
-def parse_entry_file(filepath: str) -> Optional[Dict[str, Any]]:
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        lines = content.split('\n')
-        title = lines[0].replace('Title: ', '') if lines and lines[0].startswith('Title: ') else 'Untitled'
-        author = lines[1].replace('Author: ', '') if len(lines) > 1 and lines[1].startswith('Author: ') else 'Anonymous'
-        date_str = lines[2].replace('Date: ', '') if len(lines) > 2 and lines[2].startswith('Date: ') else ''
+INSERT_ENTRY_SQL = """
+    INSERT INTO entries
+    (entry_key, title, author, created_at, content,
+     media_id, media_type, media_url, media_thumbnail, media_width, media_height, media_attribution)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+INSERT_ENTRY_TAG_SQL = "INSERT INTO entry_tags (entry_key, tag_id) SELECT %s, id FROM tags WHERE name=%s"
 
-        # Try to parse datetime
-        try:
-            created_at = datetime.datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S') if date_str else datetime.datetime.now()
-        except Exception:
-            created_at = datetime.datetime.now()
 
-        media = None
-        line_index = 3
-        if len(lines) > line_index and lines[line_index].startswith('Media-ID:'):
-            media = {
-                'id': lines[line_index].replace('Media-ID: ', ''),
-                'type': lines[line_index + 1].replace('Media-Type: ', '') if len(lines) > line_index + 1 else '',
-                'url': lines[line_index + 2].replace('Media-URL: ', '') if len(lines) > line_index + 2 else '',
-                'thumbnail': lines[line_index + 3].replace('Media-Thumbnail: ', '') if len(lines) > line_index + 3 else '',
-                'width': lines[line_index + 4].replace('Media-Width: ', '') if len(lines) > line_index + 4 else '',
-                'height': lines[line_index + 5].replace('Media-Height: ', '') if len(lines) > line_index + 5 else '',
-                'attribution': lines[line_index + 6].replace('Media-Attribution: ', '') if len(lines) > line_index + 6 else ''
-            }
-            line_index += 7
-
-        content_start_index = line_index + 1
-        entry_body = '\n'.join(lines[content_start_index:]) if len(lines) > content_start_index else ''
-
-        return {
-            'title': title,
-            'author': author,
-            'created_at': created_at,
-            'content': entry_body,
-            'media': media,
-        }
-    except Exception as e:
-        print(f"Failed to parse {filepath}: {e}")
-        return None
+def parse_entry_files(filepaths: List[str], workers: int = DEFAULT_WORKERS) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parse files concurrently; returns (entry_key, data) in input order, skipping failures."""
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        parsed = list(pool.map(parse_entry_file, filepaths))
+    return [
+        (os.path.splitext(os.path.basename(path))[0], data)
+        for path, data in zip(filepaths, parsed)
+        if data
+    ]
+
+
+def existing_entry_keys(conn) -> set:
+    """All entry_keys already in the DB, in one index-only query."""
+    cur = conn.cursor()
+    cur.execute("SELECT entry_key FROM entries")
+    return {r[0] for r in cur.fetchall()}
+
+
+def _entry_row(entry_key: str, data: Dict[str, Any]) -> tuple:
+    media = data.get('media') or {}
+    return (
+        entry_key,
+        data['title'],
+        data['author'],
+        data['created_at'],
+        data['content'],
+        media.get('id'),
+        media.get('type'),
+        media.get('url'),
+        media.get('thumbnail'),
+        media.get('width'),
+        media.get('height'),
+        media.get('attribution'),
+    )
+
 
+def bulk_insert_entries(conn, rows: List[tuple], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        progress: Callable[[str], None] = print,
+                        tags: Optional[List[Tuple[str, str]]] = None) -> int:
+    """Insert rows with executemany in chunks inside one transaction; rolls back on any error.
 
-def ensure_entry(conn, entry_key: str, data: Dict[str, Any]) -> bool:
-    """Insert if not exists; returns True if inserted or already exists."""
+    ``tags`` are (entry_key, tag) pairs attached in the same transaction.
+    """
     cur = conn.cursor()
-    cur.execute("SELECT 1 FROM entries WHERE entry_key=%s", (entry_key,))
+    done = 0
+    try:
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            cur.executemany(INSERT_ENTRY_SQL, chunk)
+            done += len(chunk)
+            progress(f"Inserted {done}/{len(rows)} entries")
+        if tags:
+            insert_ignore = "INSERT OR IGNORE" if blog_db.DB_BACKEND == "sqlite" else "INSERT IGNORE"
+            names = sorted({name for _, name in tags})
+            cur.executemany(f"{insert_ignore} INTO tags (name) VALUES (%s)", [(n,) for n in names])
+            cur.executemany(INSERT_ENTRY_TAG_SQL, tags)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return done
+
+
+def import_entries(conn, entries_dir: str = BLOG_ENTRIES_DIR, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   workers: int = DEFAULT_WORKERS, dry_run: bool = False,
+                   progress: Callable[[str], None] = print) -> Dict[str, int]:
+    """Import every .txt and .json entry in entries_dir that is not already in the DB.
+
+    Returns counts: files, parsed, existing, inserted (would-be inserts for a dry run).
+    """
+    paths = [
+        os.path.join(entries_dir, name)
+        for name in sorted(os.listdir(entries_dir))
+        if name.endswith(('.txt', '.json')) and not name.startswith('.')
+    ]
+    parsed = parse_entry_files(paths, workers=workers)
+    progress(f"Parsed {len(parsed)}/{len(paths)} files")
+
+    existing = existing_entry_keys(conn)
+    new = [(key, data) for key, data in parsed if key not in existing]
+    rows = [_entry_row(key, data) for key, data in new]
+    tags = [(key, tag) for key, data in new for tag in normalize_tags(data.get('tags') or [])]
+    stats = {
+        'files': len(paths),
+        'parsed': len(parsed),
+        'existing': len(parsed) - len(rows),
+        'inserted': len(rows),
+    }
+    if dry_run:
+        for row in rows:
+            progress(f"Would insert: {row[0]}")
+        return stats
+    if rows:
+        bulk_insert_entries(conn, rows, chunk_size=chunk_size, progress=progress, tags=tags)
+    return stats
+
+
+def import_comment_file(conn, entry_key: str, filepath: str) -> int:
+    """Copy one blog_comments/<entry_key>.json file into the comments table.
+
+    Returns the number of comments inserted (0 if the entry already has comments
+    in the DB or the file is unreadable). Each file is imported in one transaction.
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            comments = json.load(f)
+    except Exception as e:
+        print(f"Failed to read {filepath}: {e}")
+        return 0
+    if not isinstance(comments, list) or not comments:
+        return 0
+
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM comments WHERE entry_key=%s LIMIT 1", (entry_key,))
     if cur.fetchone():
-        return True
-    cur.execute(
-        """
-        INSERT INTO entries
-        (entry_key, title, author, created_at, content,
-         media_id, media_type, media_url, media_thumbnail, media_width, media_height, media_attribution)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            entry_key,
-            data['title'],
-            data['author'],
-            data['created_at'],
-            data['content'],
-            (data.get('media') or {}).get('id'),
-            (data.get('media') or {}).get('type'),
-            (data.get('media') or {}).get('url'),
-            (data.get('media') or {}).get('thumbnail'),
-            (data.get('media') or {}).get('width'),
-            (data.get('media') or {}).get('height'),
-            (data.get('media') or {}).get('attribution'),
-        ),
+        return 0
+
+    rows = []
+    for c in comments:
+        if not isinstance(c, dict) or not c.get('content'):
+            continue
+        try:
+            created_at = datetime.datetime.strptime(c.get('date', ''), '%Y-%m-%d %H:%M:%S')
+        except Exception:
+            created_at = datetime.datetime.now()
+        rows.append((entry_key, c.get('author') or 'Anonymous', c['content'], created_at))
+    if not rows:
+        return 0
+    cur.executemany(
+        "INSERT INTO comments (entry_key, author, content, created_at) VALUES (%s, %s, %s, %s)",
+        rows,
     )
     conn.commit()
-    return True
+    return len(rows)
+
 
+def migrate_comments(conn) -> None:
+    if not os.path.isdir(COMMENTS_DIR):
+        return
+    files = 0
+    imported = 0
+    for filename in sorted(os.listdir(COMMENTS_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        files += 1
+        entry_key = os.path.splitext(filename)[0]
+        count = import_comment_file(conn, entry_key, os.path.join(COMMENTS_DIR, filename))
+        if count:
+            imported += count
+            print(f"Imported {count} comment(s): {entry_key}")
+    print(f"Comments done. Files: {files}. Imported: {imported}.")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Import blog_entries/*.txt|*.json and blog_comments/*.json into the database.')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be imported without writing')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per executemany batch')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='parallel file parsers')
+    args = parser.parse_args(argv)
 
-def main():
     if not os.path.isdir(BLOG_ENTRIES_DIR):
         print('No blog_entries directory found. Nothing to migrate.')
         return
@@ -104,21 +212,15 @@ def main():
     init_schema()
     conn = open_connection()
     try:
-        total = 0
-        migrated = 0
-        for filename in sorted(os.listdir(BLOG_ENTRIES_DIR)):
-            if not filename.endswith('.txt'):
-                continue
-            total += 1
-            entry_key = os.path.splitext(filename)[0]
-            filepath = os.path.join(BLOG_ENTRIES_DIR, filename)
-            data = parse_entry_file(filepath)
-            if not data:
-                continue
-            if ensure_entry(conn, entry_key, data):
-                migrated += 1
-                print(f"Upserted: {entry_key}")
-        print(f"Done. Processed: {total}. Upserted/exists: {migrated}.")
+        stats = import_entries(conn, chunk_size=max(1, args.chunk_size), workers=args.workers,
+                               dry_run=args.dry_run)
+        verb = 'Would insert' if args.dry_run else 'Inserted'
+        print(f"Done. Files: {stats['files']}. Parsed: {stats['parsed']}. "
+              f"Already present: {stats['existing']}. {verb}: {stats['inserted']}.")
+        if args.dry_run:
+            print('Dry run: comments not imported.')
+        else:
+            migrate_comments(conn)
     finally:
         _close(conn)
 
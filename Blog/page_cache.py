@@ -0,0 +1,212 @@
+"""
+Cache of rendered Blog pages with TTL, LRU eviction and tag-based invalidation.
+
+Pages live in memory; if a directory is given they are also written to disk so
+that several workers (e.g. on PythonAnywhere) share both the pages and the
+invalidations. Each page is stored with tags such as ``"listing"`` or
+``"entry:<id>"``; invalidating a tag drops every page rendered before that
+moment that carries it.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: str
+    etag: str
+    last_modified: float  # epoch seconds when rendering started
+    expires: float
+    tags: Tuple[str, ...]
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """
+    Thread-safe rendered-page cache.
+
+    Args:
+        max_entries (int): Pages kept in memory before the least recently used is evicted
+        ttl (float): Seconds a page stays valid
+        directory (str, optional): Share pages and invalidations with other processes via this directory
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self._pages: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._invalidated: dict = {}  # tag -> epoch seconds of last invalidation
+        self._lock = threading.Lock()
+        self._writes = 0
+        if directory:
+            os.makedirs(os.path.join(directory, "tags"), exist_ok=True)
+
+    # -- public API -------------------------------------------------------
+    def get(self, key: str) -> Optional[CachedPage]:
+        now = time.time()
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                if page.expires > now and not self._is_stale(page):
+                    self._pages.move_to_end(key)
+                    return page
+                del self._pages[key]
+        if not self.directory:
+            return None
+        page = self._read_disk(key)
+        if page is None or page.expires <= now or self._is_stale(page):
+            return None
+        with self._lock:
+            self._remember(key, page)
+        return page
+
+    def set(self, key: str, body: str, tags: Iterable[str] = (), since: Optional[float] = None) -> CachedPage:
+        """
+        Store a rendered page and return it.
+
+        ``since`` is when rendering started (defaults to now). If one of the
+        tags was invalidated after that, the page is returned but not stored,
+        so a write that races with a render cannot leave stale HTML behind.
+        """
+        started = time.time() if since is None else since
+        page = CachedPage(
+            body=body,
+            etag=_digest(body),
+            last_modified=started,
+            expires=started + self.ttl,
+            tags=tuple(tags),
+        )
+        with self._lock:
+            if self._is_stale(page):
+                return page
+            self._remember(key, page)
+        if self.directory:
+            self._write_disk(key, page)
+        return page
+
+    def invalidate(self, *tags: str) -> None:
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._invalidated[tag] = now
+            for key in [k for k, p in self._pages.items() if set(p.tags) & set(tags)]:
+                del self._pages[key]
+        if self.directory:
+            for tag in tags:
+                path = self._tag_path(tag)
+                with open(path, "a", encoding="utf-8"):
+                    pass
+                os.utime(path, (now, now))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages)
+
+    # -- internals --------------------------------------------------------
+    def _remember(self, key: str, page: CachedPage) -> None:
+        self._pages[key] = page
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+    def _is_stale(self, page: CachedPage) -> bool:
+        return any(self._invalidated_at(tag) >= page.last_modified for tag in page.tags)
+
+    def _invalidated_at(self, tag: str) -> float:
+        stamp = self._invalidated.get(tag, 0.0)
+        if self.directory:
+            try:
+                stamp = max(stamp, os.stat(self._tag_path(tag)).st_mtime)
+            except OSError:
+                pass
+        return stamp
+
+    def _tag_path(self, tag: str) -> str:
+        return os.path.join(self.directory, "tags", _digest(tag))
+
+    def _page_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{_digest(key)}.json")
+
+    def _read_disk(self, key: str) -> Optional[CachedPage]:
+        try:
+            with open(self._page_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") != key:
+                return None
+            return CachedPage(
+                body=data["body"],
+                etag=data["etag"],
+                last_modified=data["last_modified"],
+                expires=data["expires"],
+                tags=tuple(data["tags"]),
+            )
+        except Exception:
+            return None
+
+    def _write_disk(self, key: str, page: CachedPage) -> None:
+        path = self._page_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "key": key,
+                        "body": page.body,
+                        "etag": page.etag,
+                        "last_modified": page.last_modified,
+                        "expires": page.expires,
+                        "tags": list(page.tags),
+                    },
+                    f,
+                )
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove expired page files and keep at most ``max_entries`` on disk."""
+        now = time.time()
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if mtime + self.ttl <= now:
+                self._remove(path)
+            else:
+                files.append((mtime, path))
+        files.sort(reverse=True)
+        for _, path in files[self.max_entries:]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
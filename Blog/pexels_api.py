@@ -1,118 +1,77 @@
 """
 Module for interacting with the Pexels API to search for images and videos.
+
+PexelsAPI is a blocking front end to pexels_async.AsyncPexelsAPI: every call
+runs the async client to completion, so both share one implementation of the
+requests, the search cache and the coalescing of identical searches. Do not
+call it from code that is already running on an event loop; await the
+AsyncPexelsAPI methods there instead.
 """
-import requests
-import json
+import asyncio
+
+try:
+    from .pexels_async import AsyncPexelsAPI, RequestsTransport  # type: ignore
+except Exception:
+    from pexels_async import AsyncPexelsAPI, RequestsTransport  # type: ignore
+
 
 class PexelsAPI:
     """
     A class to interact with the Pexels API for searching images and videos.
+
+    Requests go through one keep-alive session with explicit timeouts; caching
+    and coalescing are as in AsyncPexelsAPI, whose methods these mirror.
     """
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, timeout=(3.05, 10), cache_ttl=300, cache_size=128,
+                 base_url='https://api.pexels.com/v1', video_url='https://api.pexels.com/videos',
+                 session=None, on_request=None):
         """
         Initialize the PexelsAPI with the given API key.
 
         Args:
             api_key (str): The Pexels API key
+            timeout (float or tuple, optional): requests timeout (connect, read) in seconds
+            cache_ttl (float, optional): Seconds a search response is reused. 0 disables caching.
+            cache_size (int, optional): Maximum number of cached search responses
+            base_url (str, optional): Photo API root (overridable for tests)
+            video_url (str, optional): Video API root (overridable for tests)
+            session (requests.Session, optional): Session to reuse; one is created if omitted
+            on_request (callable, optional): Called as ``on_request(url, seconds)`` after each upstream HTTP call
         """
-        self.api_key = api_key
-        self.headers = {
-            'Authorization': api_key
-        }
-        self.base_url = 'https://api.pexels.com/v1'
-        self.video_url = 'https://api.pexels.com/videos'
+        self.client = AsyncPexelsAPI(api_key, timeout=timeout, cache_ttl=cache_ttl, cache_size=cache_size,
+                                     base_url=base_url, video_url=video_url,
+                                     transport=RequestsTransport(session), on_request=on_request)
+        self.session = self.client.transport.session
 
-    def search_photos(self, query, per_page=10, page=1):
-        """
-        Search for photos on Pexels.
+    @property
+    def on_request(self):
+        return self.client.on_request
 
-        Args:
-            query (str): The search query
-            per_page (int, optional): Number of results per page. Defaults to 10.
-            page (int, optional): Page number. Defaults to 1.
+    @on_request.setter
+    def on_request(self, callback):
+        self.client.on_request = callback
 
-        Returns:
-            dict: The API response containing photo results
-        """
-        url = f"{self.base_url}/search"
-        params = {
-            'query': query,
-            'per_page': per_page,
-            'page': page
-        }
+    def clear_cache(self):
+        """Drop all cached search responses."""
+        self.client.clear_cache()
 
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching photos: {str(e)}")
-            return {'photos': []}
+    def search_photos(self, query, per_page=10, page=1):
+        """Blocking AsyncPexelsAPI.search_photos()."""
+        return asyncio.run(self.client.search_photos(query, per_page=per_page, page=page))
 
     def search_videos(self, query, per_page=10, page=1):
-        """
-        Search for videos on Pexels.
-
-        Args:
-            query (str): The search query
-            per_page (int, optional): Number of results per page. Defaults to 10.
-            page (int, optional): Page number. Defaults to 1.
-
-        Returns:
-            dict: The API response containing video results
-        """
-        url = f"{self.video_url}/search"
-        params = {
-            'query': query,
-            'per_page': per_page,
-            'page': page
-        }
+        """Blocking AsyncPexelsAPI.search_videos()."""
+        return asyncio.run(self.client.search_videos(query, per_page=per_page, page=page))
 
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching videos: {str(e)}")
-            return {'videos': []}
+    def search_all(self, query, per_page=10, page=1):
+        """Blocking AsyncPexelsAPI.search_all()."""
+        return asyncio.run(self.client.search_all(query, per_page=per_page, page=page))
 
     def get_photo_by_id(self, photo_id):
-        """
-        Get a specific photo by its ID.
-
-        Args:
-            photo_id (str): The ID of the photo
-
-        Returns:
-            dict: The photo data
-        """
-        url = f"{self.base_url}/photos/{photo_id}"
-
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting photo: {str(e)}")
-            return None
+        """Blocking AsyncPexelsAPI.get_photo_by_id()."""
+        return asyncio.run(self.client.get_photo_by_id(photo_id))
 
     def get_video_by_id(self, video_id):
-        """
-        Get a specific video by its ID.
-
-        Args:
-            video_id (str): The ID of the video
-
-        Returns:
-            dict: The video data
-        """
-        url = f"{self.video_url}/videos/{video_id}"
-
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting video: {str(e)}")
-            return None
+        """Blocking AsyncPexelsAPI.get_video_by_id()."""
+        return asyncio.run(self.client.get_video_by_id(video_id))
@@ -0,0 +1,251 @@
+"""
+asyncio client for the Pexels API, able to search photos and videos concurrently.
+
+The HTTP layer is an injectable transport: any object with an awaitable
+``get(url, params=None, headers=None, timeout=None)`` returning a response
+with ``raise_for_status()`` and ``json()`` will do, so an ``httpx.AsyncClient``
+can be passed directly and tests can pass a fake. The default transport runs a
+shared ``requests.Session`` in worker threads, which keeps connection reuse
+and works under any event loop, including one created per Flask request with
+``asyncio.run``.
+
+This is the only Pexels client implementation; pexels_api.PexelsAPI is a
+blocking wrapper around it.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=128, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class RequestsTransport:
+    """Default transport: blocking requests calls run off the event loop."""
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        return await asyncio.to_thread(self.session.get, url, params=params, headers=headers, timeout=timeout)
+
+
+class AsyncPexelsAPI:
+    """
+    A class to interact with the Pexels API for searching images and videos.
+
+    Search responses are cached (TTL + LRU) per (endpoint, query, page,
+    per_page). Identical searches running at the same time share a single
+    upstream call, whichever thread or event loop they run on (each Flask
+    request has its own loop). Cached results are shared between callers and
+    must not be mutated.
+    """
+
+    def __init__(self, api_key, timeout=(3.05, 10), cache_ttl=300, cache_size=128,
+                 base_url='https://api.pexels.com/v1', video_url='https://api.pexels.com/videos',
+                 transport=None, on_request=None):
+        """
+        Initialize the client with the given API key.
+
+        Args:
+            api_key (str): The Pexels API key
+            timeout (optional): Passed to the transport as-is. Defaults to the
+                (connect, read) seconds tuple RequestsTransport hands to requests;
+                give an ``httpx.Timeout`` when the transport is an httpx client.
+            cache_ttl (float, optional): Seconds a search response is reused. 0 disables caching.
+            cache_size (int, optional): Maximum number of cached search responses
+            base_url (str, optional): Photo API root (overridable for tests)
+            video_url (str, optional): Video API root (overridable for tests)
+            transport (optional): HTTP transport (see module docstring); RequestsTransport if omitted
+            on_request (callable, optional): Called as ``on_request(url, seconds)`` after each upstream HTTP call
+        """
+        self.api_key = api_key
+        self.headers = {
+            'Authorization': api_key
+        }
+        self.base_url = base_url
+        self.video_url = video_url
+        self.timeout = timeout
+        self.transport = transport or RequestsTransport()
+        self.on_request = on_request
+        self._cache = _TTLCache(max_entries=cache_size, ttl=cache_ttl)
+        self._inflight = {}  # key -> concurrent.futures.Future, awaitable from any loop
+        self._inflight_lock = threading.Lock()
+
+    async def _get_json(self, url, params=None):
+        start = time.perf_counter()
+        try:
+            response = await self.transport.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            return response.json()
+        finally:
+            if self.on_request is not None:
+                self.on_request(url, time.perf_counter() - start)
+
+    async def _search(self, endpoint, url, query, per_page, page, empty):
+        """
+        Cached, coalesced search. Failed requests are not cached and return
+        ``empty``, so one failing media type never breaks a combined search.
+        """
+        key = (endpoint, ' '.join(str(query).split()).lower(), page, per_page)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+        if not leader:
+            # Shielded so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        result = empty
+        try:
+            params = {
+                'query': query,
+                'per_page': per_page,
+                'page': page
+            }
+            result = await self._get_json(url, params)
+            self._cache.set(key, result)
+        except Exception as e:
+            print(f"Error searching {endpoint}: {str(e)}")
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            future.set_result(result)
+        return result
+
+    def clear_cache(self):
+        """Drop all cached search responses."""
+        self._cache.clear()
+
+    async def search_photos(self, query, per_page=10, page=1):
+        """
+        Search for photos on Pexels.
+
+        Args:
+            query (str): The search query
+            per_page (int, optional): Number of results per page. Defaults to 10.
+            page (int, optional): Page number. Defaults to 1.
+
+        Returns:
+            dict: The API response containing photo results
+        """
+        url = f"{self.base_url}/search"
+        return await self._search('photos', url, query, per_page, page, {'photos': []})
+
+    async def search_videos(self, query, per_page=10, page=1):
+        """
+        Search for videos on Pexels.
+
+        Args:
+            query (str): The search query
+            per_page (int, optional): Number of results per page. Defaults to 10.
+            page (int, optional): Page number. Defaults to 1.
+
+        Returns:
+            dict: The API response containing video results
+        """
+        url = f"{self.video_url}/search"
+        return await self._search('videos', url, query, per_page, page, {'videos': []})
+
+    async def get_photo_by_id(self, photo_id):
+        """
+        Get a specific photo by its ID.
+
+        Args:
+            photo_id (str): The ID of the photo
+
+        Returns:
+            dict: The photo data, or None if the request failed
+        """
+        url = f"{self.base_url}/photos/{photo_id}"
+        try:
+            return await self._get_json(url)
+        except Exception as e:
+            print(f"Error getting photo: {str(e)}")
+            return None
+
+    async def get_video_by_id(self, video_id):
+        """
+        Get a specific video by its ID.
+
+        Args:
+            video_id (str): The ID of the video
+
+        Returns:
+            dict: The video data, or None if the request failed
+        """
+        url = f"{self.video_url}/videos/{video_id}"
+        try:
+            return await self._get_json(url)
+        except Exception as e:
+            print(f"Error getting video: {str(e)}")
+            return None
+
+    async def search_all(self, query, per_page=10, page=1):
+        """
+        Search photos and videos concurrently and merge the results.
+
+        Takes as long as the slower of the two searches, not their sum.
+
+        Args:
+            query (str): The search query
+            per_page (int, optional): Results per page of each media type. Defaults to 10.
+            page (int, optional): Page number. Defaults to 1.
+
+        Returns:
+            dict: ``photos`` and ``videos`` lists, ``page``, ``per_page`` and
+            ``total_results`` (photos + videos)
+        """
+        photos, videos = await asyncio.gather(
+            self.search_photos(query, per_page=per_page, page=page),
+            self.search_videos(query, per_page=per_page, page=page),
+        )
+        return {
+            'page': page,
+            'per_page': per_page,
+            'photos': photos.get('photos', []),
+            'videos': videos.get('videos', []),
+            'total_results': photos.get('total_results', 0) + videos.get('total_results', 0),
+        }
@@ -0,0 +1,115 @@
+"""
+Text search helpers for the Blog: tokenising, highlighted snippets, and an
+in-memory inverted index used when entries come from files instead of MySQL.
+"""
+import math
+import re
+from typing import Any, Dict, List, Tuple
+
+from markupsafe import Markup, escape
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Title words count this many times as often as body words when ranking.
+TITLE_WEIGHT = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(text or "")]
+
+
+def make_snippet(text: str, terms: List[str], width: int = 200) -> Markup:
+    """
+    Return an HTML-safe excerpt of ``text`` around the first matching term,
+    with every occurrence of the terms wrapped in <mark>.
+    """
+    text = text or ""
+    pattern = None
+    if terms:
+        alternatives = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+        pattern = re.compile(rf"\b({alternatives})\b", re.IGNORECASE)
+
+    first = pattern.search(text) if pattern else None
+    start = max(0, first.start() - width // 3) if first else 0
+    end = min(len(text), start + width)
+    excerpt = text[start:end]
+
+    parts: List[str] = ["..." if start > 0 else ""]
+    pos = 0
+    if pattern:
+        for m in pattern.finditer(excerpt):
+            parts.append(str(escape(excerpt[pos:m.start()])))
+            parts.append(f"<mark>{escape(m.group(0))}</mark>")
+            pos = m.end()
+    parts.append(str(escape(excerpt[pos:])))
+    if end < len(text):
+        parts.append("...")
+    return Markup("".join(parts))
+
+
+class InvertedIndex:
+    """
+    In-memory term -> postings index ranked with BM25.
+
+    Documents are added with an id, title and content plus any metadata to
+    hand back with search hits (author, date, ...).
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, title: str, content: str, **meta: Any) -> None:
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        counts: Dict[str, int] = {}
+        for term in tokenize(title):
+            counts[term] = counts.get(term, 0) + TITLE_WEIGHT
+        for term in tokenize(content):
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        self._docs[doc_id] = dict(meta, id=doc_id, title=title, content=content)
+
+    def remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id, 0)
+        for term in set(tokenize(doc["title"]) + tokenize(doc["content"])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (total matching documents, one page of hits with a ``score``)."""
+        terms = set(tokenize(query))
+        n = len(self._docs)
+        if not terms or not n:
+            return 0, []
+        avg_length = self._total_length / n
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        hits = [dict(self._docs[doc_id], score=score) for doc_id, score in ranked[offset:offset + limit]]
+        return len(ranked), hits
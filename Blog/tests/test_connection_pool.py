@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+from blog_db import ConnectionPool, PoolTimeout  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+        self.pings = 0
+        self.rollbacks = 0
+
+    def ping(self):
+        self.pings += 1
+        if not self.alive:
+            raise OSError("server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+
+def test_connections_are_reused():
+    connect = FakeConnector()
+    pool = ConnectionPool(connect, max_size=2)
+    for _ in range(5):
+        with pool.connection() as conn:
+            assert conn is connect.created[0]
+    assert len(connect.created) == 1
+    assert pool.idle_count == 1
+
+
+def test_pool_is_bounded_and_times_out():
+    pool = ConnectionPool(FakeConnector(), max_size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_waiter_gets_released_connection():
+    pool = ConnectionPool(FakeConnector(), max_size=1, timeout=2)
+    held = pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire()))
+    t.start()
+    time.sleep(0.05)
+    pool.release(held)
+    t.join(1)
+    assert got == [held]
+
+
+def test_dead_connection_is_replaced_after_ping():
+    connect = FakeConnector()
+    pool = ConnectionPool(connect, ping_after=0)
+    with pool.connection() as first:
+        pass
+    first.alive = False
+    with pool.connection() as second:
+        assert second is not first
+    assert first.closed
+    assert first.pings == 1
+
+
+def test_idle_connections_are_evicted():
+    connect = FakeConnector()
+    pool = ConnectionPool(connect, max_idle=0.01)
+    with pool.connection() as first:
+        pass
+    time.sleep(0.03)
+    with pool.connection() as second:
+        assert second is not first
+    assert first.closed
+
+
+def test_error_rolls_back_and_returns_connection():
+    pool = ConnectionPool(FakeConnector())
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError("boom")
+    assert conn.rollbacks == 1
+    assert pool.size == 1 and pool.idle_count == 1
+
+
+def test_pinned_connection_shared_until_unpin():
+    connect = FakeConnector()
+    pool = ConnectionPool(connect, max_size=1, timeout=0.05)
+    pool.pin()
+    with pool.connection() as a:
+        pass
+    with pool.connection() as b:
+        pass
+    assert a is b
+    assert pool.idle_count == 0
+    pool.unpin()
+    assert pool.idle_count == 1
+    assert len(connect.created) == 1
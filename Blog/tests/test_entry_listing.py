@@ -0,0 +1,128 @@
+import datetime
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+
+
+def make_rows(n):
+    base = datetime.datetime(2025, 6, 1, 8, 0, 0)
+    rows = []
+    for i in range(n):
+        # Pairs of entries share a timestamp so the entry_key tie-breaker matters
+        created = base + datetime.timedelta(hours=i // 2)
+        rows.append((f"key{i:03d}", f"Title {i}", "Derek", created, "x" * (150 + i * 10),
+                     None, None, None, None, None, None, None, 1))
+    return rows
+
+
+class KeysetCursor:
+    """Emulates the keyset SELECT issued by get_entry_page() over in-memory rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.result = []
+
+    def execute(self, sql, params):
+        key = lambda r: (r[3], r[0])  # noqa: E731
+        limit = params[-1]
+        if "entry_key >" in sql:
+            bound = (params[0], params[2])
+            rows = sorted((r for r in self.rows if key(r) > bound), key=key)
+        elif "entry_key <" in sql:
+            bound = (params[0], params[2])
+            rows = sorted((r for r in self.rows if key(r) < bound), key=key, reverse=True)
+        else:
+            rows = sorted(self.rows, key=key, reverse=True)
+        assert "SUBSTR(content, 1, 201)" in sql
+        assert "FROM comments" in sql
+        # Pretend entry N has N comments
+        self.result = [r[:4] + (r[4][:201],) + r[5:] + (int(r[1].split()[1]),)
+                       for r in rows[:limit]]
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    data = make_rows(7)
+
+    class Conn:
+        def cursor(self):
+            return KeysetCursor(data)
+
+    @contextmanager
+    def fake_connection():
+        yield Conn()
+
+    monkeypatch.setattr(blog_db, "connection", fake_connection)
+    return data
+
+
+def titles(page):
+    return [e["title"] for e in page["entries"]]
+
+
+def test_walks_all_pages_forward_and_back(rows):
+    first = blog_db.get_entry_page(per_page=3)
+    assert titles(first) == ["Title 6", "Title 5", "Title 4"]
+    assert first["prev_cursor"] is None
+
+    second = blog_db.get_entry_page(per_page=3, before=first["next_cursor"])
+    assert titles(second) == ["Title 3", "Title 2", "Title 1"]
+
+    last = blog_db.get_entry_page(per_page=3, before=second["next_cursor"])
+    assert titles(last) == ["Title 0"]
+    assert last["next_cursor"] is None
+
+    back = blog_db.get_entry_page(per_page=3, after=last["prev_cursor"])
+    assert titles(back) == titles(second)
+    assert back["next_cursor"] is not None
+
+    top = blog_db.get_entry_page(per_page=3, after=back["prev_cursor"])
+    assert titles(top) == titles(first)
+    assert top["prev_cursor"] is None
+
+
+def test_preview_is_truncated_with_ellipsis(rows):
+    page = blog_db.get_entry_page(per_page=7)
+    by_title = {e["title"]: e["content"] for e in page["entries"]}
+    assert by_title["Title 0"] == "x" * 150
+    assert by_title["Title 6"] == "x" * 200 + "..."
+
+
+def test_page_entries_carry_comment_counts(rows):
+    page = blog_db.get_entry_page(per_page=3)
+    assert [e["comments_count"] for e in page["entries"]] == [6, 5, 4]
+
+
+def test_cursor_round_trip_and_validation():
+    stamp = datetime.datetime(2025, 6, 13, 17, 13, 59)
+    cursor = blog_db.encode_cursor(stamp, "20250613_171359_June_9__2025_75th")
+    assert blog_db.decode_cursor(cursor) == (stamp, "20250613_171359_June_9__2025_75th")
+    with pytest.raises(ValueError):
+        blog_db.decode_cursor("not-a-cursor")
+
+
+def test_rows_map_to_compact_entries():
+    stamp = datetime.datetime(2025, 6, 13, 17, 13, 59)
+    row = ("k1", "Title", "Derek", stamp, "Body", "42", "photo", "u", "t", None, "", "by X", 3)
+    entry = blog_db._row_to_entry(row)
+    assert not hasattr(entry, "__dict__")
+    assert entry.date == entry["date"] == "2025-06-13 17:13:59"
+    assert entry.media.url == entry["media"].get("url") == "u"
+    assert entry.media.width == ""
+    assert entry["version"] == 3
+    assert entry.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        entry["missing"]
+    assert blog_db._row_to_entry(row[:5] + (None,) * 7 + (1,)).media is None
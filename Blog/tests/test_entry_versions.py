@@ -0,0 +1,148 @@
+import datetime
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+
+
+class VersionedTable:
+    """Just enough of the entries table to run the versioned UPDATE statements."""
+
+    def __init__(self, versions):
+        self.rows = {k: {"version": v} for k, v in versions.items()}
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return VersionedCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class VersionedCursor:
+    def __init__(self, table):
+        self.table = table
+        self.rowcount = 0
+        self.result = []
+
+    def _update(self, sql, params):
+        columns = re.findall(r"(\w+)=%s", sql.split("WHERE")[0])
+        values, where = params[:len(columns)], params[len(columns):]
+        row = self.table.rows.get(where[0])
+        if row is None or ("AND version=%s" in sql and row["version"] != where[1]):
+            return 0
+        row.update(zip(columns, values))
+        row["version"] += 1
+        return 1
+
+    def execute(self, sql, params=()):
+        self.table.statements.append(sql)
+        if sql.startswith("UPDATE"):
+            self.rowcount = self._update(sql, params)
+        elif "FOR UPDATE" in sql:
+            self.result = [(k, self.table.rows[k]["version"]) for k in params if k in self.table.rows]
+        else:
+            row = self.table.rows.get(params[0])
+            self.result = [(row["version"],)] if row else []
+
+    def executemany(self, sql, seq):
+        self.table.statements.append(sql)
+        self.rowcount = sum(self._update(sql, params) for params in seq)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = VersionedTable({"a": 1, "b": 4, "c": 2})
+
+    @contextmanager
+    def fake_connection():
+        yield table
+
+    monkeypatch.setattr(blog_db, "connection", fake_connection)
+    return table
+
+
+def test_update_with_current_version_bumps_it(table):
+    assert blog_db.update_entry("a", "T", "C", "Derek", expected_version=1)
+    assert table.rows["a"]["version"] == 2
+    assert table.rows["a"]["title"] == "T"
+    assert "AND version=%s" in table.statements[0]
+
+
+def test_stale_version_raises_conflict_without_writing(table):
+    with pytest.raises(blog_db.VersionConflict) as info:
+        blog_db.update_entry("b", "T", "C", "Derek", expected_version=3)
+    assert info.value.current == 4
+    assert "title" not in table.rows["b"]
+    assert table.rollbacks == 1 and table.commits == 0
+
+
+def test_missing_entry_is_not_a_conflict(table):
+    assert blog_db.update_entry("zzz", "T", "C", "Derek", expected_version=1) is False
+    assert blog_db.update_entry("zzz", "T", "C", "Derek") is False
+
+
+def test_bulk_update_groups_fields_and_reports_conflicts(table):
+    result = blog_db.bulk_update_entries([
+        {"id": "a", "version": 1, "title": "New A"},
+        {"id": "b", "version": 1, "title": "Stale B"},
+        {"id": "c", "title": "New C"},
+        {"id": "c", "content": "Body C"},
+        {"id": "nope", "title": "X"},
+    ])
+    assert result == {"updated": ["a", "c"], "conflicts": ["b"], "missing": ["nope"]}
+    assert table.rows["a"] == {"version": 2, "title": "New A"}
+    assert table.rows["c"] == {"version": 3, "title": "New C", "content": "Body C"}
+    assert "title" not in table.rows["b"]
+    # One locking read, one executemany per field set ("title" and "title, content"), one commit
+    assert sum("FOR UPDATE" in s for s in table.statements) == 1
+    assert len(table.statements) == 3
+    assert table.commits == 1
+
+
+def test_bulk_update_rejects_unknown_fields(table):
+    with pytest.raises(ValueError):
+        blog_db.bulk_update_entries([{"id": "a", "created_at": "2020-01-01"}])
+
+
+def test_edit_form_reports_conflict(monkeypatch):
+    import app as blog_app
+
+    entry = blog_db.Entry("a", "Title", "Derek", datetime.datetime(2025, 6, 1), "Body", version=5)
+    monkeypatch.setattr(blog_db, "get_entry", lambda entry_id: entry)
+
+    def conflicting_update(*args, expected_version=None):
+        raise blog_db.VersionConflict("a", expected_version, 6)
+
+    monkeypatch.setattr(blog_db, "update_entry", conflicting_update)
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+
+    form = client.get("/blog/entry/a/edit").get_data(as_text=True)
+    assert 'name="version" value="5"' in form
+
+    resp = client.post("/blog/entry/a/edit", data={"title": "Mine", "content": "My body", "version": "5"})
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 409
+    assert 'name="version" value="6"' in body
+    assert "My body" in body
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import export_static  # noqa: E402
+from file_store import FileEntryStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    import app as blog_app
+    import blog_db
+
+    entries_dir = tmp_path / "entries"
+    entries_dir.mkdir()
+    store = FileEntryStore(str(entries_dir), str(tmp_path / "comments"))
+    monkeypatch.setattr(blog_db, "MySQLdb", None)
+    monkeypatch.setattr(blog_app, "file_store", store)
+    for i in range(5):
+        store.insert_entry(f"Entry {i}", f"Body of entry {i}", "Derek")
+    return store
+
+
+def test_export_writes_listing_and_entry_pages(store, tmp_path):
+    out = tmp_path / "site"
+    stats = export_static.export(str(out), workers=3, per_page=2)
+    assert stats == {"entries": 5, "rendered": 5, "failed": 0, "removed": 0, "listing_pages": 3}
+
+    entry_id = store.list_entries()[0]["id"]
+    page = (out / "blog" / "entry" / entry_id / "index.html").read_text()
+    assert "Body of entry" in page
+
+    first = (out / "blog" / "index.html").read_text()
+    second = (out / "blog" / "page" / "2" / "index.html").read_text()
+    assert 'href="/blog/page/2/"' in first and "/blog?" not in first
+    assert 'href="/blog/"' in second and 'href="/blog/page/3/"' in second
+
+
+def test_incremental_export_renders_only_changed_entries(store, tmp_path):
+    out = tmp_path / "site"
+    export_static.export(str(out), per_page=2)
+    ids = [e["id"] for e in store.list_entries()]
+
+    unchanged = export_static.export(str(out), per_page=2)
+    assert unchanged["rendered"] == 0 and unchanged["listing_pages"] == 3
+
+    time.sleep(0.01)
+    store.add_comment(ids[0], "Ann", "Lovely day")
+    store.delete_entry(ids[-1])
+    stats = export_static.export(str(out), per_page=2)
+    assert stats["rendered"] == 1 and stats["removed"] == 1
+    assert "Lovely day" in (out / "blog" / "entry" / ids[0] / "index.html").read_text()
+    assert not (out / "blog" / "entry" / ids[-1]).exists()
+    assert stats["listing_pages"] == 2
+    assert not (out / "blog" / "page" / "3").exists()
+
+    assert export_static.export(str(out), per_page=2, full=True)["rendered"] == 4
+
+
+def test_tag_only_edit_re_renders_the_entry(store, tmp_path):
+    out = tmp_path / "site"
+    export_static.export(str(out), per_page=2)
+    entry_id = store.list_entries()[0]["id"]
+
+    time.sleep(0.01)
+    store.set_entry_tags(entry_id, ["rivers"])
+    stats = export_static.export(str(out), per_page=2)
+    assert stats["rendered"] == 1
+    assert "rivers" in (out / "blog" / "entry" / entry_id / "index.html").read_text()
@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import file_store  # noqa: E402
+from file_store import FileEntryStore  # noqa: E402
+
+
+def write_entry(directory, key, date, title=None, content="Body"):
+    path = directory / f"{key}.json"
+    path.write_text(json.dumps({
+        "id": key, "title": title or key, "author": "Derek", "date": date, "content": content,
+    }), encoding="utf-8")
+    return path
+
+
+def make_store(tmp_path, count=0):
+    entries = tmp_path / "entries"
+    entries.mkdir()
+    for i in range(count):
+        write_entry(entries, f"e{i:02d}", f"2025-06-{i + 1:02d} 10:00:00")
+    return FileEntryStore(str(entries), str(tmp_path / "comments"))
+
+
+def test_lists_newest_first_and_parses_legacy_txt(tmp_path):
+    store = make_store(tmp_path, count=2)
+    (tmp_path / "entries" / "old.txt").write_text(
+        "Title: Legacy\nAuthor: Derek\nDate: 2025-05-01 09:00:00\n"
+        "Media-ID: 7\nMedia-Type: photo\nMedia-URL: u\nMedia-Thumbnail: t\n"
+        "Media-Width: 1\nMedia-Height: 2\nMedia-Attribution: a\n\nLine one\nLine two",
+        encoding="utf-8",
+    )
+    entries = store.list_entries()
+    assert [e["id"] for e in entries] == ["e01", "e00", "old"]
+    legacy = store.get_entry("old")
+    assert legacy["title"] == "Legacy"
+    assert legacy["content"] == "Line one\nLine two"
+    assert legacy["media"]["id"] == "7"
+
+
+def test_manifest_is_reused_and_revalidated(tmp_path, monkeypatch):
+    store = make_store(tmp_path, count=3)
+    store.list_entries()
+    assert os.path.exists(store.manifest_path)
+
+    parsed = []
+    original = FileEntryStore._read_entry
+    monkeypatch.setattr(FileEntryStore, "_read_entry",
+                        staticmethod(lambda path: parsed.append(path) or original(path)))
+
+    fresh = FileEntryStore(store.entries_dir, store.comments_dir)
+    assert len(fresh.list_entries()) == 3
+    assert parsed == []
+
+    path = write_entry(tmp_path / "entries", "e01", "2025-06-02 10:00:00", title="Edited")
+    os.utime(path, ns=(1, 1))
+    os.remove(tmp_path / "entries" / "e00.json")
+    titles = [e["title"] for e in fresh.list_entries()]
+    assert titles == ["e02", "Edited"]
+    assert [os.path.basename(p) for p in parsed] == ["e01.json"]
+
+
+def test_writes_update_the_manifest(tmp_path):
+    store = make_store(tmp_path, count=1)
+    entry_id = store.insert_entry("New post", "x" * 300, "Derek")
+    assert store.add_comment(entry_id, "Ann", "Nice")
+    assert not store.add_comment("missing", "Ann", "Nice")
+
+    listed = {e["id"]: e for e in store.list_entries()}
+    assert listed[entry_id]["comments_count"] == 1
+    assert listed[entry_id]["content"].endswith("...")
+    assert store.get_comments(entry_id)[0]["author"] == "Ann"
+
+    assert store.update_entry("e00", "Renamed", "Body", "Derek")
+    assert store.get_entry("e00")["title"] == "Renamed"
+    assert store.delete_entry(entry_id)
+    assert store.get_entry(entry_id) is None
+    assert store.get_comments(entry_id) == []
+
+    with open(store.manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["version"] == file_store.MANIFEST_VERSION
+    assert [s["title"] for s in manifest["entries"].values()] == ["Renamed"]
+
+
+def test_page_cursors_walk_both_directions(tmp_path):
+    store = make_store(tmp_path, count=7)
+    first = store.page(per_page=3)
+    assert [e["id"] for e in first["entries"]] == ["e06", "e05", "e04"]
+    assert first["prev_cursor"] is None
+
+    second = store.page(per_page=3, before=first["next_cursor"])
+    assert [e["id"] for e in second["entries"]] == ["e03", "e02", "e01"]
+    last = store.page(per_page=3, before=second["next_cursor"])
+    assert [e["id"] for e in last["entries"]] == ["e00"]
+    assert last["next_cursor"] is None
+
+    back = store.page(per_page=3, after=last["prev_cursor"])
+    assert [e["id"] for e in back["entries"]] == ["e03", "e02", "e01"]
+
+
+def test_updates_check_the_entry_version(tmp_path):
+    import blog_db
+    import pytest
+
+    store = make_store(tmp_path, count=1)
+    assert store.get_entry("e00")["version"] == 1
+    assert store.update_entry("e00", "New", "Body", "Derek", expected_version=1)
+    with pytest.raises(blog_db.VersionConflict) as conflict:
+        store.update_entry("e00", "Stale", "Body", "Derek", expected_version=1)
+    assert conflict.value.current == 2
+    assert store.get_entry("e00")["title"] == "New"
+
+    # Tags are not part of the version
+    assert store.set_entry_tags("e00", ["rivers"])
+    assert store.get_entry("e00")["version"] == 2
+
+    result = store.bulk_update_entries([
+        {"id": "e00", "version": 2, "title": "Bulk"},
+        {"id": "e00", "version": 2, "author": "Ann"},
+        {"id": "gone", "title": "Nope"},
+    ])
+    assert result == {"updated": ["e00"], "conflicts": [], "missing": ["gone"]}
+    entry = store.get_entry("e00")
+    assert (entry["title"], entry["author"], entry["version"], entry["tags"]) == ("Bulk", "Ann", 3, ["rivers"])
+    assert store.bulk_update_entries([{"id": "e00", "version": 2, "title": "Stale"}])["conflicts"] == ["e00"]
@@ -0,0 +1,34 @@
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(BLOG_DIR, "benchmarks"))
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import load_test  # noqa: E402
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert load_test.percentile(values, 50) == 50
+    assert load_test.percentile(values, 99) == 99
+    assert load_test.percentile([7], 95) == 7
+    assert load_test.percentile([], 50) == 0.0
+
+
+def test_small_offline_run_against_the_file_backend(tmp_path):
+    import app as blog_app
+
+    store_before = blog_app.file_store
+    out = tmp_path / "results.json"
+    status = load_test.main(["--entries", "5", "--comments", "10", "--requests", "40",
+                             "--concurrency", "3", "--json", str(out)])
+    assert status == 0
+    results = json.loads(out.read_text())["results"]
+    assert results["total"]["requests"] == 40
+    assert results["total"]["errors"] == 0
+    assert set(results) == {"list", "entry", "comment", "create", "pexels", "total"}
+    assert blog_app.file_store is store_before
@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import media_cache  # noqa: E402
+from media_cache import MediaCache, MediaFetchError  # noqa: E402
+
+# The stub image server and the made-up hosts used below
+LOCAL = ("127.0.0.1", "x")
+
+
+class StubImages(BaseHTTPRequestHandler):
+    """Serves /<name>.png (fake image bytes) and /page.html; records every hit."""
+
+    hits = []
+
+    def do_GET(self):
+        type(self).hits.append(self.path)
+        path = urlparse(self.path).path
+        if path.endswith(".png"):
+            body, content_type = b"\x89PNG" + path.encode() * 100, "image/png"
+        else:
+            body, content_type = b"<html></html>", "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def images():
+    StubImages.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubImages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetches_once_then_serves_from_disk(images, tmp_path):
+    cache = MediaCache(str(tmp_path), allowed_hosts=LOCAL)
+    path, content_type = cache.get(f"{images}/a.png", "thumb")
+    again, _ = cache.get(f"{images}/a.png", "thumb")
+    assert path == again and content_type == "image/png"
+    assert open(path, "rb").read().startswith(b"\x89PNG")
+    assert StubImages.hits == ["/a.png"]
+
+    # A new process finds the stored variant on disk
+    assert MediaCache(str(tmp_path), allowed_hosts=LOCAL).get(f"{images}/a.png", "thumb")[0] == path
+    assert len(StubImages.hits) == 1
+
+
+def test_concurrent_misses_fetch_once(images, tmp_path):
+    cache = MediaCache(str(tmp_path), allowed_hosts=LOCAL)
+    threads = [threading.Thread(target=cache.get, args=(f"{images}/b.png", "content")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert StubImages.hits == ["/b.png"]
+
+
+def test_size_cap_evicts_least_recently_served(images, tmp_path):
+    one_file = len(b"\x89PNG" + b"/1.png" * 100)
+    cache = MediaCache(str(tmp_path), max_bytes=one_file * 2, allowed_hosts=LOCAL)
+    first, _ = cache.get(f"{images}/1.png", "thumb")
+    second, _ = cache.get(f"{images}/2.png", "thumb")
+    cache.get(f"{images}/1.png", "thumb")
+    cache.get(f"{images}/3.png", "thumb")
+    assert os.path.exists(first) and not os.path.exists(second)
+    assert cache.total_bytes <= one_file * 2 and len(cache) == 2
+
+
+def test_rejects_non_images(images, tmp_path):
+    with pytest.raises(MediaFetchError):
+        MediaCache(str(tmp_path), allowed_hosts=LOCAL).get(f"{images}/page.html", "thumb")
+
+
+def test_pexels_urls_are_scaled_upstream():
+    url = media_cache._upstream_url("https://images.pexels.com/photos/1/p.jpeg?fit=crop", 400)
+    assert "w=400" in url and "fit=crop" in url and "auto=compress" in url
+    assert media_cache._upstream_url("http://example.com/p.jpeg", 400) == "http://example.com/p.jpeg"
+
+
+def test_resizes_and_converts_with_pillow(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    import io
+
+    buf = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "red").save(buf, "PNG")
+    monkeypatch.setattr(MediaCache, "_fetch", lambda self, url: (buf.getvalue(), "image/png"))
+    path, content_type = MediaCache(str(tmp_path), allowed_hosts=LOCAL).get("http://x/big.png", "thumb", "webp")
+    assert content_type == "image/webp"
+    assert Image.open(path).size == (400, 200)
+
+
+def test_media_route(images, tmp_path, monkeypatch):
+    import app as blog_app
+    import blog_db
+    from file_store import FileEntryStore
+
+    entries = tmp_path / "entries"
+    entries.mkdir()
+    store = FileEntryStore(str(entries), str(tmp_path / "comments"))
+    key = store.insert_entry("Pic", "Body", "Derek", {"id": "42", "type": "photo", "url": f"{images}/full.png",
+                                                        "thumbnail": f"{images}/small.png"})
+    # A later entry reusing the media id must not change what the first one shows
+    evil = store.insert_entry("Evil", "Body", "Derek", {"id": "42", "type": "photo", "url": "http://169.254.169.254/",
+                                                         "thumbnail": "http://169.254.169.254/"})
+    monkeypatch.setattr(blog_db, "MySQLdb", None)
+    monkeypatch.setattr(blog_app, "file_store", store)
+    monkeypatch.setattr(blog_app, "media_cache", MediaCache(str(tmp_path / "cache"), allowed_hosts=LOCAL))
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+
+    resp = client.get(f"/media/{key}?size=thumb")
+    assert resp.status_code == 200
+    assert resp.mimetype == "image/png"
+    assert "immutable" in resp.headers["Cache-Control"] and "max-age=31536000" in resp.headers["Cache-Control"]
+    assert client.get(f"/media/{key}").status_code == 200
+    assert StubImages.hits == ["/small.png", "/full.png"]
+
+    # Sources off the allow-list are neither fetched nor redirected to
+    assert client.get(f"/media/{evil}").status_code == 404
+    assert client.get("/media/42").status_code == 404
+    assert client.get(f"/media/{key}?size=huge").status_code == 404
+
+
+def test_allowed_hosts(tmp_path):
+    cache = MediaCache(str(tmp_path))
+    assert cache.allows("https://images.pexels.com/photos/1/p.jpeg")
+    assert cache.allows("https://videos.pexels.com/videos/1/poster.jpg")
+    assert not cache.allows("https://images.pexels.com.evil.example/p.jpeg")
+    assert not cache.allows("https://evil.example/?u=images.pexels.com")
+    assert not cache.allows("file:///etc/passwd")
+    with pytest.raises(ValueError):
+        cache.get("http://127.0.0.1/a.png", "thumb")
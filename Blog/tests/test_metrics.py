@@ -0,0 +1,95 @@
+import logging
+import os
+import sys
+from contextlib import contextmanager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+from metrics import Histogram, Metrics  # noqa: E402
+
+
+def test_histogram_exposition_is_cumulative():
+    h = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        h.observe(value, "/blog")
+    assert h.samples() == [
+        'latency_seconds_bucket{route="/blog",le="0.1"} 1',
+        'latency_seconds_bucket{route="/blog",le="1"} 3',
+        'latency_seconds_bucket{route="/blog",le="+Inf"} 4',
+        'latency_seconds_sum{route="/blog"} 4.05',
+        'latency_seconds_count{route="/blog"} 4',
+    ]
+
+
+def test_db_statements_are_timed_per_request(monkeypatch):
+    class FakeCursor:
+        def execute(self, sql, args=None):
+            self.rows = [(1,)]
+
+        def fetchone(self):
+            return self.rows[0]
+
+    class FakeConnection:
+        def cursor(self):
+            return FakeCursor()
+
+    class FakePool:
+        @contextmanager
+        def connection(self):
+            yield FakeConnection()
+
+    m = Metrics(slow_request_seconds=0.000001)
+    monkeypatch.setattr(blog_db, "get_pool", lambda: FakePool())
+    monkeypatch.setattr(blog_db, "_query_listeners", [m.observe_query])
+
+    m.start_request("GET", "/blog/entry/e1")
+    with blog_db.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        assert cur.fetchone() == (1,)
+        cur.execute("  select 2")
+    slow = m.finish_request("/blog/entry/<entry_id>", 200)
+
+    assert m.db_query_seconds.count("SELECT") == 2
+    assert m.db_queries_per_request.count("/blog/entry/<entry_id>") == 1
+    assert "db 2 queries" in slow and "slowest query" in slow
+    assert m.current() is None
+
+
+def test_metrics_endpoint_and_slow_request_log(monkeypatch, caplog):
+    import app as blog_app
+
+    m = Metrics(slow_request_seconds=0.000001)
+    monkeypatch.setattr(blog_app, "metrics", m)
+    monkeypatch.setattr(blog_db, "_query_listeners", [m.observe_query])
+
+    def fake_get_entry(entry_id):
+        blog_db._notify_query("SELECT title FROM entries", 0.003)
+        return {"id": entry_id, "title": "Hello", "author": "Derek",
+                "date": "2025-06-13 17:13:59", "content": "Body", "media": None}
+
+    monkeypatch.setattr(blog_db, "get_entry", fake_get_entry)
+    monkeypatch.setattr(blog_db, "get_comments", lambda entry_id: [])
+    blog_app.page_cache.clear()
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+
+    with caplog.at_level(logging.WARNING):
+        assert client.get("/blog/entry/e1").status_code == 200
+    assert any("Slow request: GET /blog/entry/e1" in r.getMessage() for r in caplog.records)
+
+    resp = client.get("/metrics")
+    body = resp.get_data(as_text=True)
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'blog_requests_total{route="/blog/entry/<entry_id>",method="GET",status="200"} 1' in body
+    assert 'blog_request_duration_seconds_count{route="/blog/entry/<entry_id>",method="GET"} 1' in body
+    assert 'blog_db_query_duration_seconds_count{statement="SELECT"} 1' in body
+    assert 'blog_template_render_duration_seconds_count{template="entry.html"} 1' in body
+
+    monkeypatch.setenv("METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
@@ -0,0 +1,139 @@
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+import migrate_files_to_db as migrate  # noqa: E402
+from file_store import FileEntryStore  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.queries.append(sql)
+
+    def fetchall(self):
+        return [(k,) for k in self.conn.existing]
+
+    def executemany(self, sql, rows):
+        if self.conn.fail_on_batch == len(self.conn.batches):
+            raise RuntimeError("insert failed")
+        self.conn.batches.append([r[0] for r in rows])
+
+
+class FakeConnection:
+    def __init__(self, existing=(), fail_on_batch=None):
+        self.existing = set(existing)
+        self.fail_on_batch = fail_on_batch
+        self.queries = []
+        self.batches = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def entries_dir(tmp_path):
+    for i in range(5):
+        (tmp_path / f"2025010{i}_000000_Entry_{i}.txt").write_text(
+            f"Title: Entry {i}\nAuthor: Derek\nDate: 2025-01-0{i + 1} 00:00:00\n\nBody {i}\n",
+            encoding="utf-8",
+        )
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_parse_entry_file_with_media(tmp_path):
+    path = tmp_path / "entry.txt"
+    path.write_text(
+        "Title: Sea\nAuthor: Derek\nDate: 2025-06-15 17:58:10\n"
+        "Media-ID: 42\nMedia-Type: photo\nMedia-URL: https://img/42.jpg\n"
+        "Media-Thumbnail: https://img/42-t.jpg\nMedia-Width: 800\nMedia-Height: 600\n"
+        "Media-Attribution: Photo by A\n\nFirst line\nSecond line\n",
+        encoding="utf-8",
+    )
+    data = migrate.parse_entry_file(str(path))
+    assert data["title"] == "Sea"
+    assert data["created_at"].isoformat() == "2025-06-15T17:58:10"
+    assert data["media"] == {
+        "id": "42", "type": "photo", "url": "https://img/42.jpg",
+        "thumbnail": "https://img/42-t.jpg", "width": "800", "height": "600",
+        "attribution": "Photo by A",
+    }
+    assert data["content"] == "First line\nSecond line\n"
+
+
+def test_imports_only_new_entries_in_chunks(entries_dir):
+    conn = FakeConnection(existing={"20250101_000000_Entry_1"})
+    stats = migrate.import_entries(conn, entries_dir, chunk_size=2, workers=3, progress=lambda m: None)
+    # notes.json is read but is not an entry
+    assert stats == {"files": 6, "parsed": 5, "existing": 1, "inserted": 4}
+    assert [len(b) for b in conn.batches] == [2, 2]
+    assert "20250101_000000_Entry_1" not in sum(conn.batches, [])
+    assert sum("SELECT entry_key FROM entries" in q for q in conn.queries) == 1
+    assert conn.commits == 1
+
+
+def test_failed_chunk_rolls_back_whole_import(entries_dir):
+    conn = FakeConnection(fail_on_batch=1)
+    with pytest.raises(RuntimeError):
+        migrate.import_entries(conn, entries_dir, chunk_size=2, progress=lambda m: None)
+    assert conn.rollbacks == 1
+    assert conn.commits == 0
+
+
+def test_dry_run_writes_nothing(entries_dir):
+    conn = FakeConnection()
+    messages = []
+    stats = migrate.import_entries(conn, entries_dir, dry_run=True, progress=messages.append)
+    assert stats["inserted"] == 5
+    assert conn.batches == [] and conn.commits == 0
+    assert sum(m.startswith("Would insert") for m in messages) == 5
+
+
+def test_entries_written_in_fallback_mode_are_imported(tmp_path, monkeypatch):
+    monkeypatch.setattr(blog_db, "DB_BACKEND", "sqlite")
+    monkeypatch.setattr(blog_db, "SQLITE_PATH", str(tmp_path / "blog.sqlite3"))
+    monkeypatch.setattr(blog_db, "_pool", None)
+    monkeypatch.setattr(blog_db, "_schema_version", None)
+    pool = blog_db.init_db()
+
+    entries = tmp_path / "entries"
+    entries.mkdir()
+    (entries / "20250101_000000_Old.txt").write_text(
+        "Title: Old\nAuthor: Derek\nDate: 2025-01-01 00:00:00\n\nOld body\n", encoding="utf-8")
+    store = FileEntryStore(str(entries), str(tmp_path / "comments"))
+    assert store.update_entry("20250101_000000_Old", "Edited", "New body", "Derek")
+    assert store.set_entry_tags("20250101_000000_Old", ["Travel"])
+    fresh = store.insert_entry("Fresh", "Fresh body", "Derek")
+
+    conn = migrate.open_connection()
+    try:
+        stats = migrate.import_entries(conn, str(entries), progress=lambda m: None)
+    finally:
+        migrate._close(conn)
+    try:
+        assert stats["inserted"] == 2
+        edited = blog_db.get_entry("20250101_000000_Old")
+        assert (edited.title, edited.content) == ("Edited", "New body")
+        assert edited.created_at.isoformat() == "2025-01-01T00:00:00"
+        assert blog_db.get_entry_tags("20250101_000000_Old") == ["travel"]
+        assert blog_db.get_entry(fresh).title == "Fresh"
+    finally:
+        pool.close()
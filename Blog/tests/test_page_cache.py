@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+from page_cache import PageCache  # noqa: E402
+
+
+def test_lru_eviction():
+    cache = PageCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a").body == "A"
+    assert cache.get("c").body == "C"
+
+
+def test_ttl_expiry():
+    cache = PageCache(ttl=0.01)
+    cache.set("a", "A")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_invalidate_is_tag_precise():
+    cache = PageCache()
+    cache.set("/blog", "list", tags=("listing",))
+    cache.set("/blog/entry/1", "one", tags=("entry:1",))
+    cache.set("/blog/entry/2", "two", tags=("entry:2",))
+    cache.invalidate("listing", "entry:1")
+    assert cache.get("/blog") is None
+    assert cache.get("/blog/entry/1") is None
+    assert cache.get("/blog/entry/2").body == "two"
+
+
+def test_render_racing_a_write_is_not_stored():
+    cache = PageCache()
+    started = time.time()
+    cache.invalidate("entry:1")
+    page = cache.set("/blog/entry/1", "stale", tags=("entry:1",), since=started)
+    assert page.body == "stale"
+    assert cache.get("/blog/entry/1") is None
+
+
+def test_file_backed_cache_is_shared_between_processes(tmp_path):
+    writer = PageCache(directory=str(tmp_path))
+    reader = PageCache(directory=str(tmp_path))
+    writer.set("/blog", "list", tags=("listing",))
+    assert reader.get("/blog").body == "list"
+    time.sleep(0.01)
+    writer.invalidate("listing")
+    assert reader.get("/blog") is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import app as blog_app
+    import blog_db
+
+    entry = {"id": "e1", "title": "Hello", "author": "Derek",
+             "date": "2025-06-13 17:13:59", "content": "Body", "media": None}
+    calls = {"get_entry": 0}
+
+    def fake_get_entry(entry_id):
+        calls["get_entry"] += 1
+        return dict(entry) if entry_id == "e1" else None
+
+    monkeypatch.setattr(blog_db, "get_entry", fake_get_entry)
+    monkeypatch.setattr(blog_db, "get_comments", lambda entry_id: [])
+    blog_app.page_cache.clear()
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+    client.calls = calls
+    return client
+
+
+def test_entry_page_served_from_cache_with_304(client):
+    import blog_db
+
+    first = client.get("/blog/entry/e1")
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    again = client.get("/blog/entry/e1")
+    assert again.status_code == 200
+    assert client.calls["get_entry"] == 1
+
+    not_modified = client.get("/blog/entry/e1", headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+    time.sleep(0.01)
+    blog_db._notify_change("e1")
+    client.get("/blog/entry/e1")
+    assert client.calls["get_entry"] == 2
@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+from pexels_api import PexelsAPI  # noqa: E402
+
+
+class StubPexels(BaseHTTPRequestHandler):
+    """Local stand-in for api.pexels.com that counts upstream hits."""
+
+    hits = []
+    delay = 0.0
+    fail = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        type(self).hits.append((url.path, self.headers.get("Authorization")))
+        time.sleep(type(self).delay)
+        if type(self).fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        params = parse_qs(url.query)
+        key = "videos" if url.path.startswith("/videos") else "photos"
+        body = json.dumps({key: [{"id": 1, "query": params.get("query", [""])[0]}],
+                           "page": int(params.get("page", ["1"])[0])}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    StubPexels.hits = []
+    StubPexels.delay = 0.0
+    StubPexels.fail = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPexels)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    yield PexelsAPI("test-key", base_url=f"{root}/v1", video_url=f"{root}/videos", timeout=5)
+    server.shutdown()
+    server.server_close()
+
+
+def test_repeated_search_is_served_from_cache(api):
+    first = api.search_photos("Sunset")
+    second = api.search_photos("  sunset ")
+    assert first == second
+    assert first["photos"][0]["query"] == "Sunset"
+    assert StubPexels.hits == [("/v1/search", "test-key")]
+
+
+def test_cache_key_includes_endpoint_and_page(api):
+    api.search_photos("sea")
+    api.search_photos("sea", page=2)
+    api.search_videos("sea")
+    assert len(StubPexels.hits) == 3
+
+
+def test_concurrent_identical_searches_share_one_request(api):
+    StubPexels.delay = 0.2
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(api.search_videos("rain")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(results) == 8
+    assert all(r == results[0] for r in results)
+    assert len(StubPexels.hits) == 1
+
+
+def test_errors_return_empty_result_and_are_not_cached(api):
+    StubPexels.fail = True
+    assert api.search_photos("storm") == {"photos": []}
+    StubPexels.fail = False
+    assert api.search_photos("storm")["photos"]
+    assert len(StubPexels.hits) == 2
+
+
+def test_expired_entries_are_refetched(api):
+    api.client._cache.ttl = 0.01
+    api.search_photos("fog")
+    time.sleep(0.02)
+    api.search_photos("fog")
+    assert len(StubPexels.hits) == 2
+
+
+def test_upstream_calls_are_reported(api):
+    calls = []
+    api.on_request = lambda url, seconds: calls.append((url.rsplit("/", 2)[-2], seconds))
+    api.search_videos("owl")
+    api.search_videos("owl")
+    StubPexels.fail = True
+    api.search_photos("owl")
+    assert [c[0] for c in calls] == ["videos", "v1"]
+    assert all(seconds >= 0 for _, seconds in calls)
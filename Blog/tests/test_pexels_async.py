@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+from pexels_async import AsyncPexelsAPI, RequestsTransport  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    def json(self):
+        return self.data
+
+
+class FakeTransport:
+    """Answers like api.pexels.com after ``delay`` seconds; records every call."""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        kind = "videos" if "/videos" in url else "photos"
+        self.calls.append((kind, params["query"], headers["Authorization"]))
+        await asyncio.sleep(self.delay)
+        if kind in self.fail:
+            return FakeResponse(500, None)
+        return FakeResponse(200, {kind: [{"id": 1, "query": params["query"]}], "total_results": 3})
+
+
+def make_api(transport, **kwargs):
+    return AsyncPexelsAPI("test-key", base_url="http://pexels/v1", video_url="http://pexels/videos",
+                          transport=transport, **kwargs)
+
+
+def test_combined_search_runs_both_searches_concurrently():
+    transport = FakeTransport(delay=0.2)
+    api = make_api(transport)
+    started = time.perf_counter()
+    result = asyncio.run(api.search_all("owl"))
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.35
+    assert result["photos"] == [{"id": 1, "query": "owl"}]
+    assert result["videos"] == [{"id": 1, "query": "owl"}]
+    assert result["total_results"] == 6
+    assert sorted(c[0] for c in transport.calls) == ["photos", "videos"]
+    assert {c[2] for c in transport.calls} == {"test-key"}
+
+
+def test_one_failing_media_type_does_not_break_the_other():
+    timings = []
+    api = make_api(FakeTransport(fail={"videos"}), on_request=lambda url, s: timings.append(url))
+    result = asyncio.run(api.search_all("owl"))
+    assert result["photos"] and result["videos"] == []
+    assert sorted(timings) == ["http://pexels/v1/search", "http://pexels/videos/search"]
+
+
+def test_cached_and_coalesced():
+    transport = FakeTransport(delay=0.05)
+    api = make_api(transport)
+
+    async def burst():
+        return await asyncio.gather(*(api.search_photos(" Owl ") for _ in range(5)))
+
+    results = asyncio.run(burst())
+    assert all(r is results[0] for r in results)
+    asyncio.run(api.search_photos("owl"))
+    assert len(transport.calls) == 1
+    asyncio.run(api.search_photos("owl", page=2))
+    assert len(transport.calls) == 2
+
+
+def test_search_route_combined_mode(monkeypatch):
+    import app as blog_app
+
+    transport = FakeTransport()
+    monkeypatch.setattr(blog_app, "pexels", make_api(transport))
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+
+    data = client.get("/pexels/search?query=owl&type=all").get_json()
+    assert data["photos"] and data["videos"]
+    data = client.get("/pexels/search?query=owl&type=videos").get_json()
+    assert "photos" not in data and data["videos"]
+    assert client.get("/pexels/search?type=all").status_code == 400
+
+
+def test_concurrent_route_requests_share_one_upstream_call(monkeypatch):
+    import threading
+
+    import app as blog_app
+
+    transport = FakeTransport(delay=0.3)
+    monkeypatch.setattr(blog_app, "pexels", make_api(transport))
+    blog_app.app.testing = True
+    barrier = threading.Barrier(6)
+    results = []
+
+    def search():
+        client = blog_app.app.test_client()
+        barrier.wait()
+        results.append(client.get("/pexels/search?query=owl").get_json())
+
+    threads = [threading.Thread(target=search) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 6 and all(r["photos"] for r in results)
+    assert len(transport.calls) == 1
+
+
+def test_default_timeout_keeps_separate_connect_and_read_limits():
+    seen = []
+
+    class Session:
+        def get(self, url, params=None, headers=None, timeout=None):
+            seen.append(timeout)
+            return FakeResponse(200, {"photos": []})
+
+    api = make_api(RequestsTransport(Session()))
+    asyncio.run(api.search_photos("owl"))
+    assert seen == [(3.05, 10)]
@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+
+
+class FakeServer:
+    """Just enough of MySQL to drive migrate(): tracks applied versions and DDL."""
+
+    def __init__(self):
+        self.versions = []
+        self.ddl = []
+        self.lock_result = 1
+        self.released = 0
+
+
+class FakeCursor:
+    def __init__(self, server):
+        self.server = server
+        self._row = None
+
+    def execute(self, sql, params=None):
+        s = " ".join(sql.split())
+        if s.startswith("SELECT GET_LOCK"):
+            self._row = (self.server.lock_result,)
+        elif s.startswith("SELECT RELEASE_LOCK"):
+            self.server.released += 1
+        elif s.startswith("SELECT MAX(version)"):
+            self._row = (max(self.server.versions) if self.server.versions else None,)
+        elif s.startswith("INSERT INTO schema_version"):
+            self.server.versions.append(params[0])
+        elif s.startswith("CREATE") or s.startswith("ALTER"):
+            self.server.ddl.append(s)
+
+    def fetchone(self):
+        return self._row
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def cursor(self):
+        return FakeCursor(self.server)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ping(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    srv = FakeServer()
+    monkeypatch.setattr(blog_db, "_ensure_database_exists", lambda: None)
+    monkeypatch.setattr(blog_db, "_connect", lambda: FakeConnection(srv))
+    monkeypatch.setattr(blog_db, "_pool", None)
+    monkeypatch.setattr(blog_db, "_schema_version", None)
+    monkeypatch.setattr(blog_db, "_database_checked", False)
+    return srv
+
+
+def test_migrate_applies_each_version_once(server):
+    conn = FakeConnection(server)
+    latest = blog_db.MIGRATIONS[-1][0]
+    assert blog_db.migrate(conn) == latest
+    applied_ddl = len(server.ddl)
+    assert blog_db.migrate(conn) == latest
+    assert server.versions == [v for v, _ in blog_db.MIGRATIONS]
+    # Second run only re-checks the bookkeeping table
+    assert len(server.ddl) == applied_ddl + 1
+
+
+def test_init_db_migrates_once_per_process(server):
+    blog_db.init_db()
+    ddl_after_startup = len(server.ddl)
+    blog_db.get_pool()
+    blog_db.init_db()
+    blog_db.init_schema()
+    assert len(server.ddl) == ddl_after_startup
+    assert blog_db._schema_version == blog_db.MIGRATIONS[-1][0]
+
+
+@pytest.mark.parametrize("lock_result", [0, None])
+def test_migrate_refuses_to_run_without_the_lock(server, lock_result):
+    server.lock_result = lock_result
+    with pytest.raises(blog_db.MigrationLockError):
+        blog_db.migrate(FakeConnection(server))
+    assert server.ddl == [] and server.versions == []
+    assert server.released == 0
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+from search_index import InvertedIndex, make_snippet, tokenize  # noqa: E402
+
+
+def build_index():
+    index = InvertedIndex()
+    index.add("a", "Morning walk", "I walked by the river and watched the herons.")
+    index.add("b", "River notes", "The river was high after the storm. River, river, river.")
+    index.add("c", "Quiet evening", "Read a book and went to bed early.")
+    return index
+
+
+def test_ranks_by_relevance_with_title_boost():
+    total, hits = build_index().search("river")
+    assert total == 2
+    assert [h["id"] for h in hits] == ["b", "a"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_paginates_hits():
+    index = InvertedIndex()
+    for i in range(25):
+        index.add(f"e{i:02d}", f"Entry {i}", "journal text")
+    total, first = index.search("journal", limit=10)
+    _, last = index.search("journal", limit=10, offset=20)
+    assert total == 25
+    assert len(first) == 10 and len(last) == 5
+    assert not {h["id"] for h in first} & {h["id"] for h in last}
+
+
+def test_remove_and_readd_updates_postings():
+    index = build_index()
+    index.remove("b")
+    assert [h["id"] for h in index.search("river")[1]] == ["a"]
+    index.add("a", "Morning walk", "No water today.")
+    assert index.search("river") == (0, [])
+    assert len(index) == 2
+
+
+def test_snippet_highlights_and_escapes():
+    text = "<b>Intro</b> " + "filler " * 60 + "the river rose. River banks flooded."
+    snippet = make_snippet(text, tokenize("river"), width=80)
+    assert snippet.startswith("...")
+    assert "<mark>river</mark>" in snippet and "<mark>River</mark>" in snippet
+    assert "<b>" not in snippet
+    assert "&lt;b&gt;" in make_snippet(text, [], width=20)
+
+
+def test_search_route_falls_back_to_entry_files(tmp_path, monkeypatch):
+    import app as blog_app
+
+    entries_dir = tmp_path / "blog_entries"
+    entries_dir.mkdir()
+    for key, title, content in [
+        ("e1", "Herons", "Saw herons by the river."),
+        ("e2", "Storm", "Thunder all night."),
+    ]:
+        (entries_dir / f"{key}.json").write_text(json.dumps({
+            "id": key, "title": title, "author": "Derek",
+            "date": "2025-06-20 20:06:37", "content": content,
+        }), encoding="utf-8")
+    from file_store import FileEntryStore
+    from search_index import InvertedIndex as Index
+
+    monkeypatch.setattr(blog_app, "file_store", FileEntryStore(str(entries_dir), str(tmp_path / "comments")))
+    monkeypatch.setattr(blog_app, "_file_search_index", Index())
+    monkeypatch.setattr(blog_app, "_file_search_indexed", {})
+
+    def no_db(*args, **kwargs):
+        raise RuntimeError("Database dependencies are not installed")
+
+    import blog_db
+    monkeypatch.setattr(blog_db, "search_entries", no_db)
+    blog_app.app.testing = True
+    resp = blog_app.app.test_client().get("/blog/search?q=river")
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 200
+    assert "1 result for" in body
+    assert "<mark>river</mark>" in body
+    assert "Storm" not in body
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    path = tmp_path / "blog.sqlite3"
+    monkeypatch.setattr(blog_db, "DB_BACKEND", "sqlite")
+    monkeypatch.setattr(blog_db, "SQLITE_PATH", str(path))
+    monkeypatch.setattr(blog_db, "_pool", None)
+    monkeypatch.setattr(blog_db, "_schema_version", None)
+    pool = blog_db.init_db()
+    yield path
+    pool.close()
+
+
+def test_schema_is_migrated_in_wal_mode(sqlite_db):
+    assert blog_db._schema_version == blog_db.MIGRATIONS[-1][0]
+    assert [v for v, _ in blog_db.SQLITE_MIGRATIONS] == [v for v, _ in blog_db.MIGRATIONS]
+    conn = sqlite3.connect(sqlite_db)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_crud_round_trip(sqlite_db):
+    media = {"id": "42", "type": "photo", "url": "u", "thumbnail": "t",
+             "width": "10", "height": "20", "attribution": "by X"}
+    key = blog_db.insert_entry("Hello world", "Body text", "Derek", media)
+    entry = blog_db.get_entry(key)
+    assert (entry.title, entry.author, entry.content, entry.version) == ("Hello world", "Derek", "Body text", 1)
+    assert entry.media.url == "u"
+    assert isinstance(entry.created_at, type(blog_db.get_entries()[0].created_at))
+    assert blog_db.get_media(key)["thumbnail"] == "t"
+
+    assert blog_db.update_entry(key, "Hello again", "New body", "Derek", expected_version=1)
+    with pytest.raises(blog_db.VersionConflict):
+        blog_db.update_entry(key, "Stale", "Stale", "Derek", expected_version=1)
+    assert blog_db.get_entry(key).title == "Hello again"
+
+    assert blog_db.add_comment(key, "Ann", "Nice")
+    assert not blog_db.add_comment("missing", "Ann", "Nope")
+    assert [c.content for c in blog_db.get_comments(key)] == ["Nice"]
+    version = blog_db.get_entry_versions()[key]
+    assert blog_db.set_entry_tags(key, ["Rivers"])
+    assert blog_db.get_entry_versions()[key] != version
+
+    assert blog_db.delete_entry(key)
+    assert blog_db.get_entry(key) is None
+    assert blog_db.get_comments(key) == []
+
+
+def test_pages_search_and_bulk_updates(sqlite_db):
+    keys = [blog_db.insert_entry(f"Entry {i}", f"river notes {i} " * (30 if i == 3 else 1), "Derek")
+            for i in range(5)]
+    first = blog_db.get_entry_page(per_page=2)
+    assert [e.title for e in first["entries"]] == ["Entry 4", "Entry 3"]
+    assert first["entries"][1].content.endswith("...")
+    second = blog_db.get_entry_page(per_page=2, before=first["next_cursor"])
+    assert [e.title for e in second["entries"]] == ["Entry 2", "Entry 1"]
+    back = blog_db.get_entry_page(per_page=2, after=second["prev_cursor"])
+    assert [e.title for e in back["entries"]] == ["Entry 4", "Entry 3"]
+
+    result = blog_db.search_entries("river", per_page=2)
+    assert result["total"] == 5
+    assert result["hits"][0].title == "Entry 3"
+    assert blog_db.search_entries('"unbalanced AND (', per_page=2)["total"] == 0
+
+    result = blog_db.bulk_update_entries([
+        {"id": keys[0], "version": 1, "title": "Heron sighting"},
+        {"id": keys[1], "version": 9, "title": "Stale"},
+    ])
+    assert result == {"updated": [keys[0]], "conflicts": [keys[1]], "missing": []}
+    assert blog_db.search_entries("heron")["hits"][0].id == keys[0]
+
+
+def test_each_thread_reuses_its_own_connection(sqlite_db):
+    pool = blog_db.get_pool()
+    seen = {}
+
+    def grab(name):
+        with pool.connection() as a, pool.connection() as b:
+            seen[name] = (a, b)
+
+    grab("main")
+    thread = threading.Thread(target=grab, args=("worker",))
+    thread.start()
+    thread.join()
+    assert seen["main"][0] is seen["main"][1]
+    assert seen["worker"][0] is not seen["main"][0]
@@ -0,0 +1,105 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import blog_db  # noqa: E402
+from file_store import FileEntryStore  # noqa: E402
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(blog_db, "DB_BACKEND", "sqlite")
+    monkeypatch.setattr(blog_db, "SQLITE_PATH", str(tmp_path / "blog.sqlite3"))
+    monkeypatch.setattr(blog_db, "_pool", None)
+    monkeypatch.setattr(blog_db, "_schema_version", None)
+    pool = blog_db.init_db()
+    yield
+    pool.close()
+
+
+def backdate(entry_id, when):
+    with blog_db.connection() as conn:
+        conn.cursor().execute("UPDATE entries SET created_at=%s WHERE entry_key=%s", (when, entry_id))
+        conn.commit()
+
+
+def test_normalize_tags():
+    assert blog_db.normalize_tags(" Travel, road trips ,travel,, C++ ") == ["travel", "road-trips", "c"]
+    assert blog_db.normalize_tag("--") == ""
+
+
+def test_tags_and_archive_queries(sqlite_db):
+    june = [blog_db.insert_entry(f"June {i}", "x", "Derek") for i in range(3)]
+    july = blog_db.insert_entry("July", "x", "Derek")
+    for i, key in enumerate(june):
+        backdate(key, datetime.datetime(2025, 6, 10 + i))
+    backdate(july, datetime.datetime(2025, 7, 1))
+
+    assert blog_db.set_entry_tags(june[0], "Travel, Family")
+    assert blog_db.set_entry_tags(june[2], ["travel"])
+    assert blog_db.set_entry_tags(july, ["travel"])
+    assert not blog_db.set_entry_tags("missing", ["travel"])
+    assert blog_db.get_entry_tags(june[0]) == ["family", "travel"]
+    assert blog_db.get_tags() == [{"name": "travel", "count": 3}, {"name": "family", "count": 1}]
+
+    first = blog_db.get_entry_page(per_page=2, tag="travel")
+    assert [e.id for e in first["entries"]] == [july, june[2]]
+    rest = blog_db.get_entry_page(per_page=2, tag="travel", before=first["next_cursor"])
+    assert [e.id for e in rest["entries"]] == [june[0]]
+    assert rest["next_cursor"] is None
+
+    month = blog_db.get_entry_page(per_page=10, start=datetime.datetime(2025, 6, 1),
+                                   end=datetime.datetime(2025, 7, 1))
+    assert [e.id for e in month["entries"]] == june[::-1]
+    assert blog_db.get_archive() == [{"year": 2025, "month": 7, "count": 1},
+                                     {"year": 2025, "month": 6, "count": 3}]
+
+    blog_db.set_entry_tags(june[0], [])
+    assert blog_db.get_entry_tags(june[0]) == []
+    blog_db.delete_entry(june[2])
+    assert blog_db.get_tags() == [{"name": "travel", "count": 1}]
+
+
+def test_routes_filter_and_link(sqlite_db):
+    import app as blog_app
+
+    key = blog_db.insert_entry("Tagged", "Body", "Derek")
+    blog_db.insert_entry("Untagged", "Body", "Derek")
+    blog_db.set_entry_tags(key, ["travel"])
+    now = datetime.datetime.now()
+    blog_app.page_cache.clear()
+    blog_app.app.testing = True
+    client = blog_app.app.test_client()
+
+    body = client.get("/blog/tag/travel").get_data(as_text=True)
+    assert "Tagged" in body and "Untagged" not in body
+    assert client.get("/blog/tag/Travel").headers["Location"].endswith("/blog/tag/travel")
+
+    body = client.get(f"/blog/archive/{now.year}/{now.month}").get_data(as_text=True)
+    assert "Untagged" in body and now.strftime("%B %Y") in body
+    assert client.get("/blog/archive/2025/13").status_code == 404
+
+    body = client.get(f"/blog/entry/{key}").get_data(as_text=True)
+    assert 'href="/blog/tag/travel"' in body
+
+
+def test_file_store_tags_and_archive(tmp_path):
+    store = FileEntryStore(str(tmp_path / "entries"), str(tmp_path / "comments"))
+    a = store.insert_entry("A", "x", "Derek")
+    b = store.insert_entry("B", "y", "Derek")
+    assert store.set_entry_tags(a, ["travel", "family"])
+    store.update_entry(a, "A2", "x", "Derek")
+    assert store.get_entry_tags(a) == ["family", "travel"]
+    assert [e["id"] for e in store.page(tag="travel")["entries"]] == [a]
+    now = datetime.datetime.now()
+    assert store.get_archive() == [{"year": now.year, "month": now.month, "count": 2}]
+    start = datetime.datetime(now.year, now.month, 1)
+    assert {e["id"] for e in store.page(start=start)["entries"]} == {a, b}
+    assert store.page(end=start)["entries"] == []
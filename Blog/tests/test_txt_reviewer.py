@@ -0,0 +1,125 @@
+import os
+import sys
+import threading
+import types
+import zipfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BLOG_DIR = os.path.dirname(HERE)
+if BLOG_DIR not in sys.path:
+    sys.path.insert(0, BLOG_DIR)
+
+import txt_reviewer  # noqa: E402
+
+
+class FakeTool:
+    """Stands in for LanguageTool: 'have' -> 'has', recording every check."""
+
+    def __init__(self):
+        self.checked = []
+        self.lock = threading.Lock()
+
+    def check(self, text):
+        with self.lock:
+            self.checked.append(text)
+        return ["have"] if " have " in text else []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    fake = FakeTool()
+    starts = []
+
+    def language_tool(*args, **kwargs):
+        starts.append(args)
+        return fake
+
+    def correct(text, matches):
+        return text.replace(" have ", " has ") if matches else text
+
+    module = types.SimpleNamespace(LanguageTool=language_tool, utils=types.SimpleNamespace(correct=correct))
+    monkeypatch.setattr(txt_reviewer, "language_tool_python", module)
+    monkeypatch.setattr(txt_reviewer, "_tool", None)
+    monkeypatch.setattr(txt_reviewer, "_tool_disabled", False)
+    txt_reviewer.clear_cache()
+    fake.starts = starts
+    return fake
+
+
+def test_tool_is_started_once_and_shared(tool):
+    assert txt_reviewer.correct_text("It have bugs.") == "It has bugs."
+    title, content = txt_reviewer.process_blog_entry("A title", "She have a cat.")
+    assert (title, content) == ("A title", "She has a cat.")
+    assert len(tool.starts) == 1
+
+
+def test_unchanged_paragraphs_are_not_rechecked(tool):
+    first = "One have two.\n\nThree four."
+    assert txt_reviewer.correct_text(first) == "One has two.\n\nThree four."
+    assert sorted(tool.checked) == ["One have two.", "Three four."]
+
+    tool.checked.clear()
+    assert txt_reviewer.correct_text(first + "\nNew have line.") == "One has two.\n\nThree four.\nNew has line."
+    assert tool.checked == ["New have line."]
+
+
+def test_batch_dedupes_and_keeps_order(tool):
+    entries = [("Day %d" % i, "We have rain.\nShared line.") for i in range(5)]
+    results = txt_reviewer.process_blog_entries(entries, workers=3)
+    assert results == [("Day %d" % i, "We has rain.\nShared line.") for i in range(5)]
+    assert sorted(tool.checked) == sorted(["Day 0", "Day 1", "Day 2", "Day 3", "Day 4",
+                                           "We have rain.", "Shared line."])
+
+
+def test_failed_check_returns_original_and_is_not_cached(tool, monkeypatch):
+    def broken(text):
+        raise RuntimeError("server gone")
+
+    monkeypatch.setattr(tool, "check", broken)
+    assert txt_reviewer.correct_text("It have bugs.") == "It have bugs."
+    assert txt_reviewer._cache_get(txt_reviewer._paragraph_key("It have bugs.")) is None
+
+
+def test_missing_library_disables_checking(monkeypatch):
+    monkeypatch.setattr(txt_reviewer, "language_tool_python", None)
+    monkeypatch.setattr(txt_reviewer, "_tool", None)
+    monkeypatch.setattr(txt_reviewer, "_tool_disabled", False)
+    txt_reviewer.clear_cache()
+    assert txt_reviewer.correct_text("It have bugs.") == "It have bugs."
+    assert txt_reviewer._tool_disabled
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def write_docx(path, body):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{W_NS}"><w:body>{body}</w:body></w:document>')
+
+
+def test_streams_body_paragraphs(tmp_path):
+    path = tmp_path / "doc.docx"
+    write_docx(path, (
+        "<w:p><w:r><w:t>Hello </w:t></w:r><w:r><w:t>world</w:t></w:r></w:p>"
+        "<w:p/>"
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>in a table</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+        "<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>"
+        "<w:sectPr/>"
+    ))
+    paragraphs = txt_reviewer.iter_docx_paragraphs(str(path))
+    assert next(paragraphs) == "Hello world"
+    assert list(paragraphs) == ["", "a\tb\nc"]
+    assert txt_reviewer.read_docx(str(path)) == "Hello world\n\na\tb\nc"
+
+
+def test_process_document_writes_in_chunks(tool, tmp_path):
+    path = tmp_path / "doc.docx"
+    write_docx(path, "".join(f"<w:p><w:r><w:t>Line {i} have text.</w:t></w:r></w:p>" for i in range(7)))
+    out = tmp_path / "out.txt"
+    txt_reviewer.process_document(str(path), str(out), chunk_size=3)
+    assert out.read_text(encoding="utf-8") == "\n".join(f"Line {i} has text." for i in range(7))
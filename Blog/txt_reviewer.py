@@ -1,12 +1,23 @@
 # Required Libraries
-import docx
-import language_tool_python
+import atexit
+import hashlib
 import ssl
+import threading
 import requests
 import os
 import datetime
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from xml.etree import ElementTree
 from urllib3.exceptions import InsecureRequestWarning
 
+try:
+    import language_tool_python
+except Exception:
+    language_tool_python = None
+
 # Disable SSL warnings
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
@@ -17,27 +28,206 @@ def patched_get(*args, **kwargs):
     return original_get(*args, **kwargs)
 requests.get = patched_get
 
+# Grammar checking settings
+GRAMMAR_WORKERS = int(os.getenv('GRAMMAR_WORKERS', '4'))
+GRAMMAR_CACHE_SIZE = int(os.getenv('GRAMMAR_CACHE_SIZE', '4096'))
+# Paragraphs corrected and written per step when processing a document
+DOCX_CHUNK_SIZE = int(os.getenv('DOCX_CHUNK_SIZE', '200'))
+
+# --------------------------------------------------
+# Streaming .docx reader
+# --------------------------------------------------
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+def _paragraph_text(p):
+    parts = []
+    for el in p.iter():
+        if el.tag == _W + 't':
+            parts.append(el.text or '')
+        elif el.tag == _W + 'tab':
+            parts.append('\t')
+        elif el.tag in (_W + 'br', _W + 'cr'):
+            parts.append('\n')
+    return ''.join(parts)
+
+def iter_docx_paragraphs(file_path):
+    """
+    Yield the text of each body paragraph of a .docx file, in order.
+
+    word/document.xml is parsed incrementally straight from the zip, and each
+    paragraph is discarded once yielded, so memory stays flat however long
+    the document is. Like python-docx's ``Document.paragraphs``, paragraphs
+    inside tables are not included.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('word/document.xml') as xml:
+            body = None
+            depth = 0
+            for event, el in ElementTree.iterparse(xml, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and el.tag == _W + 'body':
+                        body = el
+                    continue
+                depth -= 1
+                if depth == 2 and body is not None:
+                    # A direct child of <w:body> is complete
+                    if el.tag == _W + 'p':
+                        yield _paragraph_text(el)
+                    body.remove(el)
+
 # Read text from a .docx file
 def read_docx(file_path):
-    doc = docx.Document(file_path)
-    return '\n'.join([para.text for para in doc.paragraphs])
+    return '\n'.join(iter_docx_paragraphs(file_path))
+
+# --------------------------------------------------
+# Shared LanguageTool session
+# --------------------------------------------------
+# Starting LanguageTool launches a Java server, which takes seconds, so one
+# instance is started on first use and shared by every later call.
+_tool = None
+_tool_disabled = False
+_tool_lock = threading.Lock()
+
+def get_tool():
+    """Return the shared LanguageTool instance, starting it on first use.
+
+    Returns None if grammar checking is unavailable (library missing or an
+    incompatible Java); that is remembered so the start is not retried."""
+    global _tool, _tool_disabled
+    if _tool is not None or _tool_disabled:
+        return _tool
+    with _tool_lock:
+        if _tool is not None or _tool_disabled:
+            return _tool
+        if language_tool_python is None:
+            print("language_tool_python is not installed; grammar checking disabled.")
+            _tool_disabled = True
+            return None
+        try:
+            # Disable SSL certificate verification (not recommended for production)
+            ssl._create_default_https_context = ssl._create_unverified_context
+            # Use version 6.0 which is compatible with Java 11
+            _tool = language_tool_python.LanguageTool('en-US', language_tool_download_version='6.0')
+        except SystemError as e:
+            # Handle Java version compatibility issues
+            if "LanguageTool requires Java" in str(e):
+                print(f"Java version compatibility issue: {str(e)}")
+                print("Grammar checking disabled due to Java version compatibility.")
+                _tool_disabled = True
+                return None
+            raise
+        return _tool
+
+def close_tool():
+    """Stop the shared LanguageTool server (called automatically at exit)."""
+    global _tool
+    with _tool_lock:
+        tool, _tool = _tool, None
+    if tool is not None:
+        try:
+            tool.close()
+        except Exception as e:
+            print(f"Error closing LanguageTool: {str(e)}")
+
+atexit.register(close_tool)
+
+# --------------------------------------------------
+# Paragraph result cache
+# --------------------------------------------------
+# Corrections are cached per paragraph (keyed by a hash of its text), so
+# re-reviewing a document only sends paragraphs that changed.
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _paragraph_key(paragraph):
+    return hashlib.sha1(paragraph.encode('utf-8')).hexdigest()
+
+def _cache_get(key):
+    with _cache_lock:
+        corrected = _cache.get(key)
+        if corrected is not None:
+            _cache.move_to_end(key)
+        return corrected
+
+def _cache_set(key, corrected):
+    with _cache_lock:
+        _cache[key] = corrected
+        _cache.move_to_end(key)
+        while len(_cache) > GRAMMAR_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+def _check_paragraph(tool, paragraph):
+    matches = tool.check(paragraph)
+    return language_tool_python.utils.correct(paragraph, matches)
 
 # Correct grammar and spelling using LanguageTool
+def correct_batch(texts, workers=None):
+    """
+    Correct many texts in one pass.
+
+    Texts are split into paragraphs; paragraphs already in the cache (or
+    repeated within the batch) are not checked again, and the rest are
+    checked concurrently against the shared LanguageTool server.
+
+    Args:
+        texts (list): Strings to correct
+        workers (int, optional): Concurrent checks (default GRAMMAR_WORKERS)
+
+    Returns:
+        list: Corrected strings, in the same order as ``texts``
+    """
+    split = [text.split('\n') for text in texts]
+    corrected = {}
+    pending = {}
+    for paragraphs in split:
+        for paragraph in paragraphs:
+            if not paragraph.strip():
+                continue
+            key = _paragraph_key(paragraph)
+            if key in corrected or key in pending:
+                continue
+            cached = _cache_get(key)
+            if cached is not None:
+                corrected[key] = cached
+            else:
+                pending[key] = paragraph
+
+    if pending:
+        tool = get_tool()
+        if tool is None:
+            return list(texts)
+
+        def check(key):
+            try:
+                return _check_paragraph(tool, pending[key])
+            except Exception as e:
+                print(f"Error in grammar correction: {str(e)}")
+                # Keep the original paragraph (uncached) if correction fails
+                return None
+
+        workers = max(1, min(workers or GRAMMAR_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check, pending))
+        for key, result in zip(pending, results):
+            if result is None:
+                corrected[key] = pending[key]
+            else:
+                corrected[key] = result
+                _cache_set(key, result)
+
+    return [
+        '\n'.join(corrected[_paragraph_key(p)] if p.strip() else p for p in paragraphs)
+        for paragraphs in split
+    ]
+
 def correct_text(text):
     try:
-        # Disable SSL certificate verification (not recommended for production)
-        ssl._create_default_https_context = ssl._create_unverified_context
-        # Use version 6.0 which is compatible with Java 11
-        tool = language_tool_python.LanguageTool('en-US', language_tool_download_version='6.0')
-        matches = tool.check(text)
-        return language_tool_python.utils.correct(text, matches)
-    except SystemError as e:
-        # Handle Java version compatibility issues
-        if "LanguageTool requires Java" in str(e):
-            print(f"Java version compatibility issue: {str(e)}")
-            print("Grammar checking disabled due to Java version compatibility.")
-            return text
-        raise
+        return correct_batch([text])[0]
     except Exception as e:
         print(f"Error in grammar correction: {str(e)}")
         # Return original text if correction fails
@@ -60,10 +250,28 @@ def process_blog_entry(title, content):
     Returns:
         tuple: (corrected_title, corrected_content)
     """
-    corrected_title = correct_text(title)
-    corrected_content = correct_text(content)
+    try:
+        corrected_title, corrected_content = correct_batch([title, content])
+    except Exception as e:
+        print(f"Error in grammar correction: {str(e)}")
+        return title, content
     return corrected_title, corrected_content
 
+def process_blog_entries(entries, workers=None):
+    """
+    Correct many blog entries in one batch
+
+    Args:
+        entries (list): (title, content) pairs
+        workers (int, optional): Concurrent checks (default GRAMMAR_WORKERS)
+
+    Returns:
+        list: (corrected_title, corrected_content) pairs in the same order
+    """
+    texts = [text for entry in entries for text in entry]
+    corrected = correct_batch(texts, workers=workers)
+    return list(zip(corrected[::2], corrected[1::2]))
+
 # Save blog entry to file system
 def save_blog_entry(title, content, author, media=None, blog_dir="blog_entries"):
     """
@@ -111,11 +319,21 @@ def save_blog_entry(title, content, author, media=None, blog_dir="blog_entries")
     return file_path
 
 # Main function
-def process_document(input_file, output_file):
+def process_document(input_file, output_file, chunk_size=None):
     try:
-        raw_text = read_docx(input_file)
-        corrected = correct_text(raw_text)
-        write_txt(output_file, corrected)
+        paragraphs = iter_docx_paragraphs(input_file)
+        chunk_size = chunk_size or DOCX_CHUNK_SIZE
+        # Correct and write the document a chunk of paragraphs at a time
+        with open(output_file, 'w', encoding='utf-8') as f:
+            first = True
+            while True:
+                chunk = list(islice(paragraphs, chunk_size))
+                if not chunk:
+                    break
+                if not first:
+                    f.write('\n')
+                f.write(correct_batch(['\n'.join(chunk)])[0])
+                first = False
         print(f"Corrected text saved to: {output_file}")
     except Exception as e:
         print(f"Error processing document: {str(e)}")
@@ -1,8 +1,19 @@
+import csv
+import functools
+import hashlib
+import io
+import json
+import math
 import os
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlencode
 
-from flask import Flask, jsonify, request, render_template_string, redirect, url_for
+from flask import Flask, Response, jsonify, request, render_template_string, redirect, stream_with_context, url_for
 
 app = Flask(__name__)
 
@@ -14,16 +25,30 @@ DB_PATH = os.path.join(os.path.dirname(__file__), "cafes.db")
 # Database helper methods
 # ----------------------
 
+_local = threading.local()
+
+
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    """This thread's connection to DB_PATH, opened on first use and then reused.
+
+    Use it as ``with get_connection() as conn:``; the block commits (or rolls
+    back on error) but leaves the connection open for the next request.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        _local.conn, _local.path = conn, DB_PATH
     return conn
 
 
 def guess_cafes_table_name(conn: sqlite3.Connection) -> str:
     # Prefer a table explicitly named 'cafes' if present; otherwise, pick the first table containing 'caf'
     cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-    names = [r[0] for r in cur.fetchall()]
+    # Skip the search/geo indexes, their shadow tables (cafe_fts, cafe_fts_data, cafe_geo_node, ...) and cafe_meta
+    names = [r[0] for r in cur.fetchall() if not re.search(r"_(fts|geo|meta)(_\w+)?$", r[0])]
     if "cafes" in names:
         return "cafes"
     for n in names:
@@ -59,6 +84,236 @@ def get_pk_column(columns: List[Dict[str, Any]]) -> str:
     return "id"
 
 
+# Columns covered by the ?q= full-text search
+SEARCH_COLUMNS = ("name", "location")
+
+
+def ensure_search_indexes(conn: sqlite3.Connection, table: str, columns: List[Dict[str, Any]]) -> Optional[str]:
+    """Create the filter indexes and the FTS5 search table if they are missing.
+
+    Adds a plain index on location and on each boolean column, plus a
+    ``<table>_fts`` FTS5 table over name/location that triggers keep in step
+    with every insert, update and delete. Returns the FTS table name, or None
+    when this SQLite build lacks FTS5 or the table has no integer rowid key
+    (``?q=`` then falls back to LIKE).
+    """
+    names = {c["name"] for c in columns}
+    stmts: List[str] = []
+    if "location" in names:
+        stmts.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_location ON {table} (location)")
+    for c in columns:
+        if is_boolish_column(c["name"], c["type"]):
+            stmts.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{c['name']} ON {table} ({c['name']})")
+    with conn:
+        for sql in stmts:
+            conn.execute(sql)
+
+    fts_cols = [n for n in SEARCH_COLUMNS if n in names]
+    pk = next((c for c in columns if c["pk"]), None)
+    if not fts_cols or pk is None or pk["type"] != "INTEGER":
+        return None
+    fts = f"{table}_fts"
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,)).fetchone():
+        return fts
+    cols = ", ".join(fts_cols)
+    new_vals = ", ".join(f"new.{n}" for n in fts_cols)
+    old_vals = ", ".join(f"old.{n}" for n in fts_cols)
+    try:
+        with conn:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+                f"content_rowid='{pk['name']}', tokenize='unicode61 remove_diacritics 2')"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.{pk['name']}, {new_vals}); END"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{pk['name']}, {old_vals}); END"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{pk['name']}, {old_vals}); "
+                f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.{pk['name']}, {new_vals}); END"
+            )
+            # Index the rows that existed before the triggers did
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        # No FTS5 in this SQLite build
+        return None
+    return fts
+
+
+# Coordinates in Google Maps links: the place pin (!3d<lat>!4d<lon>), the
+# viewport centre (@<lat>,<lon>) or an explicit ?q=/ll=<lat>,<lon>
+_COORD_PATTERNS = (
+    re.compile(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)"),
+    re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)"),
+    re.compile(r"[?&](?:q|ll|query|center)=(-?\d+(?:\.\d+)?),\s*(-?\d+(?:\.\d+)?)"),
+)
+
+
+def coords_from_map_url(url: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(lat, lon) spelled out in a map link, or None (e.g. goo.gl short links)."""
+    if not url:
+        return None
+    url = unquote(str(url))
+    for pattern in _COORD_PATTERNS:
+        m = pattern.search(url)
+        if m:
+            lat, lon = float(m.group(1)), float(m.group(2))
+            if -90 <= lat <= 90 and -180 <= lon <= 180:
+                return lat, lon
+    return None
+
+
+def fill_coordinates(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Take lat/lon from the payload's map_url unless they were given explicitly."""
+    for key in ("lat", "lon"):
+        if key in payload and str(payload[key]).strip() == "":
+            payload.pop(key)
+    if "lat" not in payload and "lon" not in payload:
+        coords = coords_from_map_url(payload.get("map_url"))
+        if coords:
+            payload["lat"], payload["lon"] = coords
+    return payload
+
+
+def backfill_coordinates(conn: sqlite3.Connection, table: str, pk: str) -> int:
+    """Fill lat/lon from map_url for rows that have none. Returns the rows updated."""
+    rows = conn.execute(f"SELECT {pk}, map_url FROM {table} WHERE lat IS NULL OR lon IS NULL").fetchall()
+    updates = [(*coords, row[0]) for row in rows for coords in [coords_from_map_url(row[1])] if coords]
+    with conn:
+        conn.executemany(f"UPDATE {table} SET lat = ?, lon = ? WHERE {pk} = ?", updates)
+    return len(updates)
+
+
+def ensure_geo_index(conn: sqlite3.Connection, table: str, columns: List[Dict[str, Any]]) -> Optional[str]:
+    """Add lat/lon columns and the ``<table>_geo`` R*Tree over them if missing.
+
+    The first run backfills coordinates from map_url; triggers then keep the
+    tree in step with the table. Returns the R*Tree name, or None when the
+    rtree module is missing or the table has no integer rowid key (nearby
+    queries then use a plain (lat, lon) index).
+    """
+    names = {c["name"] for c in columns}
+    with conn:
+        for col in ("lat", "lon"):
+            if col not in names:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} REAL")
+    pk = next((c for c in columns if c["pk"]), None)
+    geo = f"{table}_geo"
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (geo,)).fetchone():
+        return geo
+    if "map_url" in names and pk is not None:
+        backfill_coordinates(conn, table, pk["name"])
+    if pk is None or pk["type"] != "INTEGER":
+        with conn:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_lat_lon ON {table} (lat, lon)")
+        return None
+    key = pk["name"]
+    point = f"new.{key}, new.lat, new.lat, new.lon, new.lon WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL"
+    try:
+        with conn:
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {geo} USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+            conn.execute(
+                f"INSERT INTO {geo} SELECT {key}, lat, lat, lon, lon FROM {table} "
+                f"WHERE lat IS NOT NULL AND lon IS NOT NULL"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {geo}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {geo} SELECT {point}; END"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {geo}_ad AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM {geo} WHERE id = old.{key}; END"
+            )
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {geo}_au AFTER UPDATE OF {key}, lat, lon ON {table} BEGIN "
+                f"DELETE FROM {geo} WHERE id = old.{key}; INSERT INTO {geo} SELECT {point}; END"
+            )
+    except sqlite3.OperationalError:
+        # No rtree module in this SQLite build
+        with conn:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_lat_lon ON {table} (lat, lon)")
+        return None
+    return geo
+
+
+def ensure_meta_table(conn: sqlite3.Connection, table: str) -> None:
+    """Create ``<table>_meta`` with its data_version counter if missing."""
+    with conn:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute(f"INSERT OR IGNORE INTO {table}_meta (key, value) VALUES ('data_version', 0)")
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    table: str
+    columns: List[Dict[str, Any]]
+    pk: str
+    column_names: List[str]
+    fts_table: Optional[str] = None
+    geo_table: Optional[str] = None
+
+
+# DB_PATH -> (schema_version, TableSchema)
+_schema_cache: Dict[str, Tuple[int, TableSchema]] = {}
+_schema_lock = threading.Lock()
+
+
+def init_db() -> TableSchema:
+    """Prepare the cafes table at DB_PATH for the app and cache its metadata.
+
+    Adds any missing lat/lon columns, geo and search indexes and the
+    data_version counter (see ensure_geo_index, ensure_search_indexes,
+    ensure_meta_table). This is the only place the app changes the schema;
+    it runs once when the module is loaded, so requests never run DDL.
+    """
+    with get_connection() as conn:
+        with _schema_lock:
+            table = guess_cafes_table_name(conn)
+            ensure_geo_index(conn, table, get_table_info(conn, table))
+            # Re-read: the geo index may have just added lat/lon
+            ensure_search_indexes(conn, table, get_table_info(conn, table))
+            ensure_meta_table(conn, table)
+        return get_schema(conn)
+
+
+def load_schema(conn: sqlite3.Connection) -> TableSchema:
+    """Read the cafes table's metadata without changing anything."""
+    table = guess_cafes_table_name(conn)
+    columns = get_table_info(conn, table)
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    fts, geo = f"{table}_fts", f"{table}_geo"
+    return TableSchema(table, columns, get_pk_column(columns), [c["name"] for c in columns],
+                       fts if fts in existing else None, geo if geo in existing else None)
+
+
+def get_schema(conn: sqlite3.Connection) -> TableSchema:
+    """Cafes table name, columns and primary key, cached until the schema changes.
+
+    SQLite bumps PRAGMA schema_version on every schema change, whichever
+    connection or process makes it, so one header read replaces the
+    sqlite_master scan and PRAGMA table_info on each request. A miss only
+    re-reads the metadata; the indexes are built by init_db().
+    """
+    version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    cached = _schema_cache.get(DB_PATH)
+    if cached and cached[0] == version:
+        return cached[1]
+    with _schema_lock:
+        # Another thread may have loaded it while we waited
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        cached = _schema_cache.get(DB_PATH)
+        if cached and cached[0] == version:
+            return cached[1]
+        schema = load_schema(conn)
+        _schema_cache[DB_PATH] = (version, schema)
+    return schema
+
+
 def parse_bool(val: Optional[str]) -> Optional[int]:
     if val is None:
         return None
@@ -70,6 +325,14 @@ def parse_bool(val: Optional[str]) -> Optional[int]:
     return None
 
 
+def coerce_bool(val: Any) -> int:
+    """Stored 0/1 for a boolean column: parse_bool's words, else any non-blank, non-"0" value is 1."""
+    b = parse_bool(val)
+    if b is not None:
+        return b
+    return 0 if str(val).strip() in ("", "0") else 1
+
+
 def is_boolish_column(name: str, col_type: str) -> bool:
     # Heuristic: columns starting with 'has_' or INT columns that typically store 0/1
     if name.lower().startswith("has_"):
@@ -96,14 +359,74 @@ def row_to_dict(row: sqlite3.Row, columns: List[Dict[str, Any]]) -> Dict[str, An
     return d
 
 
-def build_filters(params: Dict[str, str], columns: List[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+# Query parameters that control the search/paging rather than filter a column
+PAGING_PARAMS = ("q", "limit", "offset", "after")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# Query parameters of /api/cafes/nearby that are not column filters
+NEARBY_PARAMS = ("lat", "lon", "radius", "limit")
+DEFAULT_RADIUS_KM = 2.0
+MAX_RADIUS_KM = 50.0
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle; every longitude near the poles or the 180th meridian."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if lon - dlon < -180 or lon + dlon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+def parse_cursor(val: Optional[str], columns: List[Dict[str, Any]], pk: str) -> Any:
+    """The ?after= cursor as the primary key's type, or None when absent.
+
+    Raises:
+        ValueError: if the value does not parse as the key's type
+    """
+    if val is None or val == "":
+        return None
+    col_type = next((c["type"] for c in columns if c["name"] == pk), "")
+    if "INT" in col_type:
+        return int(val)
+    if col_type in ("REAL", "FLOAT", "DOUBLE", "NUMERIC"):
+        return float(val)
+    return val
+
+
+def fts_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must prefix-match, quoted so operators are literal."""
+    return " ".join(f'"{t}"*' for t in re.findall(r"\w+", q))
+
+
+def build_filters(params: Dict[str, str], columns: List[Dict[str, Any]],
+                  fts_table: Optional[str] = None) -> Tuple[str, List[Any]]:
     allowed = {c["name"]: c for c in columns}
     sql_parts: List[str] = []
     args: List[Any] = []
 
-    # Simple text search on name/location if provided via ?q=... (case-insensitive LIKE)
+    # Text search on name/location via ?q=...: the FTS5 index when there is one,
+    # otherwise a case-insensitive LIKE scan
     q = params.get("q")
-    if q:
+    match = fts_query(q) if q and fts_table else ""
+    if match:
+        sql_parts.append(f"rowid IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?)")
+        args.append(match)
+    elif q:
         q_like = f"%{q}%"
         if "name" in allowed and "location" in allowed:
             sql_parts.append("(LOWER(name) LIKE LOWER(?) OR LOWER(location) LIKE LOWER(?))")
@@ -117,7 +440,7 @@ def build_filters(params: Dict[str, str], columns: List[Dict[str, Any]]) -> Tupl
 
     # Column-specific filters by equality, including boolean handling for has_* columns
     for key, value in params.items():
-        if key in ("q",):
+        if key in PAGING_PARAMS:
             continue
         if key in allowed:
             col = allowed[key]
@@ -135,28 +458,178 @@ def build_filters(params: Dict[str, str], columns: List[Dict[str, Any]]) -> Tupl
     return where, args
 
 
+# ----------------------
+# Read caching
+# ----------------------
+
+RESPONSE_CACHE_SIZE = 512
+
+# (DB_PATH, path + normalized query) -> (data_version, status, body, content type)
+_response_cache: "OrderedDict[Tuple[str, str], Tuple[int, int, bytes, str]]" = OrderedDict()
+_response_lock = threading.Lock()
+
+
+def get_data_version(conn: sqlite3.Connection, schema: TableSchema) -> int:
+    row = conn.execute(f"SELECT value FROM {schema.table}_meta WHERE key = 'data_version'").fetchone()
+    return row[0] if row else 0
+
+
+def bump_data_version(conn: sqlite3.Connection, schema: TableSchema) -> None:
+    """Invalidate cached reads. Call inside the write's transaction, before it commits.
+
+    The counter lives in the database, so every worker process sees the bump.
+    """
+    conn.execute(f"UPDATE {schema.table}_meta SET value = value + 1 WHERE key = 'data_version'")
+
+
+def normalized_request_key() -> str:
+    # Same arguments in any order share an entry; only the first of a repeated
+    # argument counts, as in the views (request.args.to_dict())
+    return request.path + "?" + urlencode(sorted(request.args.to_dict().items()))
+
+
+def cached_read(view: Callable) -> Callable:
+    """Serve a read view from an in-memory cache with an ETag derived from data_version.
+
+    A matching If-None-Match gets a 304 before anything is queried or
+    rendered; otherwise the serialized body is reused until the next write
+    bumps data_version. The version is read before the view runs, so a cached
+    body is never older than the version it is stored under.
+    """
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        conn = get_connection()
+        schema = get_schema(conn)
+        version = get_data_version(conn, schema)
+        key = (DB_PATH, normalized_request_key())
+        digest = hashlib.sha1(key[1].encode("utf-8")).hexdigest()[:16]
+        etag = f"{version}-{digest}"
+        if etag in request.if_none_match:
+            resp = app.response_class(status=304)
+        else:
+            with _response_lock:
+                hit = _response_cache.get(key)
+                if hit and hit[0] == version:
+                    _response_cache.move_to_end(key)
+            if hit and hit[0] == version:
+                resp = app.response_class(hit[2], status=hit[1], content_type=hit[3])
+            else:
+                resp = app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                with _response_lock:
+                    _response_cache[key] = (version, resp.status_code, resp.get_data(), resp.content_type)
+                    _response_cache.move_to_end(key)
+                    while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                        _response_cache.popitem(last=False)
+        resp.set_etag(etag)
+        # Clients may keep a copy but must revalidate it
+        resp.cache_control.no_cache = True
+        return resp
+
+    return wrapper
+
+
 # ----------------------
 # REST API endpoints
 # ----------------------
 
 @app.route("/api/cafes", methods=["GET"])
+@cached_read
 def list_cafes():
+    """One page of matching cafes in primary key order.
+
+    ?limit= sets the page size (default 50, max 500). Page on with either
+    ?offset= or ?after=<next_cursor>; the cursor seeks on the primary key, so
+    it stays cheap on deep pages and does not skip rows when cafes are added.
+    """
+    params = request.args.to_dict()
+    try:
+        limit = min(max(int(params.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        offset = max(int(params.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
-        where, args = build_filters(request.args.to_dict(), columns)
-        sql = f"SELECT * FROM {table}{where} ORDER BY {get_pk_column(columns)} ASC"
-        rows = conn.execute(sql, args).fetchall()
-        data = [row_to_dict(r, columns) for r in rows]
-        return jsonify({"cafes": data, "count": len(data)})
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
+        try:
+            after = parse_cursor(params.get("after"), columns, pk)
+        except ValueError:
+            return jsonify({"error": f"after must be a {pk} value (the previous page's next_cursor)"}), 400
+        where, args = build_filters(params, columns, schema.fts_table)
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", args).fetchone()[0]
+        if after is not None:
+            where += (" AND " if where else " WHERE ") + f"{pk} > ?"
+            args = args + [after]
+            offset = 0
+        # One extra row tells us whether there is a next page
+        sql = f"SELECT * FROM {table}{where} ORDER BY {pk} ASC LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, args + [limit + 1, offset]).fetchall()
+        data = [row_to_dict(r, columns) for r in rows[:limit]]
+        next_cursor = data[-1][pk] if len(rows) > limit else None
+        return jsonify({
+            "cafes": data,
+            "count": len(data),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        })
+
+
+@app.route("/api/cafes/nearby", methods=["GET"])
+def nearby_cafes():
+    """Cafes within ?radius= km (default 2, max 50) of ?lat=&lon=, closest first.
+
+    The bounding box around the point is looked up in the geo index, so only
+    the candidates inside it are measured; other ?column= filters and ?q=
+    apply as in list_cafes.
+    """
+    params = request.args.to_dict()
+    try:
+        lat, lon = float(params["lat"]), float(params["lon"])
+        radius = min(float(params.get("radius", DEFAULT_RADIUS_KM)), MAX_RADIUS_KM)
+        limit = min(max(int(params.get("limit", 20)), 1), MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lon are required; lat, lon, radius and limit must be numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius <= 0:
+        return jsonify({"error": "lat/lon out of range or radius not positive"}), 400
+
+    filters = {k: v for k, v in params.items() if k not in NEARBY_PARAMS}
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius)
+    with get_connection() as conn:
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
+        where, args = build_filters(filters, columns, schema.fts_table)
+        if schema.geo_table:
+            box = (f"{pk} IN (SELECT id FROM {schema.geo_table} "
+                   f"WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?)")
+        else:
+            box = "lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?"
+        where += (" AND " if where else " WHERE ") + box
+        rows = conn.execute(f"SELECT * FROM {table}{where}", args + [min_lat, max_lat, min_lon, max_lon]).fetchall()
+
+    hits = []
+    for r in rows:
+        distance = haversine_km(lat, lon, r["lat"], r["lon"])
+        if distance <= radius:
+            hits.append((distance, r))
+    hits.sort(key=lambda h: (h[0], h[1][pk]))
+    data = []
+    for distance, r in hits[:limit]:
+        cafe = row_to_dict(r, columns)
+        cafe["distance_km"] = round(distance, 3)
+        data.append(cafe)
+    return jsonify({"cafes": data, "count": len(data), "lat": lat, "lon": lon, "radius": radius})
 
 
 @app.route("/api/cafes/<int:item_id>", methods=["GET"])
+@cached_read
 def get_cafe(item_id: int):
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
-        pk = get_pk_column(columns)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
         row = conn.execute(f"SELECT * FROM {table} WHERE {pk} = ?", (item_id,)).fetchone()
         if not row:
             return jsonify({"error": "Cafe not found"}), 404
@@ -168,11 +641,11 @@ def add_cafe():
     payload = request.get_json(silent=True) or {}
     if not payload and request.form:
         payload = request.form.to_dict()
+    fill_coordinates(payload)
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
         col_map = {c["name"]: c for c in columns}
-        pk = get_pk_column(columns)
 
         # Remove primary key if present in payload (usually autoincrement)
         if pk in payload:
@@ -188,8 +661,7 @@ def add_cafe():
             if name in payload:
                 val = payload[name]
                 if is_boolish_column(name, col["type"]):
-                    b = parse_bool(val)
-                    val = 1 if b is None and str(val).strip() not in ("", "0") else (b if b is not None else 0)
+                    val = coerce_bool(val)
                 insert_cols.append(name)
                 insert_vals.append(val)
                 placeholders.append("?")
@@ -199,6 +671,7 @@ def add_cafe():
 
         sql = f"INSERT INTO {table} (" + ",".join(insert_cols) + ") VALUES (" + ",".join(placeholders) + ")"
         cur = conn.execute(sql, insert_vals)
+        bump_data_version(conn, schema)
         conn.commit()
         new_id = cur.lastrowid
 
@@ -210,11 +683,11 @@ def update_cafe(item_id: int):
     payload = request.get_json(silent=True) or {}
     if not payload and request.form:
         payload = request.form.to_dict()
+    fill_coordinates(payload)
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
         col_map = {c["name"]: c for c in columns}
-        pk = get_pk_column(columns)
 
         # Ensure row exists
         exists = conn.execute(f"SELECT 1 FROM {table} WHERE {pk} = ?", (item_id,)).fetchone()
@@ -229,8 +702,7 @@ def update_cafe(item_id: int):
             if name in payload:
                 val = payload[name]
                 if is_boolish_column(name, col["type"]):
-                    b = parse_bool(val)
-                    val = 1 if b is None and str(val).strip() not in ("", "0") else (b if b is not None else 0)
+                    val = coerce_bool(val)
                 sets.append(f"{name} = ?")
                 args.append(val)
         if not sets:
@@ -238,6 +710,7 @@ def update_cafe(item_id: int):
 
         args.append(item_id)
         conn.execute(f"UPDATE {table} SET " + ", ".join(sets) + f" WHERE {pk} = ?", args)
+        bump_data_version(conn, schema)
         conn.commit()
         return jsonify({"message": "Cafe updated", "id": item_id})
 
@@ -245,16 +718,220 @@ def update_cafe(item_id: int):
 @app.route("/api/cafes/<int:item_id>", methods=["DELETE"])
 def delete_cafe(item_id: int):
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
-        pk = get_pk_column(columns)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
         cur = conn.execute(f"DELETE FROM {table} WHERE {pk} = ?", (item_id,))
+        if cur.rowcount:
+            bump_data_version(conn, schema)
         conn.commit()
         if cur.rowcount == 0:
             return jsonify({"error": "Cafe not found"}), 404
         return jsonify({"message": "Cafe deleted", "id": item_id})
 
 
+# ----------------------
+# Bulk import / export
+# ----------------------
+
+BULK_CHUNK_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+
+def coerce_row(payload: Dict[str, Any], columns: List[Dict[str, Any]], pk: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Known, non-PK columns of one cafe with add_cafe's boolean handling.
+
+    Blank values count as missing. Returns the values and an error message
+    if a required (NOT NULL, no default) column is missing or a value is not
+    a plain string, number or boolean.
+    """
+    fill_coordinates(payload)
+    values: Dict[str, Any] = {}
+    missing: List[str] = []
+    for col in columns:
+        name = col["name"]
+        if name == pk:
+            continue
+        val = payload.get(name)
+        if val is not None and not isinstance(val, (str, int, float)):
+            return values, f"Invalid value for {name}: expected a string, number or boolean"
+        if val is None or str(val).strip() == "":
+            if col["notnull"] and col["default"] is None:
+                missing.append(name)
+            continue
+        if is_boolish_column(name, col["type"]):
+            val = coerce_bool(val)
+        values[name] = val
+    if missing or not values:
+        return values, "Missing fields: " + ", ".join(missing or ["all"])
+    return values, None
+
+
+def read_bulk_payload() -> Iterator[Any]:
+    """Cafes from the request body or an uploaded ``file``, one dict at a time.
+
+    JSON arrays (or {"cafes": [...]}) are parsed whole; NDJSON and CSV are
+    read line by line so large uploads are never held in memory. The format
+    comes from ?format=, else the upload's file extension, else the
+    Content-Type. Undecodable NDJSON lines are yielded as ValueError.
+    """
+    upload = request.files.get("file")
+    fmt = request.args.get("format")
+    if not fmt and upload and upload.filename:
+        fmt = os.path.splitext(upload.filename)[1].lstrip(".").lower()
+    if not fmt:
+        mimetype = upload.mimetype if upload else request.mimetype
+        fmt = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}.get(mimetype, "json")
+    raw = upload.stream if upload else request.stream
+
+    if fmt == "csv":
+        yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+    elif fmt in ("ndjson", "jsonl"):
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    yield exc
+    else:
+        data = json.load(raw) if upload else request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("cafes")
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of cafes")
+        yield from data
+
+
+def insert_chunk(conn: sqlite3.Connection, schema: TableSchema, chunk: List[Tuple[int, Dict[str, Any]]],
+                 errors: List[Dict[str, Any]]) -> int:
+    """Insert one chunk in a single transaction, one executemany per column set.
+
+    If a constraint fails (e.g. a duplicate name) the chunk is retried row by
+    row, still in one transaction, so only the offending rows are reported.
+    """
+    groups: Dict[Tuple[str, ...], List[List[Any]]] = {}
+    for _, values in chunk:
+        groups.setdefault(tuple(values), []).append(list(values.values()))
+
+    def insert_sql(cols: Tuple[str, ...]) -> str:
+        return f"INSERT INTO {schema.table} (" + ",".join(cols) + ") VALUES (" + ",".join("?" * len(cols)) + ")"
+
+    try:
+        with conn:
+            for cols, rows in groups.items():
+                conn.executemany(insert_sql(cols), rows)
+            bump_data_version(conn, schema)
+        return len(chunk)
+    except sqlite3.IntegrityError:
+        pass
+    inserted = 0
+    with conn:
+        for row_no, values in chunk:
+            try:
+                conn.execute(insert_sql(tuple(values)), list(values.values()))
+                inserted += 1
+            except sqlite3.IntegrityError as exc:
+                errors.append({"row": row_no, "error": str(exc)})
+        if inserted:
+            bump_data_version(conn, schema)
+    return inserted
+
+
+@app.route("/api/cafes/bulk", methods=["POST"])
+def bulk_add_cafes():
+    """Insert many cafes from a JSON array, NDJSON or CSV (body or ``file`` upload).
+
+    Rows are validated as they are read and committed in chunks of
+    BULK_CHUNK_SIZE; invalid rows are skipped and reported by 1-based row number.
+    """
+    rows = read_bulk_payload()
+    inserted = 0
+    errors: List[Dict[str, Any]] = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    row_no = 0
+    try:
+        with get_connection() as conn:
+            schema = get_schema(conn)
+            for row_no, item in enumerate(rows, start=1):
+                if isinstance(item, ValueError):
+                    errors.append({"row": row_no, "error": f"Invalid JSON: {item}"})
+                    continue
+                if not isinstance(item, dict):
+                    errors.append({"row": row_no, "error": "Not a JSON object"})
+                    continue
+                values, error = coerce_row(item, schema.columns, schema.pk)
+                if error:
+                    errors.append({"row": row_no, "error": error})
+                    continue
+                chunk.append((row_no, values))
+                if len(chunk) >= BULK_CHUNK_SIZE:
+                    inserted += insert_chunk(conn, schema, chunk, errors)
+                    chunk = []
+            if chunk:
+                inserted += insert_chunk(conn, schema, chunk, errors)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        return jsonify({"error": f"Could not read upload: {exc}", "inserted": inserted}), 400
+    if row_no == 0:
+        return jsonify({"error": "No cafes provided"}), 400
+    return jsonify({
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+    }), 201 if inserted else 400
+
+
+@app.route("/api/cafes/export", methods=["GET"])
+def export_cafes():
+    """Stream matching cafes as NDJSON (default) or ?format=csv.
+
+    Rows are fetched from the cursor in batches and written out as they
+    arrive, so the export never builds the full result list. Column filters
+    and ?q= apply as in list_cafes.
+    """
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    params = {k: v for k, v in request.args.items() if k != "format"}
+    with get_connection() as conn:
+        schema = get_schema(conn)
+    where, args = build_filters(params, schema.columns, schema.fts_table)
+    path = DB_PATH
+
+    def generate() -> Iterator[str]:
+        # The response outlives the view, so it reads on its own connection:
+        # the thread's shared one stays free for later requests, and closing
+        # this one releases the read lock even if the client goes away.
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(f"SELECT * FROM {schema.table}{where} ORDER BY {schema.pk} ASC", args)
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerow(schema.column_names)
+                yield buf.getvalue()
+            while True:
+                batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not batch:
+                    break
+                if fmt == "csv":
+                    buf.seek(0)
+                    buf.truncate()
+                    writer.writerows(tuple(r) for r in batch)
+                    yield buf.getvalue()
+                else:
+                    yield "".join(json.dumps(row_to_dict(r, schema.columns)) + "\n" for r in batch)
+        finally:
+            conn.close()
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=cafes.{fmt}"},
+    )
+
+
 # ----------------------
 # Minimal Web UI (HTML)
 # ----------------------
@@ -442,19 +1119,19 @@ INDEX_TEMPLATE = """
 
 
 @app.route("/", methods=["GET"])
+@cached_read
 def index():
     # Populate card grid and filters using current query params
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
-        pk = get_pk_column(columns)
-        where, args = build_filters(request.args.to_dict(), columns)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
+        where, args = build_filters(request.args.to_dict(), columns, schema.fts_table)
         rows = conn.execute(f"SELECT * FROM {table}{where} ORDER BY {pk} ASC", args).fetchall()
         cafes = []
         for r in rows:
             cafes.append({c["name"]: r[c["name"]] for c in columns})
         # Distinct locations for filter dropdown (if column exists)
-        col_names = [c["name"] for c in columns]
+        col_names = schema.column_names
         locations: List[str] = []
         if "location" in col_names:
             loc_rows = conn.execute(f"SELECT DISTINCT location FROM {table} WHERE location IS NOT NULL ORDER BY location").fetchall()
@@ -475,21 +1152,16 @@ def web_add():
     form_data = request.form.to_dict()
     # Convert unchecked checkboxes for has_* to 0 explicitly if those columns exist
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
+        columns = get_schema(conn).columns
         bool_cols = {c["name"] for c in columns if c["name"].lower().startswith("has_")}
         for bc in bool_cols:
             if bc not in form_data:
                 form_data[bc] = "0"
-    with app.test_request_context(json=form_data):
-        # Call the same logic as API but without performing an internal request
-        payload = form_data
-    # Actually insert directly to DB to avoid nested request contexts
+    payload = fill_coordinates(form_data)
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
         col_map = {c["name"]: c for c in columns}
-        pk = get_pk_column(columns)
 
         if pk in payload:
             payload.pop(pk, None)
@@ -503,8 +1175,7 @@ def web_add():
             if name in payload:
                 val = payload[name]
                 if is_boolish_column(name, col["type"]):
-                    b = parse_bool(val)
-                    val = 1 if b is None and str(val).strip() not in ("", "0") else (b if b is not None else 0)
+                    val = coerce_bool(val)
                 insert_cols.append(name)
                 insert_vals.append(val)
                 placeholders.append("?")
@@ -513,6 +1184,7 @@ def web_add():
                 f"INSERT INTO {table} (" + ",".join(insert_cols) + ") VALUES (" + ",".join(placeholders) + ")",
                 insert_vals,
             )
+            bump_data_version(conn, schema)
             conn.commit()
     return redirect(url_for("index"))
 
@@ -520,10 +1192,11 @@ def web_add():
 @app.route("/web/delete/<int:item_id>", methods=["POST"]) 
 def web_delete(item_id: int):
     with get_connection() as conn:
-        table = guess_cafes_table_name(conn)
-        columns = get_table_info(conn, table)
-        pk = get_pk_column(columns)
-        conn.execute(f"DELETE FROM {table} WHERE {pk} = ?", (item_id,))
+        schema = get_schema(conn)
+        table, columns, pk = schema.table, schema.columns, schema.pk
+        cur = conn.execute(f"DELETE FROM {table} WHERE {pk} = ?", (item_id,))
+        if cur.rowcount:
+            bump_data_version(conn, schema)
         conn.commit()
     return redirect(url_for("index"))
 
@@ -531,6 +1204,15 @@ def web_delete(item_id: int):
 # --------------
 # App Entrypoint
 # --------------
+# Set CAFES_INIT_DB=0 to import the app without touching DB_PATH (e.g. in
+# tests, which call init_db() on their own copy).
+if os.environ.get("CAFES_INIT_DB", "1") != "0" and os.path.exists(DB_PATH):
+    try:
+        init_db()
+    except (sqlite3.Error, RuntimeError):
+        # Empty or unreadable database: requests report the error instead
+        pass
+
 if __name__ == "__main__":
     if not os.path.exists(DB_PATH):
         raise SystemExit(f"Database not found at {DB_PATH}. Please ensure cafes.db is present.")
@@ -0,0 +1,265 @@
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+# Leave the committed cafes.db alone; each test prepares its own copy
+os.environ["CAFES_INIT_DB"] = "0"
+
+import cafe_loc  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "cafes.db"
+    shutil.copy(os.path.join(APP_DIR, "cafes.db"), path)
+    monkeypatch.setattr(cafe_loc, "DB_PATH", str(path))
+    cafe_loc.init_db()
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    cafe_loc.app.testing = True
+    return cafe_loc.app.test_client()
+
+
+def test_schema_is_cached_until_it_changes(db_path):
+    conn = cafe_loc.get_connection()
+    first = cafe_loc.get_schema(conn)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        assert cafe_loc.get_schema(conn) is first
+        assert statements == ["PRAGMA schema_version"]
+
+        conn.execute(f"ALTER TABLE {first.table} ADD COLUMN opening_hours TEXT")
+        del statements[:]
+        changed = cafe_loc.get_schema(conn)
+    finally:
+        conn.set_trace_callback(None)
+    assert changed is not first
+    assert "opening_hours" in changed.column_names
+    assert (changed.fts_table, changed.geo_table) == (first.fts_table, first.geo_table)
+    # A miss only reads the metadata; the indexes come from init_db()
+    assert not [s for s in statements if s.split()[0].upper() in ("CREATE", "ALTER", "INSERT", "UPDATE")]
+
+
+def test_each_thread_keeps_one_connection(db_path):
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(cafe_loc.get_connection()))
+    worker.start()
+    worker.join()
+    assert cafe_loc.get_connection() is cafe_loc.get_connection()
+    assert seen[0] is not cafe_loc.get_connection()
+
+
+def test_crud_round_trip(client):
+    created = client.post("/api/cafes", json={
+        "name": "Test Cafe", "map_url": "https://maps.example/x", "img_url": "https://img.example/x",
+        "location": "Nowhere", "has_sockets": "yes", "has_toilet": False, "has_wifi": True,
+        "can_take_calls": 0, "seats": "10-20", "coffee_price": "£2.50",
+    })
+    assert created.status_code == 201
+    cafe_id = created.get_json()["id"]
+    cafe = client.get(f"/api/cafes/{cafe_id}").get_json()
+    assert cafe["has_sockets"] is True and cafe["has_toilet"] is False
+
+    assert client.patch(f"/api/cafes/{cafe_id}", json={"seats": "50+"}).status_code == 200
+    assert client.get(f"/api/cafes/{cafe_id}").get_json()["seats"] == "50+"
+    assert client.delete(f"/api/cafes/{cafe_id}").status_code == 200
+    assert client.get(f"/api/cafes/{cafe_id}").status_code == 404
+
+
+def test_search_uses_fts_index_kept_in_sync(client):
+    conn = cafe_loc.get_connection()
+    schema = cafe_loc.get_schema(conn)
+    assert schema.fts_table == f"{schema.table}_fts"
+    indexes = {r[1] for r in conn.execute(f"PRAGMA index_list({schema.table})")}
+    assert {f"idx_{schema.table}_location", f"idx_{schema.table}_has_wifi"} <= indexes
+    plan = " ".join(r[3] for r in conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM {schema.table} WHERE location = ?", ("x",)))
+    assert "USING INDEX" in plan
+
+    cafe_id = client.post("/api/cafes", json={
+        "name": "Zebra Roasters", "map_url": "m", "img_url": "i", "location": "Quayside",
+        "has_sockets": 1, "has_toilet": 1, "has_wifi": 1, "can_take_calls": 1,
+    }).get_json()["id"]
+    hits = client.get("/api/cafes?q=zebra roast").get_json()
+    assert [c["id"] for c in hits["cafes"]] == [cafe_id] and hits["total"] == 1
+    client.patch(f"/api/cafes/{cafe_id}", json={"name": "Okapi Roasters"})
+    assert client.get("/api/cafes?q=zebra").get_json()["total"] == 0
+    assert client.get("/api/cafes?q=quayside&name=Okapi Roasters").get_json()["total"] == 1
+    client.delete(f"/api/cafes/{cafe_id}")
+    assert client.get("/api/cafes?q=okapi").get_json()["total"] == 0
+    assert client.get('/api/cafes?q=" OR (').status_code == 200
+
+
+def test_list_pages_by_offset_and_cursor(client):
+    everything = client.get("/api/cafes?limit=500").get_json()
+    ids = [c["id"] for c in everything["cafes"]]
+    assert everything["total"] == len(ids) and everything["next_cursor"] is None
+
+    seen, cursor = [], None
+    while True:
+        page = client.get("/api/cafes", query_string={"limit": 5, "after": cursor or ""}).get_json()
+        assert page["total"] == len(ids) and page["count"] <= 5
+        seen += [c["id"] for c in page["cafes"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ids
+
+    page = client.get("/api/cafes?limit=3&offset=3").get_json()
+    assert [c["id"] for c in page["cafes"]] == ids[3:6]
+    assert client.get("/api/cafes?limit=ten").status_code == 400
+    assert client.get("/api/cafes?after=abc").status_code == 400
+    assert client.get("/api/cafes").get_json()["count"] == min(len(ids), cafe_loc.DEFAULT_PAGE_SIZE)
+
+
+def test_coords_from_map_url():
+    url = "https://www.google.com/maps/place/X/@51.46,-0.06,17z/data=!3d51.4651552!4d-0.0666088"
+    assert cafe_loc.coords_from_map_url(url) == (51.4651552, -0.0666088)
+    assert cafe_loc.coords_from_map_url("https://maps.example/?q=51.5%2C-0.1") == (51.5, -0.1)
+    assert cafe_loc.coords_from_map_url("https://goo.gl/maps/ugP2B1AV7FELHSgn6") is None
+
+
+def test_nearby_is_sorted_by_distance(client):
+    conn = cafe_loc.get_connection()
+    schema = cafe_loc.get_schema(conn)
+    assert schema.geo_table == f"{schema.table}_geo"
+    # Backfilled from the one seed cafe whose map_url spells out coordinates
+    backfilled = conn.execute(f"SELECT COUNT(*) FROM {schema.geo_table}").fetchone()[0]
+    assert backfilled >= 1
+
+    def add(name, lat, lon, wifi=1):
+        return client.post("/api/cafes", json={
+            "name": name, "map_url": f"https://maps.example/?q={lat},{lon}", "img_url": "i",
+            "location": "Test", "has_sockets": 1, "has_toilet": 1, "has_wifi": wifi, "can_take_calls": 1,
+        }).get_json()["id"]
+
+    near = add("Near", 10.001, 20.0)
+    nearest = add("Nearest", 10.0, 20.0005)
+    offline = add("Offline", 10.0, 20.001, wifi=0)
+    add("Far", 10.5, 20.0)
+
+    resp = client.get("/api/cafes/nearby?lat=10&lon=20&radius=1").get_json()
+    assert [c["id"] for c in resp["cafes"]] == [nearest, offline, near]
+    assert resp["cafes"][0]["distance_km"] == pytest.approx(0.055, abs=0.001)
+    resp = client.get("/api/cafes/nearby?lat=10&lon=20&radius=1&has_wifi=1&limit=1").get_json()
+    assert [c["id"] for c in resp["cafes"]] == [nearest]
+
+    client.patch(f"/api/cafes/{nearest}", json={"lat": 11, "lon": 20})
+    client.delete(f"/api/cafes/{near}")
+    resp = client.get("/api/cafes/nearby?lat=10&lon=20&radius=1").get_json()
+    assert [c["id"] for c in resp["cafes"]] == [offline]
+    assert client.get("/api/cafes/nearby?lat=10").status_code == 400
+
+
+def bulk_cafe(i, **extra):
+    cafe = {"name": f"Bulk {i}", "map_url": "m", "img_url": "i", "location": "Bulkville",
+            "has_sockets": "yes", "has_toilet": "no", "has_wifi": "1", "can_take_calls": "0"}
+    cafe.update(extra)
+    return cafe
+
+
+def test_bulk_import_json_ndjson_and_csv(client, monkeypatch):
+    monkeypatch.setattr(cafe_loc, "BULK_CHUNK_SIZE", 2)
+    before = client.get("/api/cafes?limit=1").get_json()["total"]
+
+    rows = [bulk_cafe(i) for i in range(5)] + [bulk_cafe(0), {"name": "No fields"}]
+    resp = client.post("/api/cafes/bulk", json=rows)
+    body = resp.get_json()
+    assert resp.status_code == 201
+    assert body["inserted"] == 5
+    assert [e["row"] for e in body["errors"]] == [6, 7]
+    assert "UNIQUE" in body["errors"][0]["error"]
+
+    ndjson = "\n".join(json.dumps(bulk_cafe(i)) for i in range(5, 8)) + "\n{broken\n"
+    body = client.post("/api/cafes/bulk", data=ndjson, content_type="application/x-ndjson").get_json()
+    assert body["inserted"] == 3 and body["errors"][0]["row"] == 4
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(bulk_cafe(0)))
+    writer.writeheader()
+    writer.writerows(bulk_cafe(i) for i in range(8, 11))
+    upload = {"file": (io.BytesIO(out.getvalue().encode()), "cafes.csv")}
+    body = client.post("/api/cafes/bulk", data=upload, content_type="multipart/form-data").get_json()
+    assert body["inserted"] == 3
+
+    assert client.get("/api/cafes?limit=1").get_json()["total"] == before + 11
+    cafe = client.get("/api/cafes?name=Bulk 9").get_json()["cafes"][0]
+    assert cafe["has_sockets"] is True and cafe["has_toilet"] is False
+    assert client.post("/api/cafes/bulk", json={"nope": 1}).status_code == 400
+
+
+def test_bulk_import_rejects_non_scalar_values(client):
+    rows = [bulk_cafe("ok"), bulk_cafe("dict", name={"a": 1}), bulk_cafe("list", has_wifi=[1])]
+    resp = client.post("/api/cafes/bulk", json=rows)
+    body = resp.get_json()
+    assert resp.status_code == 201
+    assert body["inserted"] == 1
+    assert [(e["row"], e["error"].split(":")[0]) for e in body["errors"]] == [
+        (2, "Invalid value for name"), (3, "Invalid value for has_wifi")]
+
+
+def test_export_streams_ndjson_and_csv(client, monkeypatch):
+    monkeypatch.setattr(cafe_loc, "EXPORT_BATCH_SIZE", 4)
+    ids = [c["id"] for c in client.get("/api/cafes?limit=500").get_json()["cafes"]]
+
+    resp = client.get("/api/cafes/export")
+    assert resp.is_streamed and resp.mimetype == "application/x-ndjson"
+    lines = resp.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ids
+
+    resp = client.get("/api/cafes/export?format=csv&has_wifi=1")
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows and all(r["has_wifi"] == "1" for r in rows)
+    # The CSV export re-imports as-is
+    client.delete(f"/api/cafes/{rows[0]['id']}")
+    upload = {"file": (io.BytesIO(resp.get_data()), "cafes.csv")}
+    body = client.post("/api/cafes/bulk", data=upload, content_type="multipart/form-data").get_json()
+    assert body["inserted"] == 1 and body["rejected"] == len(rows) - 1
+
+
+def test_reads_are_cached_and_revalidated_until_a_write(client):
+    cafe_loc._response_cache.clear()
+    first = client.get("/api/cafes?has_wifi=1&limit=5")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    conn = cafe_loc.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        # Same query in another order: served from memory, no cafe query
+        again = client.get("/api/cafes?limit=5&has_wifi=1")
+        assert again.get_data() == first.get_data() and again.headers["ETag"] == etag
+        assert not any(s.startswith("SELECT *") or "COUNT" in s for s in statements)
+        assert client.get("/api/cafes?has_wifi=1&limit=5", headers={"If-None-Match": etag}).status_code == 304
+    finally:
+        conn.set_trace_callback(None)
+
+    page = client.get("/")
+    assert page.status_code == 200 and page.headers["ETag"]
+    cafe_id = first.get_json()["cafes"][0]["id"]
+    single = client.get(f"/api/cafes/{cafe_id}")
+
+    client.patch(f"/api/cafes/{cafe_id}", json={"seats": "1"})
+    fresh = client.get("/api/cafes?has_wifi=1&limit=5", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert fresh.get_json()["cafes"][0]["seats"] == "1"
+    assert client.get(f"/api/cafes/{cafe_id}", headers={"If-None-Match": single.headers["ETag"]}).status_code == 200
+    assert client.get("/", headers={"If-None-Match": page.headers["ETag"]}).status_code == 200
+
+    client.post("/api/cafes/bulk", json=[bulk_cafe("etag")])
+    assert client.get("/api/cafes?has_wifi=1&limit=5").headers["ETag"] != fresh.headers["ETag"]
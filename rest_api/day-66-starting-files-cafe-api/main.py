@@ -1,7 +1,13 @@
+import csv
+import io
+import json
+import os
+
 from flask import Flask, jsonify, render_template, request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, String, Boolean, func
+from sqlalchemy import Integer, String, Boolean, func, insert
 
 '''
 Install the required packages first: 
@@ -40,10 +46,12 @@ def require_api_key():
     Returns a Flask response (403) if unauthorized; otherwise None.
     """
     # Prefer header, then query, then JSON, then form
+    body = request.get_json(silent=True)
     key = (
         request.headers.get("X-API-KEY")
         or request.args.get("api-key")
-        or ((request.get_json(silent=True) or {}).get("api-key"))
+        # A bulk upload's JSON body is an array, which carries no key
+        or (body.get("api-key") if isinstance(body, dict) else None)
         or request.form.get("api-key")
     )
     if key != app.config.get('API_KEY'):
@@ -74,6 +82,99 @@ with app.app_context():
     db.create_all()
 
 
+REQUIRED_FIELDS = [
+    "name", "map_url", "img_url", "location", "seats",
+    "has_toilet", "has_wifi", "has_sockets", "can_take_calls"
+]
+BOOL_FIELDS = ["has_toilet", "has_wifi", "has_sockets", "can_take_calls"]
+# Rows per transaction for /add-bulk
+BULK_CHUNK_SIZE = 500
+
+
+def parse_bool(val):
+    if isinstance(val, bool):
+        return val
+    if val is None:
+        return None
+    s = str(val).strip().lower()
+    if s in ("1", "true", "yes", "y", "on"): return True
+    if s in ("0", "false", "no", "n", "off"): return False
+    return None
+
+
+def validate_cafe(data):
+    """Pick the Cafe fields out of one submitted cafe and convert the booleans.
+
+    Returns (payload, missing, invalid_bools); the cafe is valid when both
+    lists are empty.
+    """
+    payload = {field: data.get(field) for field in REQUIRED_FIELDS}
+    payload["coffee_price"] = data.get("coffee_price")  # optional
+    for bf in BOOL_FIELDS:
+        payload[bf] = parse_bool(payload.get(bf))
+    missing = [k for k in REQUIRED_FIELDS if payload.get(k) in (None, "")]
+    bad_bools = [k for k in BOOL_FIELDS if payload.get(k) is None]
+    return payload, missing, bad_bools
+
+
+def read_bulk_cafes():
+    """Cafes from a JSON array, NDJSON or CSV body (or a ``file`` upload), one at a time.
+
+    Undecodable NDJSON lines are yielded as ValueError so they can be reported
+    per row.
+    """
+    upload = request.files.get("file")
+    fmt = request.args.get("format")
+    if not fmt and upload and upload.filename:
+        fmt = os.path.splitext(upload.filename)[1].lstrip(".").lower()
+    if not fmt:
+        mimetype = upload.mimetype if upload else request.mimetype
+        fmt = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}.get(mimetype, "json")
+    raw = upload.stream if upload else request.stream
+
+    if fmt == "csv":
+        yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+    elif fmt in ("ndjson", "jsonl"):
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield e
+    else:
+        data = json.load(raw) if upload else request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("cafes")
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of cafes")
+        yield from data
+
+
+def insert_cafes(chunk, errors):
+    """Insert (row number, payload) pairs with one executemany and one commit.
+
+    A constraint failure (e.g. a duplicate name) rolls the chunk back and
+    retries it row by row inside savepoints so only the offending rows are
+    rejected.
+    """
+    try:
+        db.session.execute(insert(Cafe), [payload for _, payload in chunk])
+        db.session.commit()
+        return len(chunk)
+    except IntegrityError:
+        db.session.rollback()
+    inserted = 0
+    for row_no, payload in chunk:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Cafe), [payload])
+            inserted += 1
+        except IntegrityError as e:
+            errors.append({"row": row_no, "error": str(e.orig)})
+    db.session.commit()
+    return inserted
+
+
 @app.route("/")
 def home():
     return render_template("index.html")
@@ -111,35 +212,9 @@ def add_cafe():
         return auth
     # Accept both JSON and form data
     data = request.get_json(silent=True) or {}
-    def g(key, default=None):
-        return request.form.get(key, data.get(key, default))
-
-    def parse_bool(val):
-        if isinstance(val, bool):
-            return val
-        if val is None:
-            return None
-        s = str(val).strip().lower()
-        if s in ("1", "true", "yes", "y", "on"): return True
-        if s in ("0", "false", "no", "n", "off"): return False
-        return None
-
-    required_fields = [
-        "name", "map_url", "img_url", "location", "seats",
-        "has_toilet", "has_wifi", "has_sockets", "can_take_calls"
-    ]
+    data = {**data, **request.form.to_dict()}
 
-    payload = {field: g(field) for field in required_fields}
-    payload["coffee_price"] = g("coffee_price")  # optional
-
-    # Convert booleans
-    bool_fields = ["has_toilet", "has_wifi", "has_sockets", "can_take_calls"]
-    for bf in bool_fields:
-        payload[bf] = parse_bool(payload.get(bf))
-
-    # Validate required
-    missing = [k for k in required_fields if payload.get(k) in (None, "")]
-    bad_bools = [k for k in bool_fields if payload.get(k) is None]
+    payload, missing, bad_bools = validate_cafe(data)
     if missing or bad_bools:
         return jsonify(error={
             "Bad Request": "Missing or invalid fields",
@@ -169,6 +244,46 @@ def add_cafe():
 
     return jsonify(success={"message": "Successfully added new cafe.", "cafe": new_cafe.to_dict()}), 201
 
+# HTTP POST - Create Records in bulk
+@app.route("/add-bulk", methods=["POST"])
+def add_cafes_bulk():
+    # API key required (header or query param; the body holds the cafes)
+    auth = require_api_key()
+    if auth:
+        return auth
+
+    inserted = 0
+    errors = []
+    chunk = []
+    row_no = 0
+    try:
+        for row_no, item in enumerate(read_bulk_cafes(), start=1):
+            if isinstance(item, ValueError):
+                errors.append({"row": row_no, "error": f"Invalid JSON: {item}"})
+                continue
+            if not isinstance(item, dict):
+                errors.append({"row": row_no, "error": "Not a JSON object"})
+                continue
+            payload, missing, bad_bools = validate_cafe(item)
+            if missing or bad_bools:
+                errors.append({"row": row_no, "missing": missing, "invalid_bools": bad_bools})
+                continue
+            chunk.append((row_no, payload))
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                inserted += insert_cafes(chunk, errors)
+                chunk = []
+        if chunk:
+            inserted += insert_cafes(chunk, errors)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify(error={"Bad Request": f"Could not read upload: {e}"}, inserted=inserted), 400
+
+    if row_no == 0:
+        return jsonify(error={"Bad Request": "No cafes provided"}), 400
+    body = {"message": f"Added {inserted} cafes.", "inserted": inserted, "rejected": errors}
+    if not inserted:
+        return jsonify(error={"Bad Request": "No valid cafes", **body}), 400
+    return jsonify(success=body), 201
+
 # HTTP PUT/PATCH - Update Record
 @app.route("/update-price/<int:cafe_id>", methods=["PATCH"])
 def update_price(cafe_id):